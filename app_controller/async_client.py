@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional, Union
+
+import networkx as nx
+
+from .calendar_exporter import ExportEvents, TimePeriod
+from .client import Client
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+async def run_in_asyncio_executor(executor: Executor, func: Callable[[], Any]) -> Any:
+    """
+    Awaits a blocking function executed by the executor on the running asyncio loop.
+
+    Positional arguments:
+        executor: Executor,
+            executor running the function.
+
+        func: Callable[[],Any],
+            function to be executed.
+
+    Returns:
+        Any: result of the function.
+    """
+
+    return await asyncio.get_running_loop().run_in_executor(executor, func)
+
+
+class AsyncClient:
+    """
+    Awaitable interface of the Client class.
+    Requests are executed by a thread pool sharing the session (pooled connections),
+    the parsers and the cache of the client, so that independent requests
+    can be awaited concurrently (e.g. by asyncio.gather).
+    The event loop awaiting the requests is pluggable, the app awaits them
+    in asynckivy coroutines by passing asynckivy.run_in_executor.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_workers: int = 4,
+        run_in_executor: Callable[
+            [Executor, Callable[[], Any]], Awaitable
+        ] = run_in_asyncio_executor,
+    ):
+        """
+        Create an awaitable interface.
+
+        Positional arguments:
+            client: Client,
+                client executing the requests.
+
+        Keyword arguments:
+            max_workers: int, optional, default is 4,
+                maximum number of concurrent requests.
+
+            run_in_executor: Callable[[Executor,Callable[[],Any]],Awaitable],
+                optional, default is run_in_asyncio_executor,
+                awaits a function executed by the thread pool
+                within the event loop of the caller.
+        """
+
+        self.client = client
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="async-client"
+        )
+        self.run_in_executor = run_in_executor
+
+    async def run(
+        self, method: Callable, *args: tuple[Any], **kwargs: dict[str, Any]
+    ) -> Any:
+        """
+        Executes a blocking method of the client in the thread pool.
+
+        Positional arguments:
+            method: Callable,
+                method to be executed.
+
+            *args: tuple[Any],
+                positional arguments of the method.
+
+            **kwargs: dict[str,Any],
+                keyword arguments of the method.
+
+        Returns:
+            Any: result of the method.
+        """
+
+        return await self.run_in_executor(
+            self.executor, partial(method, *args, **kwargs)
+        )
+
+    async def sign_in(self):
+        """
+        Awaitable version of Client.sign_in.
+        """
+
+        await self.run(self.client.sign_in)
+
+    async def close(self):
+        """
+        Awaitable version of Client.close.
+        """
+
+        await self.run(self.client.close)
+
+    async def list_courses(self, **kwargs: dict[str, Any]) -> list[dict]:
+        """
+        Awaitable version of Client.list_courses.
+        """
+
+        return await self.run(self.client.list_courses, **kwargs)
+
+    async def list_course_resources(
+        self, course_id: int, **kwargs: dict[str, Any]
+    ) -> list[dict]:
+        """
+        Awaitable version of Client.list_course_resources.
+        """
+
+        return await self.run(self.client.list_course_resources, course_id, **kwargs)
+
+    async def list_all_course_resources(
+        self, course_ids: list[int], **kwargs: dict[str, Any]
+    ) -> dict[int, list[dict]]:
+        """
+        Awaitable version of Client.list_all_course_resources.
+        """
+
+        return await self.run(
+            self.client.list_all_course_resources, course_ids, **kwargs
+        )
+
+    async def get_grades(self, **kwargs: dict[str, Any]) -> dict:
+        """
+        Awaitable version of Client.get_grades.
+        """
+
+        return await self.run(self.client.get_grades, **kwargs)
+
+    async def export_calendar(
+        self,
+        *,
+        exportevents: ExportEvents = ExportEvents["all"],
+        timeperiod: TimePeriod = TimePeriod["recentupcoming"],
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Awaitable version of Client.export_calendar.
+        """
+
+        return await self.run(
+            self.client.export_calendar,
+            exportevents=exportevents,
+            timeperiod=timeperiod,
+            cached=cached,
+            callback=callback,
+        )
+
+    async def download(
+        self, link: str, cached: Optional[bool] = False, chunk: Optional[int] = None
+    ) -> tuple[str, Union[bytes, memoryview, AsyncGenerator[bytes, None]], int]:
+        """
+        Awaitable version of Client.download.
+        If chunk is set, the content is an asynchronous generator
+        reading the chunks in the thread pool.
+        """
+
+        disposition, content, length = await self.run(
+            self.client.download, link, cached, chunk
+        )
+        if isinstance(content, (bytes, memoryview)):
+            return disposition, content, length
+
+        async def chunks() -> AsyncGenerator[bytes, None]:
+            iterator = iter(content)
+            while True:
+                data = await self.run(next, iterator, None)
+                if data is None:
+                    return
+                yield data
+
+        return disposition, chunks(), length
+
+    async def save(
+        self,
+        filename: str,
+        content: Union[bytes, memoryview, str],
+        destination: Optional[Path] = None,
+    ) -> Path:
+        """
+        Awaitable version of Client.save.
+        """
+
+        return await self.run(self.client.save, filename, content, destination)
+
+    async def get_courses_to_register(self, **kwargs: dict[str, Any]) -> dict:
+        """
+        Awaitable version of Client.get_courses_to_register.
+        """
+
+        return await self.run(self.client.get_courses_to_register, **kwargs)
+
+    async def get_dependency_graph(self, **kwargs: dict[str, Any]) -> nx.Graph:
+        """
+        Awaitable version of Client.get_dependency_graph.
+        """
+
+        return await self.run(self.client.get_dependency_graph, **kwargs)
+
+    async def enroll(self, **kwargs: dict[str, str]):
+        """
+        Awaitable version of Client.enroll.
+        """
+
+        await self.run(self.client.enroll, **kwargs)
+
+    async def cancel(self, **kwargs: dict[str, str]):
+        """
+        Awaitable version of Client.cancel.
+        """
+
+        await self.run(self.client.cancel, **kwargs)
+
+    async def dispatch(self, **kwargs: dict[str, str]):
+        """
+        Awaitable version of Client.dispatch.
+        """
+
+        await self.run(self.client.dispatch, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts the thread pool down.
+
+        Keyword arguments:
+            wait: bool, optional, default is True,
+                if True, waits for pending requests.
+        """
+
+        self.executor.shutdown(wait=wait)
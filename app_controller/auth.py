@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+import hmac
+import os
 import re
-from typing import Optional, TextIO
+from typing import Any, Iterable, Optional, TextIO
 from urllib.parse import quote, urlencode
 
-import requests
 from bs4 import BeautifulSoup
 
 from .cache import Cache
+from .cache_policy import DEFAULT_POLICIES, CachePolicy
 from .dumper import dump4mock
 from .exceptions import ExceptionHandler, SignInFailed, SignOutFailed
+from .refresher import Refresher
+from .transport import TIMEOUT, GuardedSession
 
 ###############
 #             #
@@ -39,11 +44,16 @@ class ContextManager:
         return True
 
 
-class Authenticator(Cache, ContextManager):
+class Authenticator(Refresher, Cache, ContextManager):
     """
     Abstraction level handling the authentication and authorization schema to access MyCampus.
     """
 
+    # page probed to check whether a restored session is still signed in
+    probe_url = "https://mycampus.iubh.de/my/"
+    # iterations of the key derivation binding a persisted session to the credentials
+    pbkdf2_iterations = 100_000
+
     @property
     def username(self) -> str:
         return self._username
@@ -53,7 +63,6 @@ class Authenticator(Cache, ContextManager):
         self._username = value
         # cache username
         self["username"] = value
-        self.prolongate("username", 365 * 24 * 3600)
 
     @property
     def password(self) -> str:
@@ -76,6 +85,14 @@ class Authenticator(Cache, ContextManager):
         max_age: int,
         items: Optional[dict] = None,
         destination: Optional[str] = None,
+        policies: Optional[Iterable[CachePolicy]] = DEFAULT_POLICIES,
+        refresh_ahead: Optional[float] = None,
+        refresh_interval: Optional[float] = 60.0,
+        keepalive: Optional[float] = None,
+        pool_sizes: Optional[dict[str, int]] = None,
+        timeout: Optional[tuple[float, float]] = TIMEOUT,
+        retries: int = 2,
+        **kwargs: dict[str, Any],
     ):
         """
         Initliazes internal cache. Can be used as context manager.
@@ -116,9 +133,38 @@ class Authenticator(Cache, ContextManager):
 
             max_len: int,
                 maximum number of records to be held in the cache.
+
+            policies: Iterable[CachePolicy], optional, default is DEFAULT_POLICIES,
+                TTL and size budgets of the cached namespaces.
+
+            refresh_ahead: float, optional, default is None,
+                seconds before expiry at which read records are refreshed
+                in the background, None disables refresh-ahead.
+
+            refresh_interval: float, optional, default is 60.0,
+                seconds between checks for records to be refreshed ahead.
+
+            keepalive: float, optional, default is None,
+                seconds between requests keeping the signed-in session alive,
+                None disables the keepalive.
+
+            pool_sizes: dict[str,int], optional, default is POOL_SIZES,
+                maximum number of pooled connections per host (URL prefix).
+
+            timeout: tuple[float,float], optional, default is TIMEOUT,
+                (connect, read) timeouts of requests in seconds.
+
+            retries: int, optional, default is 2,
+                number of retries of idempotent requests.
+
+            **kwargs: dict[str,Any],
+                further keyword arguments of the Cache class.
         """
 
         ContextManager.__init__(self)
+        Refresher.__init__(
+            self, refresh_ahead=refresh_ahead, refresh_interval=refresh_interval
+        )
         Cache.__init__(
             self,
             *streams,
@@ -130,9 +176,14 @@ class Authenticator(Cache, ContextManager):
             max_age=max_age,
             items=items,
             destination=destination,
+            policies=policies,
+            **kwargs,
         )
-        # start a cookie based session
-        self._session = requests.Session()
+        # start a cookie based session re-authenticated once it has expired
+        self._session = GuardedSession(
+            pool_sizes=pool_sizes, timeout=timeout, retries=retries
+        )
+        self.keepalive = keepalive
         self._session.headers.update(
             {
                 "User-Agent": (
@@ -157,10 +208,152 @@ class Authenticator(Cache, ContextManager):
                     self.get_saml_request()
                 )
             )
+
+        The authentication schema is skipped if a persisted session can be resumed.
         """
+        if self.resume_session():
+            return
         self.submit_saml_response(self.get_saml_response(self.get_saml_request()))
         self.debug("Successfully signed in")
 
+    def credentials_digest(self, salt: bytes) -> bytes:
+        """
+        Derives a key from the credentials, so that a persisted session
+        is only resumed for the credentials it has been established with.
+
+        Positional arguments:
+            salt: bytes,
+                random salt.
+
+        Returns:
+            bytes
+        """
+
+        return hashlib.pbkdf2_hmac(
+            "sha256",
+            f"{self._username}\0{getattr(self, '_password', '')}".encode("utf-8"),
+            salt,
+            self.pbkdf2_iterations,
+        )
+
+    def save_session(self):
+        """
+        Persists the cookie jar of the signed-in session.
+        """
+
+        salt = os.urandom(16)
+        self[f"{self.username}.session"] = {
+            "cookies": [
+                (
+                    cookie.name,
+                    cookie.value,
+                    cookie.domain,
+                    cookie.path,
+                    cookie.expires,
+                    cookie.secure,
+                )
+                for cookie in self._session.cookies
+            ],
+            "salt": salt,
+            "credentials": self.credentials_digest(salt),
+        }
+        self.debug("Persisted session")
+
+    def probe_session(self) -> bool:
+        """
+        Checks whether the session is signed in.
+        MyCampus redirects to the sign-in page otherwise.
+
+        Returns:
+            bool
+        """
+
+        try:
+            response = self._session.get(self.probe_url, allow_redirects=False)
+        except BaseException:
+            self.warning("Failed to probe session")
+            return False
+        return response.status_code == 200 and "login/logout.php" in str(response.text)
+
+    def preconnect(self):
+        """
+        Opens connections to MyCampus, the identity provider and care-fs
+        in the background (e.g. while the sign-in form is displayed).
+        """
+
+        self._session.warm_up()
+
+    def get_connection_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns:
+            dict: number of requests, opened and reused connections per host.
+        """
+
+        return self._session.connection_stats()
+
+    def guard_session(self):
+        """
+        Enables the re-authentication of the signed-in session once it has expired
+        and starts the keepalive if configured.
+        """
+
+        self._session.reauthenticate = self.reauthenticate
+        self.start_keepalive()
+
+    def reauthenticate(self):
+        """
+        Signs in again after the session has expired.
+        Called by the session guard, requests issued meanwhile wait for the sign-in.
+        """
+
+        self.warning("Session has expired, signing in again")
+        self._session.cookies.clear()
+        self.submit_saml_response(self.get_saml_response(self.get_saml_request()))
+
+    def start_keepalive(self):
+        """
+        Starts requesting the probed page periodically (e.g. while the app is
+        in the foreground) if a keepalive interval has been configured.
+        """
+
+        if self.keepalive is not None and self._session.reauthenticate is not None:
+            self._session.start_keepalive(self.probe_url, self.keepalive)
+
+    def stop_keepalive(self):
+        """
+        Stops the keepalive (e.g. while the app is paused).
+        """
+
+        self._session.stop_keepalive()
+
+    def resume_session(self) -> bool:
+        """
+        Restores the persisted cookie jar if it has been established with
+        the current credentials and is still signed in.
+
+        Returns:
+            bool: True if the session has been resumed.
+        """
+
+        record = self.get(f"{self.username}.session")
+        if record is None or not hmac.compare_digest(
+            record["credentials"], self.credentials_digest(record["salt"])
+        ):
+            return False
+        for name, value, domain, path, expires, secure in record["cookies"]:
+            self._session.cookies.set(
+                name, value, domain=domain, path=path, expires=expires, secure=secure
+            )
+        if self.probe_session():
+            self.guard_session()
+            self.debug("Resumed persisted session")
+            return True
+        # session has expired on the server side
+        self._session.cookies.clear()
+        self.pop(f"{self.username}.session")
+        self.debug("Persisted session has expired")
+        return False
+
     @ExceptionHandler("mycamupus.iubh.de was not reachable", SignInFailed)
     def get_saml_request(self) -> str:
         """
@@ -299,6 +492,8 @@ class Authenticator(Cache, ContextManager):
             ),
             True,
         )
+        self.save_session()
+        self.guard_session()
         self.debug("Successfully submitted SAML response")
 
     @ExceptionHandler("sign-out request failed", SignOutFailed)
@@ -307,6 +502,9 @@ class Authenticator(Cache, ContextManager):
         Sends sign-out request.
         """
 
+        # redirects after the sign-out must not cause a re-authentication
+        self._session.reauthenticate = None
+        self.stop_keepalive()
         # scrap logout endpoint to submit a sign-out request
         self.debug("Signing out")
         response = self._session.get("https://mycampus.iubh.de/my/")
@@ -325,6 +523,8 @@ class Authenticator(Cache, ContextManager):
             response.text,
         )
         dump4mock("response.text@session.get(logout)", True)
+        # signed-out session cannot be resumed
+        self.pop(f"{self.username}.session")
         self.debug("Successfully signed out")
 
     def __del__(self):
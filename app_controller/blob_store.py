@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Generator, Iterable, Union
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+class BlobStore:
+    """
+    Content-addressed store of file bodies (e.g. downloaded course materials).
+    Blobs are stored as plain files named by the SHA-256 digest of their content,
+    so identical files are stored once. Blobs are read through memory maps.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Create a blob store instance.
+
+        Positional arguments:
+            root: Union[str,Path],
+                directory holding the blobs, created if not existing.
+        """
+
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        """
+        Resolves the location of a blob.
+
+        Positional arguments:
+            digest: str,
+                SHA-256 hex digest of the content.
+
+        Returns:
+            Path
+        """
+
+        return self.root / digest[:2] / digest
+
+    def __contains__(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def commit(self, source: Path, digest: str) -> str:
+        """
+        Moves a completely written temporary file into the store.
+        The file is discarded if the content is stored already.
+
+        Positional arguments:
+            source: Path,
+                temporary file inside the store directory.
+
+            digest: str,
+                SHA-256 hex digest of the content.
+
+        Returns:
+            str: digest of the content.
+        """
+
+        target = self.path(digest)
+        if target.is_file():
+            source.unlink()
+            # refresh the timestamp used for pruning
+            os.utime(target)
+        else:
+            target.parent.mkdir(exist_ok=True)
+            os.replace(source, target)
+        return digest
+
+    def put(self, content: bytes) -> str:
+        """
+        Stores content.
+
+        Positional arguments:
+            content: bytes,
+                file body.
+
+        Returns:
+            str: digest of the content.
+        """
+
+        digest = hashlib.sha256(content).hexdigest()
+        if digest in self:
+            os.utime(self.path(digest))
+            return digest
+        fd, source = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+        except BaseException:
+            os.unlink(source)
+            raise
+        return self.commit(Path(source), digest)
+
+    def tee(
+        self, chunks: Iterable[bytes], callback: Callable[[str], None]
+    ) -> Generator[bytes, None, None]:
+        """
+        Stores content while it is being streamed.
+        Content is only stored if the stream has been consumed completely.
+
+        Positional arguments:
+            chunks: Iterable[bytes],
+                chunks of the file body.
+
+            callback: Callable[[str],None],
+                called with the digest of the content once it has been stored.
+
+        Returns:
+            Generator[bytes,None,None]: chunks of the file body.
+        """
+
+        digest = hashlib.sha256()
+        fd, source = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    file.write(chunk)
+                    yield chunk
+        except BaseException:
+            os.unlink(source)
+            raise
+        callback(self.commit(Path(source), digest.hexdigest()))
+
+    def read(self, digest: str) -> memoryview:
+        """
+        Maps a blob into memory without copying it.
+
+        Positional arguments:
+            digest: str,
+                SHA-256 hex digest of the content.
+
+        Returns:
+            memoryview: read-only view of the content.
+        """
+
+        with self.path(digest).open("rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # empty files cannot be mapped
+                return memoryview(b"")
+            return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def iter_chunks(self, digest: str, chunk: int) -> Generator[bytes, None, None]:
+        """
+        Reads a blob in chunks.
+
+        Positional arguments:
+            digest: str,
+                SHA-256 hex digest of the content.
+
+            chunk: int,
+                chunk size in bytes.
+
+        Returns:
+            Generator[bytes,None,None]: read-only views of the chunks.
+        """
+
+        content = self.read(digest)
+        for offset in range(0, len(content), chunk):
+            yield content[offset : offset + chunk]
+
+    def prune(self, max_age: float) -> int:
+        """
+        Removes blobs which have not been stored for longer than max_age
+        and leftovers of interrupted writes.
+
+        Positional arguments:
+            max_age: float,
+                TTL of blobs in seconds.
+
+        Returns:
+            int: number of removed blobs.
+        """
+
+        removed, deadline = 0, time.time() - max_age
+        for path in chain(self.root.glob("*/*"), self.root.glob("*.part")):
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                # blob is mapped (Windows) or has been removed in the meantime
+                pass
+        return removed
@@ -1,14 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import os
 import pickle
 import sqlite3
+import struct
+import sys
 import time
-from datetime import datetime
-from typing import Any, Optional, TextIO, Union
+from collections import OrderedDict
+from threading import RLock, Thread, Timer, local
+from pathlib import Path
+from typing import Any, Iterable, Optional, TextIO, Union
 
 from expiringdict import ExpiringDict
 
+from .cache_policy import CachePolicy, resolve_policy
+from .compression import compress, decompress, get_codec
+from .eviction import EvictionPolicy, get_eviction_policy
 from .logger import Logger
+from .metrics import CacheMetrics, to_json, to_prometheus
+from .serialization import deserialize, get_serializer, serialize
 
 ####################
 #                  #
@@ -26,6 +36,55 @@ class Cache(ExpiringDict, Logger):
 
     # class attribute defining database name and location
     destination = ":memory:"
+    # version of the table layout, databases with a different version are recreated
+    schema_version = 8
+    # number of free pages released by a single sweep
+    vacuum_pages = 128
+    # header of snapshot images: magic, image version, schema version, codec
+    SNAPSHOT_HEADER = struct.Struct("<6sHH8s")
+    SNAPSHOT_MAGIC = b"MCSNAP"
+    snapshot_version = 1
+    # SQL statements
+    # constant statement text lets sqlite3 reuse the prepared statements
+    UPSERT = """
+        INSERT INTO Cached(
+            Key, Value, InsertedAt, Codec, AccessedAt, Namespace, Size, Serializer,
+            Prefix
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(Key) DO
+        UPDATE SET
+            Value=excluded.Value,
+            InsertedAt=excluded.InsertedAt,
+            Codec=excluded.Codec,
+            AccessedAt=excluded.AccessedAt,
+            Namespace=excluded.Namespace,
+            Size=excluded.Size,
+            Serializer=excluded.Serializer,
+            Prefix=excluded.Prefix;
+    """
+    # restored records replace older ones only
+    RESTORE = """
+        INSERT INTO Cached(
+            Key, Value, InsertedAt, Codec, AccessedAt, Hits, Namespace, Size, Serializer,
+            Prefix
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(Key) DO
+        UPDATE SET
+            Value=excluded.Value,
+            InsertedAt=excluded.InsertedAt,
+            Codec=excluded.Codec,
+            AccessedAt=excluded.AccessedAt,
+            Hits=excluded.Hits,
+            Namespace=excluded.Namespace,
+            Size=excluded.Size,
+            Serializer=excluded.Serializer,
+            Prefix=excluded.Prefix
+        WHERE excluded.InsertedAt > Cached.InsertedAt;
+    """
+    DELETE = "DELETE FROM Cached WHERE Key = ?;"
+    TOUCH = "UPDATE Cached SET AccessedAt = ?, Hits = ? WHERE Key = ?;"
 
     @staticmethod
     def get_sqlite3_thread_safety(destination: str) -> int:
@@ -67,6 +126,25 @@ class Cache(ExpiringDict, Logger):
         max_age: int,
         items: Optional[dict] = None,
         destination: Optional[str] = None,
+        write_behind: Optional[bool] = False,
+        flush_interval: Optional[float] = 5.0,
+        flush_size: Optional[int] = 32,
+        sweep_every: Optional[int] = 64,
+        sweep_interval: Optional[float] = 60.0,
+        eviction: Union[str, EvictionPolicy] = "lru",
+        warm_up: Optional[int] = 0,
+        compression: Optional[str] = None,
+        compress_threshold: Optional[int] = 4_096,
+        serializer: Optional[str] = "auto",
+        policies: Optional[Iterable[CachePolicy]] = None,
+        max_bytes: Optional[int] = None,
+        max_item_bytes: Optional[int] = None,
+        max_db_bytes: Optional[int] = None,
+        shared: Optional[bool] = False,
+        busy_timeout: Optional[float] = 5.0,
+        sync_interval: Optional[float] = 0.5,
+        pool: Optional[bool] = False,
+        image: Optional[Union[str, Path]] = None,
     ):
         """
         Create a cache instance.
@@ -81,7 +159,8 @@ class Cache(ExpiringDict, Logger):
                 TTL for records to cache in seconds.
 
             max_len: int,
-                maximum number of records to be held in the cache.
+                maximum number of records of a namespace held in each tier,
+                unless the policy of the namespace declares an own budget.
 
             items: dict, optional,
                 items to be copied from.
@@ -89,13 +168,87 @@ class Cache(ExpiringDict, Logger):
             destination: str,
                 location of the internal database.
 
+            write_behind: bool, optional, default is False,
+                if True, writes are queued and persisted in batched transactions.
+
+            flush_interval: float, optional, default is 5.0,
+                seconds after which queued writes are flushed (write-behind mode).
+
+            flush_size: int, optional, default is 32,
+                number of queued writes triggering a flush (write-behind mode).
+
+            sweep_every: int, optional, default is 64,
+                number of writes after which expired records are swept from the database.
+
+            sweep_interval: float, optional, default is 60.0,
+                seconds after which expired records are swept on the next write.
+
+            eviction: Union[str,EvictionPolicy], optional, default is "lru",
+                policy selecting records to be evicted from both tiers
+                ("lru", "lfu", "ttl" or an instance of EvictionPolicy).
+
+            warm_up: int, optional, default is 0,
+                number of persisted records loaded into memory by a background
+                thread (in the order of the eviction policy).
+                Other records are loaded lazily on first access.
+
+            compression: str, optional, default is None,
+                codec used to compress persisted values ("zlib", "lzma", "bz2"),
+                None disables compression.
+
+            compress_threshold: int, optional, default is 4_096,
+                minimal size of a serialized value to be compressed in bytes.
+
+            serializer: str, optional, default is "auto",
+                serializer of persisted values ("pickle", "pickle5", "marshal"),
+                "auto" uses marshal for values consisting of builtin types
+                and pickle otherwise.
+
+            policies: Iterable[CachePolicy], optional, default is None,
+                TTL and size budgets of key namespaces,
+                keys not matching any policy use max_age and max_len,
+                policies without a size budget use max_len.
+
+            max_bytes: int, optional, default is None,
+                budget of the in-memory tier in bytes of serialized values,
+                records are evicted in the order of the eviction policy to keep it,
+                None denotes no limit.
+
+            max_item_bytes: int, optional, default is None,
+                size of a serialized value in bytes above which the value is not
+                held in memory, but served from the database only,
+                None denotes no limit.
+
+            max_db_bytes: int, optional, default is None,
+                budget of the database tier in bytes of serialized values,
+                kept by sweeps in the order of the eviction policy,
+                values exceeding the whole budget are not cached at all,
+                None denotes no limit.
+
+            shared: bool, optional, default is False,
+                if True, the database is shared with other processes:
+                it is switched to WAL mode and records held in memory
+                are invalidated once another process has changed the database.
+
+            busy_timeout: float, optional, default is 5.0,
+                seconds to wait for a lock held by another connection.
+
+            sync_interval: float, optional, default is 0.5,
+                seconds between checks for changes of other processes (shared mode).
+
+            pool: bool, optional, default is False,
+                if True, reads are served by a connection per thread (WAL mode),
+                running in parallel to each other and to the single writer,
+                ignored for in-memory databases.
+
+            image: Union[str,Path], optional, default is None,
+                snapshot image restored at startup if it exists (see Cache.snapshot).
+
             **kwargs:
                 Keyword arguments of Logger class.
 
         """
-        ExpiringDict.__init__(
-            self, max_len=max_len, max_age_seconds=max_age, items=items
-        )
+        ExpiringDict.__init__(self, max_len=max_len, max_age_seconds=max_age)
         Logger.__init__(
             self,
             *streams,
@@ -104,9 +257,65 @@ class Cache(ExpiringDict, Logger):
             emit=emit,
             verbose=verbose,
         )
+        # event counters per tier and namespace, latency histograms
+        self.metrics = CacheMetrics()
+        # queue of pending writes (write-behind mode), None denotes a removal
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.pending = OrderedDict()
+        self.flush_timer = None
+        # serializes access to the database connection and the queue
+        self.db_lock = RLock()
+        # amortized expiration of persisted records
+        self.sweep_every = sweep_every
+        self.sweep_interval = sweep_interval
+        self.writes = 0
+        self.swept_at = time.time()
+        # access statistics shared by both tiers: key -> [accessed at, hits]
+        self.eviction = get_eviction_policy(eviction)
+        self.access = {}
+        # keys with access statistics not persisted yet
+        self.touched = set()
+        # compression of persisted values, the codec is recorded per row
+        self.compression = get_codec(compression)
+        self.compress_threshold = compress_threshold
+        # serialization of persisted values, the serializer is recorded per row
+        self.serializer = get_serializer(serializer)
+        # policies per key namespace, resolved policies are memoized per key
+        self.policies = tuple(policies or ())
+        self.default_policy = CachePolicy("", max_age=max_age, max_len=max_len)
+        self.namespaces = {}
+        # key prefixes (e.g. usernames) memoized per key
+        self.prefixes = {}
+        # byte budgets, sizes of serialized values held in memory
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.max_db_bytes = max_db_bytes
+        self.sizes = {}
+        # keys held in memory per namespace and per prefix (ordered sets)
+        # and their total size
+        self.members = {}
+        self.prefixed = {}
+        self.used = 0
+        # detection of changes made by other processes
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self.synced_at = 0.0
+        self.data_version = None
+        # reading connections per thread
+        self.busy_timeout = busy_timeout
+        self.readers = local()
         if destination:
             self.destination = destination
-        if Cache.get_sqlite3_thread_safety(self.destination) == 3:
+        # the connection is shared with the flushing thread in write-behind mode,
+        # with the warming thread and with the readers of the pool
+        if (
+            Cache.get_sqlite3_thread_safety(self.destination) == 3
+            or write_behind
+            or warm_up
+            or pool
+        ):
             check_same_thread = False
         else:
             check_same_thread = True
@@ -117,6 +326,8 @@ class Cache(ExpiringDict, Logger):
                 check_same_thread=check_same_thread,
                 # disable database isolation to enable parallel access
                 isolation_level=None,
+                # wait for locks held by other connections
+                timeout=busy_timeout,
             )
         except BaseException:
             self.destination = ":memory:"
@@ -124,130 +335,1256 @@ class Cache(ExpiringDict, Logger):
                 self.destination,
                 check_same_thread=check_same_thread,
                 isolation_level=None,
+                timeout=busy_timeout,
             )
         finally:
-            self.debug("Caching into: %s" % self.destination)
+            self.debug("Caching into: %s", self.destination)
             cursor = self.conn.cursor()
+            # cached records are disposable, drop an outdated table layout
+            if (
+                cursor.execute("PRAGMA user_version;").fetchone()[0]
+                != self.schema_version
+            ):
+                cursor.execute("DROP TRIGGER IF EXISTS Cleaner;")
+                cursor.execute("DROP TABLE IF EXISTS Cached;")
+                # allow sweeps to release free pages (takes effect after VACUUM)
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+                cursor.execute("VACUUM;")
+                cursor.execute("PRAGMA user_version = %d;" % self.schema_version)
             # create table object for cached entries
+            # values are stored as (compressed) serialized bytes,
+            # timestamps as UNIX epoch, Size is the length of the serialized value,
+            # Prefix is the owner of the key (see CachePolicy.prefix)
             cursor.execute(
                 """
                 CREATE TABLE IF NOT EXISTS Cached(
-                    Key TEXT PRIMARY KEY, 
+                    Key TEXT PRIMARY KEY,
                     Value BLOB NOT NULL,
-                    InsertedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                    InsertedAt REAL NOT NULL,
+                    Codec TEXT NOT NULL DEFAULT 'none',
+                    AccessedAt REAL NOT NULL DEFAULT 0,
+                    Hits INTEGER NOT NULL DEFAULT 0,
+                    Namespace TEXT NOT NULL DEFAULT '',
+                    Size INTEGER NOT NULL DEFAULT 0,
+                    Serializer TEXT NOT NULL DEFAULT 'pickle',
+                    Prefix TEXT NOT NULL DEFAULT ''
                 );
             """
             )
-            # create trigger to implement automatic expiration of cached records
-            # trigger implements both constraints: max_age and max_len
-            # trigged by an upsert operation
+            # index used to expire and evict records without a full table scan
             cursor.execute(
-                f"""
-                CREATE TRIGGER IF NOT EXISTS Cleaner
-                BEFORE INSERT ON Cached
-                BEGIN
-                    DELETE FROM Cached
-                    WHERE Key in (
-                        SELECT Key FROM Cached 
-                        WHERE InsertedAt < datetime(CURRENT_TIMESTAMP, '-{max_age} seconds')
-                    );
-                    DELETE FROM Cached
-                    WHERE Key in (
-                        SELECT Key FROM Cached 
-                        LIMIT -1 OFFSET {max_len}
-                    );
-                END;
+                """
+                CREATE INDEX IF NOT EXISTS CachedInsertedAt ON Cached(InsertedAt);
             """
             )
-            # load entries available in cache
-            cursor = self.conn.cursor()
+            # index used to look up the records of a key prefix
             cursor.execute(
-                f"""
-                SELECT Key, Value FROM Cached
-                WHERE InsertedAt >= datetime(CURRENT_TIMESTAMP, '-{max_age} seconds');
+                """
+                CREATE INDEX IF NOT EXISTS CachedPrefix ON Cached(Prefix);
             """
             )
-            results = cursor.fetchall()
-            for result in results:
-                key, value = result
-                # will trigger the SQL trigger automatically
-                self[key] = pickle.loads(bytes.fromhex(value))
+            # index used to evict records of a namespace
+            # in the order of the eviction policy
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS CachedNamespace%s ON Cached(Namespace, %s);"
+                % ("".join(self.eviction.index), ", ".join(self.eviction.index))
+            )
+            # covering index used to keep the byte budget
+            # without reading the stored values
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS CachedSize%s ON Cached(%s, Size);"
+                % ("".join(self.eviction.index), ", ".join(self.eviction.index))
+            )
+            self.pool = pool and self.destination != ":memory:"
+            if shared or self.pool:
+                # readers do not block writers and vice versa
+                cursor.execute("PRAGMA journal_mode = WAL;").fetchall()
+                cursor.execute("PRAGMA synchronous = NORMAL;")
+                self.data_version = cursor.execute("PRAGMA data_version;").fetchone()[0]
+            # expire records left over from the previous session
+            self.sweep()
+        if image is not None and Path(image).is_file():
+            self.restore(image)
+        # persisted records are not decoded at startup
+        self.warming = None
+        if warm_up:
+            self.warming = Thread(
+                target=self.warm, args=(min(warm_up, max_len),), daemon=True
+            )
+            self.warming.start()
+        if items:
+            self.update(items)
 
-    def __getitem__(self, __k: str, __d: Any = None) -> Any:
+    def __getitem__(self, __k: str, with_age: bool = False) -> Any:
         """
         Reimplementaion of dict.__getitem__.
+        Read-through lookup: the in-memory tier is queried first,
+        the SQLite tier only on a miss. Values found in the database are
+        promoted into the in-memory tier.
         """
 
-        # Find record in the SQLite databse
-        cursor = self.conn.cursor()
-        cursor.execute(
-            f"""
-            SELECT Value FROM Cached
-            WHERE Key='{__k}' AND 
-            InsertedAt >= datetime(CURRENT_TIMESTAMP, '-{self.max_age} seconds');
+        started = time.perf_counter()
+        try:
+            return self.lookup(__k, with_age)
+        finally:
+            self.metrics.observe("get", time.perf_counter() - started)
+
+    def lookup(self, __k: str, with_age: bool = False) -> Any:
         """
-        )
-        result = cursor.fetchone()
+        Looks up a record in both tiers and counts hits, misses and expirations.
+
+        Positional arguments:
+            __k: str,
+                item id.
+
+        Keyword arguments:
+            with_age: bool, optional, default is False,
+                if True, the age of the record is returned along with the value.
+
+        Returns:
+            Any
+        """
+
+        if self.shared and time.time() - self.synced_at >= self.sync_interval:
+            self.sync()
+        namespace = self.get_policy(__k).name
+        # Look up the in-memory tier
+        held = OrderedDict.__contains__(self, __k)
+        try:
+            __v = ExpiringDict.__getitem__(self, __k, with_age)
+        except KeyError:
+            self.metrics.count("memory", namespace, "misses")
+            if held:
+                self.metrics.count("memory", namespace, "expirations")
+        else:
+            self.metrics.count("memory", namespace, "hits")
+            self.touch(__k)
+            self.debug("Retrieved from memory: %s@%d(%s)", __k, id(__v), type(__v))
+            return __v
+
+        with self.db_lock:
+            queued = __k in self.pending
+            if queued:
+                # Find record in the queue of pending writes
+                result = self.pending[__k]
+                if result is not None and result[1] < time.time() - self.max_age:
+                    result = None
+            elif not self.pool:
+                # Find record in the SQLite databse
+                result = self.fetch(self.conn, __k)
+        if not queued:
+            if self.pool:
+                # readers of the pool do not wait for the writer
+                result = self.fetch(self.reader(), __k)
+            if result is not None and __k not in self.access:
+                # restore persisted access statistics
+                self.access[__k] = [result[3], result[4]]
 
         if result is None:
+            self.metrics.count("database", namespace, "misses")
             raise KeyError(__k)
 
-        # Compare retrieved reference with the internal one
-        __s = pickle.loads(bytes.fromhex(result[0]))
-        __i = super().__getitem__(__k, __d)
-        # reference mismatch
-        if id(__s) != id(__i):
-            # mitigate reference mismatch (divergent memory address allocations)
-            __s = __i
-        self.debug("Retrieved from cache: %s@%d(%s)" % (__k, id(__s), type(__s)))
-        return __s
+        self.metrics.count("database", namespace, "hits")
+        if not self.admissible(result[5]):
+            # oversized values are served from the database only
+            __v = self.decode(result[0], result[2], result[6])
+            self.touch(__k)
+            self.debug("Retrieved from database: %s@%d(%s)", __k, id(__v), type(__v))
+            return (__v, time.time() - result[1]) if with_age else __v
+        # Promote record into the in-memory tier
+        self.admit(
+            __k, self.decode(result[0], result[2], result[6]), result[1], result[5]
+        )
+        self.touch(__k)
+        __v = ExpiringDict.__getitem__(self, __k, with_age)
+        self.debug("Retrieved from database: %s@%d(%s)", __k, id(__v), type(__v))
+        return __v
+
+    def __contains__(self, __k: str) -> bool:
+        """
+        Reimplementation of ExpiringDict.__contains__.
+        Consistent with __getitem__: unexpired records persisted in the database
+        are found even if they have not been loaded into memory yet.
+        """
+
+        if self.shared and time.time() - self.synced_at >= self.sync_interval:
+            self.sync()
+        if ExpiringDict.__contains__(self, __k):
+            return True
+        deadline = time.time() - self.max_age
+        with self.db_lock:
+            if __k in self.pending:
+                record = self.pending[__k]
+                return record is not None and record[1] >= deadline
+            if not self.pool:
+                return self.exists(self.conn, __k, deadline)
+        return self.exists(self.reader(), __k, deadline)
+
+    @staticmethod
+    def exists(conn: sqlite3.Connection, key: str, deadline: float) -> bool:
+        """
+        Checks whether an unexpired record is persisted in the database.
+
+        Positional arguments:
+            conn: sqlite3.Connection,
+                connection to read from.
+
+            key: str,
+                item id.
+
+            deadline: float,
+                insertion timestamp of the oldest unexpired record.
+
+        Returns:
+            bool
+        """
+
+        return (
+            conn.execute(
+                "SELECT 1 FROM Cached WHERE Key = ? AND InsertedAt >= ?;",
+                (key, deadline),
+            ).fetchone()
+            is not None
+        )
 
     def __setitem__(self, __k: str, __v: Any, set_time: float = None):
         """
         Implementation of dict.__setitem__.
         """
 
+        started = time.perf_counter()
+        try:
+            self.store(__k, __v, set_time)
+        finally:
+            self.metrics.observe("set", time.perf_counter() - started)
+
+    def store(self, __k: str, __v: Any, set_time: Optional[float] = None):
+        """
+        Stores a record in both tiers
+        (in memory only if the namespace is not persistent).
+
+        Positional arguments:
+            __k: str,
+                item id.
+
+            __v: Any,
+                item value.
+
+        Keyword arguments:
+            set_time: float, optional, default is now,
+                insertion timestamp.
+        """
+
+        now = time.time()
+        policy = self.get_policy(__k)
+        if set_time is None:
+            set_time = now
+            if policy.max_age is not None:
+                # records of namespaces with an own TTL are prolongated
+                set_time += policy.max_age - self.max_age
+        if policy.persistent:
+            __b, codec, size, serializer = self.encode(__v)
+            admitted = self.max_db_bytes is None or size <= self.max_db_bytes
+        else:
+            try:
+                size = len(pickle.dumps(__v, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception:
+                # value cannot be pickled, e.g. a session object
+                size = sys.getsizeof(__v)
+            admitted = self.admissible(size)
+        if not admitted:
+            # the previous value must not be served anymore
+            try:
+                self.__delitem__(__k)
+            except KeyError:
+                pass
+            self.warning("Rejected oversized value: %s (%d bytes)", __k, size)
+            return
         # Update inner state
-        ExpiringDict.__setitem__(self, __k, __v, set_time)
+        if self.admissible(size):
+            self.admit(__k, __v, set_time, size)
+        else:
+            self.demote(__k)
+            self.debug("Demoted oversized value: %s (%d bytes)", __k, size)
+        # a write counts as access, the access count is kept
+        self.access.setdefault(__k, [now, 0])[0] = now
+        if not policy.persistent:
+            self.debug("Cached in memory: %s@%d(%s)", __k, id(__v), type(__v))
+            return
         # Dump into database
-        cursor = self.conn.cursor()
-        # SQL statement wil trigger SQL trigger
-        cursor.execute(
+        with self.db_lock:
+            if self.write_behind:
+                self.enqueue(
+                    __k,
+                    (
+                        __b,
+                        set_time,
+                        codec,
+                        now,
+                        policy.name,
+                        size,
+                        serializer,
+                        self.get_prefix(__k),
+                    ),
+                )
+            else:
+                self.conn.cursor().execute(
+                    self.UPSERT,
+                    (
+                        __k,
+                        __b,
+                        set_time,
+                        codec,
+                        now,
+                        policy.name,
+                        size,
+                        serializer,
+                        self.get_prefix(__k),
+                    ),
+                )
+                self.writes += 1
+                if self.sweep_due:
+                    self.sweep()
+        self.debug("Cached: %s@%d(%s)", __k, id(__v), type(__v))
+
+    def __delitem__(self, __k: str):
+        """
+        Implementation of dict.__delitem__.
+        """
+
+        # Update inner state (record might have been evicted from memory already)
+        in_memory = self.release(__k)
+        self.access.pop(__k, None)
+        self.touched.discard(__k)
+        with self.db_lock:
+            if self.write_behind:
+                # record is known if it is queued or persisted
+                in_database = (
+                    self.pending.get(__k) is not None
+                    or __k not in self.pending
+                    and self.conn.execute(
+                        "SELECT 1 FROM Cached WHERE Key = ?;", (__k,)
+                    ).fetchone()
+                    is not None
+                )
+                self.enqueue(__k, None)
+            else:
+                in_database = (
+                    self.conn.cursor().execute(self.DELETE, (__k,)).rowcount > 0
+                )
+        if not in_memory and not in_database:
+            raise KeyError(__k)
+        self.debug("Removed: %s", __k)
+
+    def warm(self, count: int):
+        """
+        Loads persisted records into the in-memory tier
+        in the order of the eviction policy. Records which have been
+        accessed or modified in the meantime are skipped.
+
+        Positional arguments:
+            count: int,
+                maximum number of records to be loaded.
+        """
+
+        with self.db_lock:
+            keys = [
+                key
+                for key, in self.conn.execute(
+                    """
+                    SELECT Key FROM Cached
+                    WHERE InsertedAt >= ?
+                    ORDER BY %s
+                    LIMIT ?;
+                """
+                    % self.eviction.order_by,
+                    (time.time() - self.max_age, count),
+                )
+            ]
+        warmed = 0
+        for key in keys:
+            with self.lock:
+                if OrderedDict.__contains__(self, key):
+                    continue
+                with self.db_lock:
+                    if key in self.pending:
+                        continue
+                    result = self.fetch(self.conn, key)
+                if result is None or not self.admissible(result[5]):
+                    continue
+                self.access.setdefault(key, [result[3], result[4]])
+                self.admit(
+                    key,
+                    self.decode(result[0], result[2], result[6]),
+                    result[1],
+                    result[5],
+                )
+                warmed += 1
+        self.debug("Warmed up %d cached records", warmed)
+
+    def reader(self) -> sqlite3.Connection:
+        """
+        Provides the connection reading from the database in the current thread.
+        Connections of the pool are opened on first use and closed
+        along with their thread.
+
+        Returns:
+            sqlite3.Connection
+        """
+
+        if not self.pool:
+            return self.conn
+        conn = getattr(self.readers, "conn", None)
+        if conn is None:
+            conn = self.readers.conn = sqlite3.connect(
+                self.destination, isolation_level=None, timeout=self.busy_timeout
+            )
+            conn.execute("PRAGMA query_only = ON;")
+        return conn
+
+    def fetch(
+        self, conn: sqlite3.Connection, key: str
+    ) -> Optional[tuple[bytes, float, str, float, int, int, str]]:
+        """
+        Reads an unexpired record from the database.
+
+        Positional arguments:
+            conn: sqlite3.Connection,
+                connection to read from.
+
+            key: str,
+                item id.
+
+        Returns:
+            Optional[tuple[bytes,float,str,float,int,int,str]]: stored value,
+                insertion timestamp, codec, access timestamp, hits,
+                size of the serialized value and serializer.
+        """
+
+        return conn.execute(
             """
-            INSERT INTO Cached(Key, Value, InsertedAt)
-            VALUES('{key}', '{value}', '{now}')
-            ON CONFLICT DO
-            UPDATE SET Value='{value}';
-            """.format(
-                key=__k,
-                value=pickle.dumps(__v, protocol=pickle.HIGHEST_PROTOCOL).hex(),
-                now=(
-                    datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                    if set_time is None
-                    else datetime.fromtimestamp(set_time).strftime("%Y-%m-%d %H:%M:%S")
-                ),
+            SELECT Value, InsertedAt, Codec, AccessedAt, Hits, Size, Serializer
+            FROM Cached
+            WHERE Key = ? AND InsertedAt >= ?;
+        """,
+            (key, time.time() - self.max_age),
+        ).fetchone()
+
+    def encode(self, value: Any) -> tuple[bytes, str, int, str]:
+        """
+        Serializes a value to be persisted.
+
+        Positional arguments:
+            value: Any,
+                item value.
+
+        Returns:
+            tuple[bytes,str,int,str]: (compressed) serialized value,
+                name of the codec, size of the serialized value
+                and name of the serializer.
+        """
+
+        data, serializer = serialize(value, self.serializer)
+        return (
+            *compress(data, self.compression, self.compress_threshold),
+            len(data),
+            serializer,
+        )
+
+    def decode(self, data: bytes, codec: str, serializer: str = "pickle") -> Any:
+        """
+        Deserializes a persisted value.
+
+        Positional arguments:
+            data: bytes,
+                (compressed) serialized value.
+
+            codec: str,
+                name of the codec used to compress the value.
+
+        Keyword arguments:
+            serializer: str, optional, default is "pickle",
+                name of the serializer used to serialize the value.
+
+        Returns:
+            Any
+        """
+
+        return deserialize(decompress(data, codec), serializer)
+
+    def get_policy(self, key: str) -> CachePolicy:
+        """
+        Resolves the policy of the namespace a key belongs to.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+        Returns:
+            CachePolicy
+        """
+
+        try:
+            return self.namespaces[key]
+        except KeyError:
+            policy = self.namespaces[key] = resolve_policy(
+                self.policies, key, self.default_policy
             )
+            return policy
+
+    def get_prefix(self, key: str) -> str:
+        """
+        Resolves the prefix of a key (e.g. the username of "<username>.grades").
+
+        Positional arguments:
+            key: str,
+                item id.
+
+        Returns:
+            str
+        """
+
+        try:
+            return self.prefixes[key]
+        except KeyError:
+            prefix = self.prefixes[key] = self.get_policy(key).prefix(key)
+            return prefix
+
+    def policy(self, name: str) -> CachePolicy:
+        """
+        Looks up a declared policy by the name of its namespace.
+        Raises KeyError if no policy of that name is declared.
+
+        Positional arguments:
+            name: str,
+                name of the namespace.
+
+        Returns:
+            CachePolicy
+        """
+
+        for policy in (*self.policies, self.default_policy):
+            if policy.name == name:
+                return policy
+        raise KeyError(name)
+
+    def budget(self, policy: CachePolicy) -> int:
+        """
+        Maximum number of records of a namespace held in each tier.
+
+        Positional arguments:
+            policy: CachePolicy,
+                policy of the namespace.
+
+        Returns:
+            int
+        """
+
+        return self.max_len if policy.max_len is None else policy.max_len
+
+    def admissible(self, size: int) -> bool:
+        """
+        Admission policy of the in-memory tier.
+
+        Positional arguments:
+            size: int,
+                size of the serialized value in bytes.
+
+        Returns:
+            bool: False if the value is too large to be held in memory.
+        """
+
+        return (self.max_item_bytes is None or size <= self.max_item_bytes) and (
+            self.max_bytes is None or size <= self.max_bytes
         )
-        self.debug("Cached: %s@%d(%s)" % (__k, id(__v), type(__v)))
 
-    def __delitem__(self, __k: str):
+    def admit(self, key: str, value: Any, set_time: float, size: int = 0):
         """
-        Implementation of dict.__delitem__.
+        Inserts a record into the in-memory tier.
+        If the budget of its namespace is exhausted, the victim selected
+        by the eviction policy among the records of the namespace is demoted
+        (removed from memory, but kept in the database).
+        Records are demoted in the order of the eviction policy
+        as long as the byte budget of the tier would be exceeded.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+            value: Any,
+                item value.
+
+            set_time: float,
+                insertion timestamp.
+
+        Keyword arguments:
+            size: int, optional, default is 0,
+                size of the serialized value in bytes.
         """
 
-        # Update inner state
-        ExpiringDict.__delitem__(self, __k)
-        cursor = self.conn.cursor()
-        # SQL statement wil trigger SQL trigger
-        cursor.execute(
+        policy = self.get_policy(key)
+        with self.lock:
+            if not OrderedDict.__len__(self):
+                # the tier might have been cleared bypassing release
+                self.members.clear()
+                self.prefixed.clear()
+                self.sizes.clear()
+                self.used = 0
+            members = self.members.setdefault(policy.name, {})
+            if not self.release(key) and len(members) >= self.budget(policy):
+                # only the records of the namespace are ranked
+                self.release(
+                    self.eviction.victim(
+                        (k, set_time, *self.access.get(k, (set_time, 0)))
+                        for k, set_time in (
+                            (k, OrderedDict.__getitem__(self, k)[1]) for k in members
+                        )
+                    )
+                )
+                self.metrics.count("memory", policy.name, "evictions")
+            if self.max_bytes is not None:
+                while self.used + size > self.max_bytes and OrderedDict.__len__(self):
+                    victim = self.eviction.victim(
+                        (k, record[1], *self.access.get(k, (record[1], 0)))
+                        for k, record in OrderedDict.items(self)
+                    )
+                    self.release(victim)
+                    self.metrics.count(
+                        "memory", self.get_policy(victim).name, "evictions"
+                    )
+            # bypasses the FIFO eviction of ExpiringDict
+            OrderedDict.__setitem__(self, key, (value, set_time))
+            members[key] = None
+            self.prefixed.setdefault(self.get_prefix(key), {})[key] = None
+            self.sizes[key] = size
+            self.used += size
+
+    def release(self, key: str) -> bool:
+        """
+        Removes a record from the in-memory tier
+        and updates the accounting of its namespace.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+        Returns:
+            bool: True if the record has been held in memory.
+        """
+
+        with self.lock:
+            try:
+                OrderedDict.__delitem__(self, key)
+            except KeyError:
+                return False
+            self.members.get(self.get_policy(key).name, {}).pop(key, None)
+            self.prefixed.get(self.get_prefix(key), {}).pop(key, None)
+            self.used -= self.sizes.pop(key, 0)
+            return True
+
+    def demote(self, key: str):
+        """
+        Removes a record from the in-memory tier only.
+
+        Positional arguments:
+            key: str,
+                item id.
+        """
+
+        self.release(key)
+
+    def touch(self, key: str):
+        """
+        Updates access statistics of a record.
+        The statistics are persisted on the next flush or sweep.
+
+        Positional arguments:
+            key: str,
+                item id.
+        """
+
+        stats = self.access.setdefault(key, [0.0, 0])
+        stats[0] = time.time()
+        stats[1] += 1
+        self.touched.add(key)
+
+    def persist_access(self, cursor: sqlite3.Cursor):
+        """
+        Persists access statistics collected since the last call.
+
+        Positional arguments:
+            cursor: sqlite3.Cursor,
+                database cursor.
+        """
+
+        touched, self.touched = self.touched, set()
+        cursor.executemany(
+            self.TOUCH,
+            ((*self.access[key], key) for key in touched if key in self.access),
+        )
+
+    def enqueue(
+        self,
+        key: str,
+        record: Optional[tuple[bytes, float, str, float, str, int, str]],
+    ):
+        """
+        Queues a pending write (write-behind mode).
+        Flushes the queue if the size threshold has been reached,
+        otherwise makes sure a flush has been scheduled.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+            record: Optional[tuple[bytes, float, str, float, str, int, str, str]],
+                serialized value, insertion timestamp, codec, access timestamp,
+                namespace, size of the serialized value, serializer and key prefix,
+                None for a removal.
+        """
+
+        with self.db_lock:
+            # keep only the latest write per key
+            self.pending.pop(key, None)
+            self.pending[key] = record
+            if len(self.pending) >= self.flush_size:
+                self.flush()
+            elif self.flush_timer is None:
+                self.flush_timer = Timer(self.flush_interval, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def flush(self):
+        """
+        Persists all pending writes and access statistics in a single transaction.
+        Does nothing if there is nothing to persist.
+        """
+
+        started = time.perf_counter()
+        with self.db_lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if not self.pending and not self.touched:
+                return
+            pending, self.pending = self.pending, OrderedDict()
+            cursor = self.conn.cursor()
+            try:
+                # take the write lock upfront, a deferred transaction
+                # cannot wait for writers of other processes
+                cursor.execute("BEGIN IMMEDIATE;")
+                cursor.executemany(
+                    self.UPSERT,
+                    (
+                        (key, *record)
+                        for key, record in pending.items()
+                        if record is not None
+                    ),
+                )
+                cursor.executemany(
+                    self.DELETE,
+                    ((key,) for key, record in pending.items() if record is None),
+                )
+                self.persist_access(cursor)
+                cursor.execute("COMMIT;")
+                self.writes += len(pending)
+                if self.sweep_due:
+                    self.sweep()
+            except BaseException:
+                if self.conn.in_transaction:
+                    cursor.execute("ROLLBACK;")
+                # requeue writes which have not been overwritten in the meantime
+                pending.update(self.pending)
+                self.pending = pending
+                self.error("Failed to flush %d cached records", len(pending))
+                raise
+            finally:
+                self.metrics.observe("flush", time.perf_counter() - started)
+        self.debug("Flushed %d cached records", len(pending))
+
+    @property
+    def sweep_due(self) -> bool:
+        """
+        Indicates whether a sweep of the database is due.
+
+        Returns:
+            bool
+        """
+
+        return (
+            self.writes >= self.sweep_every
+            or time.time() - self.swept_at >= self.sweep_interval
+        )
+
+    def sweep(self):
+        """
+        Removes expired records and records exceeding the budget
+        of their namespace (in the order of the eviction policy)
+        from the database. Both use an index.
+        Releases a bounded number of free pages afterwards.
+        """
+
+        with self.db_lock:
+            cursor = self.conn.cursor()
+            self.persist_access(cursor)
+            deadline = time.time() - self.max_age
+            expired = cursor.execute(
+                """
+                SELECT Namespace, COUNT(*) FROM Cached
+                WHERE InsertedAt < ?
+                GROUP BY Namespace;
+            """,
+                (deadline,),
+            ).fetchall()
+            cursor.execute("DELETE FROM Cached WHERE InsertedAt < ?;", (deadline,))
+            evicted = [
+                (
+                    policy.name,
+                    cursor.execute(
+                        """
+                    DELETE FROM Cached
+                    WHERE Key IN (
+                        SELECT Key FROM Cached
+                        WHERE Namespace = ?
+                        ORDER BY %s
+                        LIMIT -1 OFFSET ?
+                    );
+                    """
+                        % self.eviction.order_by,
+                        (policy.name, self.budget(policy)),
+                    ).rowcount,
+                )
+                for policy in (self.default_policy, *self.policies)
+            ]
+            if (
+                self.max_db_bytes is not None
+                and cursor.execute("SELECT TOTAL(Size) FROM Cached;").fetchone()[0]
+                > self.max_db_bytes
+            ):
+                # records beyond the byte budget in the order of the eviction policy
+                # (both queries are answered by the covering index)
+                victims = [
+                    rowid
+                    for rowid, in cursor.execute(
+                        """
+                        SELECT rowid FROM (
+                            SELECT rowid, SUM(Size) OVER (
+                                ORDER BY %s ROWS UNBOUNDED PRECEDING
+                            ) AS Total
+                            FROM Cached
+                        )
+                        WHERE Total > ?;
+                        """
+                        % self.eviction.order_by,
+                        (self.max_db_bytes,),
+                    )
+                ]
+                for i in range(0, len(victims), 500):
+                    chunk = victims[i : i + 500]
+                    placeholders = ", ".join("?" * len(chunk))
+                    evicted.extend(
+                        cursor.execute(
+                            """
+                            SELECT Namespace, COUNT(*) FROM Cached
+                            WHERE rowid IN (%s)
+                            GROUP BY Namespace;
+                            """
+                            % placeholders,
+                            chunk,
+                        ).fetchall()
+                    )
+                    cursor.execute(
+                        "DELETE FROM Cached WHERE rowid IN (%s);" % placeholders, chunk
+                    )
+            cursor.execute(
+                "PRAGMA incremental_vacuum(%d);" % self.vacuum_pages
+            ).fetchall()
+            self.writes, self.swept_at = 0, time.time()
+            # keep access statistics and policies of records held in memory only
+            in_memory = set(OrderedDict.keys(self))
+            for memo in (self.access, self.namespaces, self.prefixes, self.sizes):
+                for key in list(memo):
+                    if key not in in_memory:
+                        memo.pop(key, None)
+            for event, counts in (("expirations", expired), ("evictions", evicted)):
+                for namespace, count in counts:
+                    if count > 0:
+                        self.metrics.count("database", namespace, event, count)
+        self.debug(
+            "Swept %d expired and %d evicted records",
+            sum(count for _, count in expired),
+            sum(count for _, count in evicted),
+        )
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Hit/miss counters per tier summed over all namespaces.
+
+        Returns:
+            dict[str,dict[str,int]]
+        """
+
+        stats = {
+            "memory": {"hits": 0, "misses": 0},
+            "database": {"hits": 0, "misses": 0},
+        }
+        for (tier, _), counter in list(self.metrics.counters.items()):
+            for event in stats[tier]:
+                stats[tier][event] += counter[event]
+        return stats
+
+    def get_metrics(self) -> dict:
+        """
+        Collects counters, latency histograms and the current number of records
+        and bytes per tier and namespace. Bytes of the in-memory tier
+        are measured by the size of the serialized values,
+        bytes of the database tier by the size of the stored values.
+
+        Returns:
+            dict: see CacheMetrics.snapshot.
+        """
+
+        gauges = {}
+        with self.lock:
+            records = list(OrderedDict.items(self))
+        for key, _ in records:
+            gauge = gauges.setdefault(
+                ("memory", self.get_policy(key).name), {"records": 0, "bytes": 0}
+            )
+            gauge["records"] += 1
+            gauge["bytes"] += self.sizes.get(key, 0)
+        with self.db_lock:
+            for namespace, count, size in self.conn.execute(
+                """
+                SELECT Namespace, COUNT(*), TOTAL(LENGTH(Value)) FROM Cached
+                GROUP BY Namespace;
             """
-            DELETE FROM Cached
-            WHERE Key = '{key}';
-            """.format(
-                key=__k
+            ):
+                gauges[("database", namespace)] = {
+                    "records": count,
+                    "bytes": int(size),
+                }
+        return self.metrics.snapshot(gauges)
+
+    def dump_metrics(self, fmt: Optional[str] = "json") -> str:
+        """
+        Dumps the metrics of the cache.
+
+        Keyword arguments:
+            fmt: str, optional, default is "json",
+                "json" or "prometheus" (text exposition format).
+
+        Returns:
+            str
+        """
+
+        if fmt == "json":
+            return to_json(self.get_metrics())
+        if fmt == "prometheus":
+            return to_prometheus(self.get_metrics())
+        raise ValueError("unknown metrics format: %r" % fmt)
+
+    def sync(self) -> int:
+        """
+        Invalidates records held in memory which have been changed
+        or removed by another process since the last check.
+        Changes are detected by polling the data version of the database,
+        which is not affected by changes made through the own connection.
+
+        Returns:
+            int: number of invalidated records.
+        """
+
+        with self.lock:
+            with self.db_lock:
+                self.synced_at = time.time()
+                version = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+                if version == self.data_version:
+                    return 0
+                self.data_version = version
+                # records held in memory only or queued for writing are not affected
+                keys = [
+                    key
+                    for key in OrderedDict.keys(self)
+                    if self.get_policy(key).persistent and key not in self.pending
+                ]
+                persisted = {}
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i : i + 500]
+                    persisted.update(
+                        self.conn.execute(
+                            "SELECT Key, InsertedAt FROM Cached WHERE Key IN (%s);"
+                            % ", ".join("?" * len(chunk)),
+                            chunk,
+                        )
+                    )
+            stale = [
+                key
+                for key in keys
+                if persisted.get(key) != OrderedDict.__getitem__(self, key)[1]
+            ]
+            for key in stale:
+                self.release(key)
+                # persisted access statistics are restored on the next access
+                self.access.pop(key, None)
+        if stale:
+            self.debug("Invalidated %d records changed by other processes", len(stale))
+        return len(stale)
+
+    def held(self, prefix: str) -> list[str]:
+        """
+        Lists the keys of a prefix held in the in-memory tier.
+
+        Positional arguments:
+            prefix: str,
+                key prefix (e.g. a username).
+
+        Returns:
+            list[str]
+        """
+
+        with self.lock:
+            return [
+                key
+                for key in self.prefixed.get(prefix, ())
+                if OrderedDict.__contains__(self, key)
+            ]
+
+    def keys(self, prefix: Optional[str] = None) -> Iterable[str]:
+        """
+        Reimplementation of dict.keys.
+        If a prefix is given, keys of unexpired records of both tiers
+        owned by the prefix are listed (see CachePolicy.prefix),
+        e.g. "<prefix>.grades", but not "<prefix>.doe.grades".
+
+        Keyword arguments:
+            prefix: str, optional, default is None,
+                key prefix (e.g. a username).
+
+        Returns:
+            Iterable[str]
+        """
+
+        if prefix is None:
+            return OrderedDict.keys(self)
+        deadline = time.time() - self.max_age
+        with self.lock:
+            keys = {
+                key
+                for key in self.held(prefix)
+                if OrderedDict.__getitem__(self, key)[1] >= deadline
+            }
+            with self.db_lock:
+                self.flush()
+                keys.update(
+                    key
+                    for key, in self.conn.execute(
+                        """
+                        SELECT Key FROM Cached
+                        WHERE Prefix = ? AND InsertedAt >= ?;
+                    """,
+                        (prefix, deadline),
+                    )
+                )
+        return sorted(keys)
+
+    def size(self, prefix: str) -> dict[str, dict[str, int]]:
+        """
+        Accounts the records and bytes of a key prefix per tier.
+        Bytes of the in-memory tier are measured by the size of the serialized values,
+        bytes of the database tier by the size of the stored values.
+
+        Positional arguments:
+            prefix: str,
+                key prefix (e.g. a username).
+
+        Returns:
+            dict[str,dict[str,int]]:
+            {
+                "memory": {"records": int, "bytes": int},
+                "database": {"records": int, "bytes": int}
+            }
+        """
+
+        with self.lock:
+            keys = self.held(prefix)
+            memory = {
+                "records": len(keys),
+                "bytes": sum(self.sizes.get(key, 0) for key in keys),
+            }
+            with self.db_lock:
+                self.flush()
+                records, size = self.conn.execute(
+                    """
+                    SELECT COUNT(*), TOTAL(LENGTH(Value)) FROM Cached
+                    WHERE Prefix = ?;
+                """,
+                    (prefix,),
+                ).fetchone()
+        return {
+            "memory": memory,
+            "database": {"records": records, "bytes": int(size)},
+        }
+
+    def invalidate(self, prefix: str) -> int:
+        """
+        Removes all records of a key prefix from both tiers
+        (e.g. the data of a user signing out).
+
+        Positional arguments:
+            prefix: str,
+                key prefix (e.g. a username).
+
+        Returns:
+            int: number of removed records.
+        """
+
+        with self.lock:
+            removed = set(self.held(prefix))
+            for key in removed:
+                self.release(key)
+            with self.db_lock:
+                self.flush()
+                cursor = self.conn.cursor()
+                removed.update(
+                    key
+                    for key, in cursor.execute(
+                        "SELECT Key FROM Cached WHERE Prefix = ?;", (prefix,)
+                    )
+                )
+                cursor.execute("DELETE FROM Cached WHERE Prefix = ?;", (prefix,))
+            for key in removed:
+                for memo in (self.access, self.namespaces, self.prefixes, self.sizes):
+                    memo.pop(key, None)
+            self.touched.difference_update(removed)
+        self.debug("Invalidated %d records of %s", len(removed), prefix)
+        return len(removed)
+
+    def snapshot(self, path: Union[str, Path], codec: Optional[str] = "zlib") -> int:
+        """
+        Writes an image of all unexpired persisted records to a file.
+        Values are copied as stored, the image is compressed as a whole
+        and written at once (atomically replacing an existing file).
+
+        Positional arguments:
+            path: Union[str,Path],
+                location of the image.
+
+        Keyword arguments:
+            codec: str, optional, default is "zlib",
+                codec used to compress the image.
+
+        Returns:
+            int: number of records in the image.
+        """
+
+        with self.db_lock:
+            self.flush()
+            self.persist_access(self.conn.cursor())
+            rows = self.conn.execute(
+                """
+                SELECT
+                    Key, Value, InsertedAt, Codec, AccessedAt, Hits, Size, Serializer
+                FROM Cached
+                WHERE InsertedAt >= ?;
+            """,
+                (time.time() - self.max_age,),
+            ).fetchall()
+        body, codec = compress(
+            pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL), get_codec(codec)
+        )
+        path = Path(path)
+        temporary = path.with_name(path.name + ".part")
+        with temporary.open("wb") as file:
+            file.write(
+                self.SNAPSHOT_HEADER.pack(
+                    self.SNAPSHOT_MAGIC,
+                    self.snapshot_version,
+                    self.schema_version,
+                    codec.encode("ascii"),
+                )
+                + body
+            )
+        os.replace(temporary, path)
+        self.debug("Saved snapshot of %d records: %s", len(rows), path)
+        return len(rows)
+
+    def restore(self, path: Union[str, Path]) -> int:
+        """
+        Loads the records of a snapshot image in a single transaction.
+        Expired records and records older than the cached ones are skipped.
+        Records are loaded into memory lazily.
+
+        Positional arguments:
+            path: Union[str,Path],
+                location of the image.
+
+        Returns:
+            int: number of restored records.
+        """
+
+        data = Path(path).read_bytes()
+        try:
+            magic, version, schema, codec = self.SNAPSHOT_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError(f"not a snapshot image: {path}")
+        if magic != self.SNAPSHOT_MAGIC:
+            raise ValueError(f"not a snapshot image: {path}")
+        if (version, schema) != (self.snapshot_version, self.schema_version):
+            raise ValueError(f"incompatible snapshot image: {path}")
+        rows = pickle.loads(
+            decompress(
+                data[self.SNAPSHOT_HEADER.size :],
+                get_codec(codec.rstrip(b"\0").decode("ascii")),
             )
         )
-        self.debug("Removed: %s" % __k)
+        deadline = time.time() - self.max_age
+        with self.lock:
+            with self.db_lock:
+                self.flush()
+                cursor = self.conn.cursor()
+                try:
+                    cursor.execute("BEGIN IMMEDIATE;")
+                    restored = cursor.executemany(
+                        self.RESTORE,
+                        (
+                            (
+                                *row[:6],
+                                self.get_policy(row[0]).name,
+                                *row[6:],
+                                self.get_prefix(row[0]),
+                            )
+                            for row in rows
+                            if row[2] >= deadline and self.get_policy(row[0]).persistent
+                        ),
+                    ).rowcount
+                    cursor.execute("COMMIT;")
+                except BaseException:
+                    if self.conn.in_transaction:
+                        cursor.execute("ROLLBACK;")
+                    raise
+            # records held in memory might be outdated
+            for key, *_ in rows:
+                if OrderedDict.__contains__(self, key):
+                    self.demote(key)
+                    self.access.pop(key, None)
+        self.debug("Restored %d records from snapshot: %s", restored, path)
+        return restored
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """
+        Reimplementation of ExpiringDict.pop.
+        Removes the record from both tiers.
+        Returns default if expired or does not exist.
+        """
+
+        try:
+            __v = self[key]
+        except KeyError:
+            return default
+        del self[key]
+        return __v
 
     def prolongate(self, key: str, seconds: Union[float, int]):
         """
@@ -271,4 +1608,7 @@ class Cache(ExpiringDict, Logger):
         """
 
         if hasattr(self, "conn"):
-            self.conn.close()
+            try:
+                self.flush()
+            finally:
+                self.conn.close()
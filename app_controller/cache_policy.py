@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import re
+from fnmatch import fnmatchcase, translate
+from typing import Iterable, Optional
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+class CachePolicy:
+    """
+    Declares the life time and size budget of a namespace of cache keys.
+    Records of a namespace are only evicted to keep its own budget,
+    so that e.g. large downloads cannot evict expensive-to-rebuild metadata.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *patterns: tuple[str],
+        max_age: Optional[float] = None,
+        max_len: Optional[int] = None,
+        persistent: Optional[bool] = True,
+    ):
+        """
+        Create a cache policy.
+
+        Positional arguments:
+            name: str,
+                name of the namespace.
+
+            patterns: tuple[str],
+                shell-style patterns of keys belonging to the namespace
+                (e.g. "*.grades" for "<username>.grades").
+
+        Keyword arguments:
+            max_age: float, optional, default is the TTL of the cache,
+                TTL for records of the namespace in seconds,
+                float("inf") keeps records permanently.
+
+            max_len: int, optional, default is the max_len of the cache,
+                maximum number of records of the namespace held in each tier.
+
+            persistent: bool, optional, default is True,
+                if False, records are held in memory only (e.g. for a session).
+        """
+
+        self.name = name
+        self.patterns = patterns
+        # the leading wildcard of a pattern captures the prefix of a key
+        self.prefix_patterns = {
+            pattern: re.compile("(.*)" + translate(pattern[1:]))
+            for pattern in patterns
+            if pattern.startswith("*")
+        }
+        self.max_age = max_age
+        self.max_len = max_len
+        self.persistent = persistent
+
+    def matches(self, key: str) -> bool:
+        """
+        Checks whether a key belongs to the namespace.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+        Returns:
+            bool
+        """
+
+        return any(fnmatchcase(key, pattern) for pattern in self.patterns)
+
+    def prefix(self, key: str) -> str:
+        """
+        Extracts the prefix (owner) of a key, i.e. the part matched by
+        the leading wildcard of the first matching pattern
+        (e.g. "john.doe" of "john.doe.grades" matching "*.grades").
+        Keys matching a pattern without a leading wildcard have no prefix,
+        keys matching no pattern are prefixed by the part before their last dot.
+
+        Positional arguments:
+            key: str,
+                item id.
+
+        Returns:
+            str
+        """
+
+        for pattern in self.patterns:
+            if fnmatchcase(key, pattern):
+                regex = self.prefix_patterns.get(pattern)
+                return "" if regex is None else regex.match(key).group(1)
+        return key.rpartition(".")[0]
+
+    def __repr__(self) -> str:
+        return "%s(%r, max_age=%r, max_len=%r)" % (
+            type(self).__name__,
+            self.name,
+            self.max_age,
+            self.max_len,
+        )
+
+
+def resolve_policy(
+    policies: Iterable[CachePolicy], key: str, default: CachePolicy
+) -> CachePolicy:
+    """
+    Selects the first policy matching a key.
+
+    Positional arguments:
+        policies: Iterable[CachePolicy],
+            declared policies.
+
+        key: str,
+            item id.
+
+        default: CachePolicy,
+            policy of keys not matching any declared policy.
+
+    Returns:
+        CachePolicy
+    """
+
+    return next((policy for policy in policies if policy.matches(key)), default)
+
+
+# policies of the keys cached by the controller
+DEFAULT_POLICIES = (
+    CachePolicy(
+        "settings",
+        "username",
+        "theme_style",
+        "primary_palette",
+        "accent_palette",
+        max_age=float("inf"),
+        max_len=8,
+    ),
+    # booking ids are only valid within a session
+    CachePolicy("session", "*.booking_id", max_len=8, persistent=False),
+    # cookie jar of the signed-in session, resumed after a restart
+    CachePolicy("cookies", "*.session", max_age=24 * 3600, max_len=8),
+    CachePolicy("grades", "*.grades", max_age=6 * 3600, max_len=8),
+    CachePolicy(
+        "curriculum",
+        "*.courses",
+        "*.curriculum",
+        "*.dependency_graph",
+        # sources of derived results and their fingerprints
+        "*.source(*)",
+        "*.inputs(*)",
+        max_age=24 * 3600,
+        max_len=64,
+    ),
+    CachePolicy("resources", "*.resources", max_age=30 * 24 * 3600, max_len=8),
+    CachePolicy(
+        "calendar",
+        "*.calendar_options",
+        "*.ical_events(*).ics",
+        max_age=3 * 3600,
+        max_len=10,
+    ),
+    CachePolicy("downloads", "*.link(*)", max_age=24 * 3600, max_len=20),
+)
@@ -10,6 +10,7 @@ from icalendar import Calendar
 from .auth import Authenticator
 from .dumper import dump4mock
 from .exceptions import ExceptionHandler, RequestFailed
+from .refresher import revalidate
 
 ###############
 #             #
@@ -48,6 +49,7 @@ class CalendarExporter(Authenticator):
     """
 
     @ExceptionHandler("calendar export failed", RequestFailed)
+    @revalidate
     def export_calendar(
         self,
         *,
@@ -68,6 +70,10 @@ class CalendarExporter(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
         Returns:
             dict:
                 {
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from collections import OrderedDict
-from typing import Any, Generator, Optional, Union
+from typing import Any, Callable, Generator, Optional, Union
 from unittest.mock import MagicMock
+from urllib.parse import quote
 
 import networkx as nx
 
@@ -26,6 +27,24 @@ class Client_(Client):
         super().__init__(*args, **kwargs)
         self._session = MagicMock()
 
+    @staticmethod
+    def source_response(url: str, *args, **kwargs) -> MagicMock:
+        # derived results only refetch invalidated sources,
+        # so the response is picked by the requested endpoint and not by order
+        return MagicMock(
+            status_code=200,
+            json=MagicMock(
+                return_value=dump4mock[
+                    "CourseBrowser.fetch_source.response.json@session.get(%s)#1"
+                    % quote(url, safe="")
+                ]
+            ),
+        )
+
+    def resume_session(self) -> bool:
+        # mocked sessions cannot be resumed
+        return False
+
     def get_saml_request(self) -> str:
         self._session.get.side_effect = None
         self._session.get.return_value = MagicMock(
@@ -94,6 +113,7 @@ class Client_(Client):
         exportevents: ExportEvents = ExportEvents["all"],
         timeperiod: TimePeriod = TimePeriod["recentupcoming"],
         cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
     ) -> tuple[str, dict[str, Any]]:
         self._session.get.side_effect = None
         self._session.get.return_value = MagicMock(
@@ -113,10 +133,18 @@ class Client_(Client):
             ],
         )
         return super().export_calendar(
-            exportevents=exportevents, timeperiod=timeperiod, cached=cached
+            exportevents=exportevents,
+            timeperiod=timeperiod,
+            cached=cached,
+            callback=callback,
         )
 
-    def list_courses(self, *, cached: bool = False) -> list[dict]:
+    def list_courses(
+        self,
+        *,
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
+    ) -> list[dict]:
         self._session.get.side_effect = None
         self._session.get.return_value = MagicMock(
             status_code=200,
@@ -125,10 +153,14 @@ class Client_(Client):
                 "@session.get(https%3A%2F%2Fmycampus.iubh.de%2Fmy%2F)#1"
             ],
         )
-        return super().list_courses(cached=cached)
+        return super().list_courses(cached=cached, callback=callback)
 
     def list_course_resources(
-        self, course_id: int, *, cached: bool = False
+        self,
+        course_id: int,
+        *,
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
     ) -> list[dict]:
         self._session.get.side_effect = None
         self._session.get.return_value = MagicMock(
@@ -139,7 +171,22 @@ class Client_(Client):
                 f"params={{course_id={course_id}}})#1"
             ],
         )
-        return super().list_course_resources(course_id, cached=cached)
+        return super().list_course_resources(
+            course_id, cached=cached, callback=callback
+        )
+
+    def list_all_course_resources(
+        self,
+        course_ids: list[int],
+        *,
+        cached: bool = False,
+        max_workers: int = 4,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> dict[int, list[dict]]:
+        # mocked responses are set up per request, hence sequentially
+        return super().list_all_course_resources(
+            course_ids, cached=cached, max_workers=1, progress=progress
+        )
 
     def enroll(
         self,
@@ -222,157 +269,64 @@ class Client_(Client):
         self._session.get.side_effect = get_side_effects
         return super().get_booking_id()
 
-    def get_graded_records(self) -> tuple[set[str]]:
+    def get_graded_records(self, *, cached: bool = False) -> tuple[set[str]]:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_graded_records.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2FCourseInscriptionCurricular"
-                    "%2FDefaultController%2FfetchCurriculumGrades)#1"
-                ]
-            ),
-        )
-        return super().get_graded_records()
+        self._session.get.side_effect = self.source_response
+        return super().get_graded_records(cached=cached)
 
     def get_curricullum_entries(
-        self, passed_modules: set[str], passed_subjects: set[str]
+        self,
+        passed_modules: set[str],
+        passed_subjects: set[str],
+        *,
+        cached: bool = False,
     ) -> OrderedDict:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_curricullum_entries.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                ]
-            ),
+        self._session.get.side_effect = self.source_response
+        return super().get_curricullum_entries(
+            passed_modules, passed_subjects, cached=cached
         )
-        return super().get_curricullum_entries(passed_modules, passed_subjects)
 
     def get_dependency_graph(
-        self, *, cached: bool = False, include_root: bool = False
+        self,
+        *,
+        cached: bool = False,
+        include_root: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
     ) -> nx.Graph:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_dependency_graph.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                ]
-            ),
+        self._session.get.side_effect = self.source_response
+        return super().get_dependency_graph(
+            cached=cached, include_root=include_root, callback=callback
         )
-        return super().get_dependency_graph(cached=cached, include_root=include_root)
 
-    def create_booking_context(self, curriculum_entries: OrderedDict) -> OrderedDict:
+    def create_booking_context(
+        self, curriculum_entries: OrderedDict, *, cached: bool = False
+    ) -> OrderedDict:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.create_booking_context.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCourses)#1"
-                ]
-            ),
-        )
-        return super().create_booking_context(curriculum_entries)
+        self._session.get.side_effect = self.source_response
+        return super().create_booking_context(curriculum_entries, cached=cached)
 
     def update_enrolled_course_modules(
-        self, curriculum_entries: OrderedDict
+        self, curriculum_entries: OrderedDict, *, cached: bool = False
     ) -> OrderedDict:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.update_enrolled_course_modules.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCourseTickets)#1"
-                ]
-            ),
-        )
-        return super().update_enrolled_course_modules(curriculum_entries)
+        self._session.get.side_effect = self.source_response
+        return super().update_enrolled_course_modules(curriculum_entries, cached=cached)
 
-    def get_available_credits(self) -> dict[str, int]:
+    def get_available_credits(self, *, cached: bool = False) -> dict[str, int]:
         self.get_booking_id()
-        self._session.get.side_effect = None
-        self._session.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_available_credits.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCreditCounts)#1"
-                ]
-            ),
-        )
-        return super().get_available_credits()
+        self._session.get.side_effect = self.source_response
+        return super().get_available_credits(cached=cached)
 
-    def get_courses_to_register(self, cached: bool = False) -> dict:
+    def get_courses_to_register(
+        self,
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
+    ) -> dict:
         self.get_booking_id()
-        self._session.get.side_effect = (
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_graded_records.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2FCourseInscriptionCurricular"
-                        "%2FDefaultController%2FfetchCurriculumGrades)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_curricullum_entries.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.create_booking_context.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCourses)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.update_enrolled_course_modules.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCourseTickets)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_available_credits.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCreditCounts)#1"
-                    ]
-                ),
-            ),
-        )
-        return super().get_courses_to_register(cached=cached)
+        self._session.get.side_effect = self.source_response
+        return super().get_courses_to_register(cached=cached, callback=callback)
 
     def download(
         self, link: str, cached: Optional[bool] = False, chunk: Optional[int] = None
@@ -390,7 +344,11 @@ class Client_(Client):
         )
         return super().download(link, cached, chunk)
 
-    def get_grades(self, cached: bool = False) -> OrderedDict:
+    def get_grades(
+        self,
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
+    ) -> OrderedDict:
         self._session.get.side_effect = (
             MagicMock(
                 status_code=200,
@@ -413,4 +371,4 @@ class Client_(Client):
                 ],
             ),
         )
-        return super().get_grades(cached)
+        return super().get_grades(cached=cached, callback=callback)
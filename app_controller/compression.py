@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import importlib
+from types import ModuleType
+from typing import Optional
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+# available codecs by name: (module, compression level)
+# modules are imported on first use, since their C extensions
+# (e.g. _lzma, _bz2) might be missing from a python-for-android build
+CODECS: dict[str, tuple[Optional[str], Optional[int]]] = {
+    "none": (None, None),
+    "zlib": ("zlib", 6),
+    "lzma": ("lzma", None),
+    "bz2": ("bz2", 9),
+}
+
+
+def load_codec(codec: str) -> ModuleType:
+    """
+    Imports the module of a codec.
+
+    Positional arguments:
+        codec: str,
+            name of the codec.
+
+    Returns:
+        ModuleType: module providing compress and decompress.
+    """
+
+    try:
+        return importlib.import_module(CODECS[codec][0])
+    except ImportError as exc:
+        raise ValueError(f"codec is not available: {codec} ({exc})") from exc
+
+
+def get_codec(codec: Optional[str]) -> str:
+    """
+    Resolves the name of a codec.
+
+    Positional arguments:
+        codec: str, optional,
+            name of the codec ("zlib", "lzma", "bz2"), None disables compression.
+
+    Returns:
+        str
+    """
+
+    codec = str(codec or "none").lower()
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec: {codec}")
+    if codec != "none":
+        load_codec(codec)
+    return codec
+
+
+def compress(data: bytes, codec: str, threshold: int = 0) -> tuple[bytes, str]:
+    """
+    Compresses data exceeding a size threshold.
+    Data is kept uncompressed if compression does not reduce its size
+    (e.g. already compressed downloads).
+
+    Positional arguments:
+        data: bytes,
+            data to be compressed.
+
+        codec: str,
+            name of the codec.
+
+    Keyword arguments:
+        threshold: int, optional, default is 0,
+            minimal size of data to be compressed in bytes.
+
+    Returns:
+        tuple[bytes,str]: (compressed) data and name of the codec used.
+    """
+
+    if codec == "none" or len(data) < threshold:
+        return data, "none"
+    module, level = load_codec(codec), CODECS[codec][1]
+    compressed = (
+        module.compress(data) if level is None else module.compress(data, level)
+    )
+    if len(compressed) >= len(data):
+        return data, "none"
+    return compressed, codec
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """
+    Decompresses data.
+
+    Positional arguments:
+        data: bytes,
+            compressed data.
+
+        codec: str,
+            name of the codec used to compress data.
+
+    Returns:
+        bytes
+    """
+
+    if codec == "none":
+        return data
+    return load_codec(codec).decompress(data)
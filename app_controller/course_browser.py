@@ -4,14 +4,19 @@ import hashlib
 import json
 import re
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import Any, Callable, Optional
 from urllib.parse import quote, urlencode
 
 import networkx as nx
 from bs4 import BeautifulSoup
 
 from .auth import Authenticator
+from .derived import Deriver
 from .dumper import dump4mock
 from .exceptions import ExceptionHandler, RequestFailed
+from .refresher import revalidate
 
 ###############
 #             #
@@ -20,12 +25,40 @@ from .exceptions import ExceptionHandler, RequestFailed
 ###############
 
 
-class CourseBrowser(Authenticator):
+class CourseBrowser(Deriver, Authenticator):
     """
     Implements methods to browse student's enrolled courses and course resources.
     """
 
+    # endpoints of the sources of the course registration
+    SOURCES = {
+        "grades": "fetchCurriculumGrades",
+        "curriculum_entries": "fetchCurriculumEntry",
+        "courses": "fetchCourses",
+        "tickets": "fetchCourseTickets",
+        "credits": "fetchCreditCounts",
+    }
+    # results derived from the sources, enrollments only change tickets and credits
+    DEPENDENCIES = {
+        "curriculum": ("grades", "curriculum_entries", "courses", "tickets", "credits"),
+        "dependency_graph": ("curriculum_entries",),
+    }
+
+    def __init__(self, *args: tuple[Any], **kwargs: dict[str, Any]):
+        """
+        Initializes the course browser.
+
+        Positional arguments:
+            *args, **kwargs:
+                arguments of the Authenticator class.
+        """
+
+        super().__init__(*args, **kwargs)
+        # serializes updates of the course resources fetched concurrently
+        self.resources_lock = Lock()
+
     @ExceptionHandler("failed to obtain course list", RequestFailed)
+    @revalidate
     def list_courses(self, *, cached: bool = False) -> list[dict]:
         """
         Lists active and inactive courses.
@@ -34,6 +67,10 @@ class CourseBrowser(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
         Returns:
             list[dict]:
             [
@@ -85,6 +122,7 @@ class CourseBrowser(Authenticator):
         return result
 
     @ExceptionHandler("failed to obtain course resources", RequestFailed)
+    @revalidate
     def list_course_resources(
         self, course_id: int, *, cached: bool = False
     ) -> list[dict]:
@@ -100,6 +138,10 @@ class CourseBrowser(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
         Returns:
             list[dict]:
             [
@@ -130,28 +172,89 @@ class CourseBrowser(Authenticator):
         )
 
         soup = BeautifulSoup(response.text, "html.parser")
-        result = {
-            **self.get(f"{self.username}.resources", dict()),
-            **{
-                course_id: [
-                    {"link": el.get("href"), "title": el.text}
-                    for el in (
-                        *soup.select(
-                            'a[href^="https://mycampus.iubh.de/mod/resource/view.php"]'
-                        ),
-                        *soup.select(
-                            'a[href^="https://mycampus.iubh.de/local/downloadprettyfier/view.php"]'
-                        ),
-                    )
-                ]
-            },
-        }
-
-        self[f"{self.username}.resources"] = result
+        resources = [
+            {"link": el.get("href"), "title": el.text}
+            for el in (
+                *soup.select(
+                    'a[href^="https://mycampus.iubh.de/mod/resource/view.php"]'
+                ),
+                *soup.select(
+                    'a[href^="https://mycampus.iubh.de/local/downloadprettyfier/view.php"]'
+                ),
+            )
+        ]
+        # resources of other courses might be fetched concurrently
+        with self.resources_lock:
+            result = {
+                **self.get(f"{self.username}.resources", dict()),
+                course_id: resources,
+            }
+            self[f"{self.username}.resources"] = result
         dump4mock("result[%(c)d]@course_id=%(c)d" % {"c": course_id}, True)
         self.debug("Successfully retrieved course view")
         return result[course_id]
 
+    @ExceptionHandler("failed to obtain course resources", RequestFailed)
+    def list_all_course_resources(
+        self,
+        course_ids: list[int],
+        *,
+        cached: bool = False,
+        max_workers: int = 4,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> dict[int, list[dict]]:
+        """
+        Lists resources of multiple courses fetched in parallel.
+
+        Positional arguments:
+            course_ids: list[int],
+                ids of course modules from the result set of the method list_courses.
+
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, response will be retrieved from cache.
+
+            max_workers: int, default is 4,
+                maximum number of concurrent requests.
+
+            progress: Callable[[int,int,int],None], optional,
+                called (from a worker thread) with the id of each listed course,
+                the number of listed courses and the total number of courses.
+
+        Returns:
+            dict[int,list[dict]]:
+            {
+                course_id: [
+                    {
+                        "link": str,
+                        "title": str
+                    }, ...
+                ], ...
+            }
+        """
+
+        results = {}
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="course-resources"
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self.list_course_resources, course_id, cached=cached
+                ): course_id
+                for course_id in course_ids
+            }
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if progress is not None:
+                        progress(futures[future], len(results), len(futures))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        self.debug("Listed resources of %d courses", len(results))
+        return {course_id: results[course_id] for course_id in course_ids}
+
     @ExceptionHandler("failed to enroll", RequestFailed)
     def enroll(
         self,
@@ -186,6 +289,7 @@ class CourseBrowser(Authenticator):
             response.status_code,
             response.text,
         )
+        self.invalidate_sources("tickets", "credits")
         self.debug("Successfully enrolled")
 
     @ExceptionHandler("failed to cancel", RequestFailed)
@@ -221,6 +325,7 @@ class CourseBrowser(Authenticator):
         assert response.status_code == 200, (
             "server responded with %d" % response.status_code
         )
+        self.invalidate_sources("tickets", "credits")
         self.debug("Successfully cancelled enrollment")
 
     @ExceptionHandler("failed to start", RequestFailed)
@@ -257,6 +362,7 @@ class CourseBrowser(Authenticator):
             response.status_code,
             response.text,
         )
+        self.invalidate_sources("tickets")
         self.debug("Successfully started course module")
 
     @ExceptionHandler("failed to get booking id", RequestFailed)
@@ -348,43 +454,64 @@ class CourseBrowser(Authenticator):
             self.debug(f"Retrieved booking id: {booking_id}")
             return booking_id
 
-    @ExceptionHandler("failed to request graded curriculum entries", RequestFailed)
-    def get_graded_records(self) -> tuple[set[str]]:
+    def reauthenticate(self):
+        # the course registration context of care-fs belongs to the expired session,
+        # the next request retrieves a new one (not while holding the sign-in lock)
+        self.pop(f"{self.username}.booking_id", None)
+        super().reauthenticate()
+
+    def fetch_source(self, name: str) -> Any:
         """
-        Retrieves graded curriculum entries:
+        Requests a source of the course registration.
+
+        Positional arguments:
+            name: str,
+                one of SOURCES.
 
         Returns:
-            tuple[set[str]]:
-            (
-                {module_id, ...},
-                {subject_id, ...}
-            )
+            Any: JSON payload.
         """
 
         # make sure to have valid booking id
         if not self.get(f"{self.username}.booking_id"):
-            print("CALLING get booking id")
             self.get_booking_id()
 
-        self.debug("Requesting graded curriculum entries")
+        url = (
+            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/"
+            "DefaultController/" + self.SOURCES[name]
+        )
+        self.debug("Requesting %s", name)
         response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCurriculumGrades",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
+            url, params={"bookindId": self.get(f"{self.username}.booking_id")}
         )
         assert response.status_code == 200, "server responded with %d (%s)" % (
             response.status_code,
             response.text,
         )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCurriculumGrades",
-                safe="",
-            ),
-            True,
-        )
+        dump4mock("response.json()@session.get(%s)" % quote(url, safe=""), True)
+        return response.json()
+
+    @ExceptionHandler("failed to request graded curriculum entries", RequestFailed)
+    def get_graded_records(self, *, cached: bool = False) -> tuple[set[str]]:
+        """
+        Retrieves graded curriculum entries:
+
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached source will be used if available.
+
+        Returns:
+            tuple[set[str]]:
+            (
+                {module_id, ...},
+                {subject_id, ...}
+            )
+        """
+
+        self.debug("Requesting graded curriculum entries")
+        grades = self.source("grades", cached)
         passed_modules, passed_subjects = set(), set()
-        for grade in response.json():
+        for grade in grades:
             if grade.get("moduleId"):
                 passed_modules.add(str(grade["moduleId"]))
             if grade.get("subjectId"):
@@ -396,7 +523,11 @@ class CourseBrowser(Authenticator):
 
     @ExceptionHandler("failed to request curriculum entries", RequestFailed)
     def get_curricullum_entries(
-        self, passed_modules: set[str], passed_subjects: set[str]
+        self,
+        passed_modules: set[str],
+        passed_subjects: set[str],
+        *,
+        cached: bool = False,
     ) -> OrderedDict:
         """
         Retrieves curriculum entries.
@@ -404,6 +535,10 @@ class CourseBrowser(Authenticator):
         Positional arguments:
             originate with the result set of the method "get_graded_records".
 
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached source will be used if available.
+
         Returns:
             dict
             {
@@ -427,29 +562,8 @@ class CourseBrowser(Authenticator):
             }
         """
 
-        # make sure to have valid booking id
-        if not self.get(f"{self.username}.booking_id"):
-            self.get_booking_id()
-
         self.debug("Requesting curriculum entries")
-        response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/"
-            "DefaultController/fetchCurriculumEntry",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
-        )
-        assert response.status_code == 200, "server responded with %d (%s)" % (
-            response.status_code,
-            response.text,
-        )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular"
-                "/DefaultController/fetchCurriculumEntry",
-                safe="",
-            ),
-            True,
-        )
+        data = self.source("curriculum_entries", cached)
         curriculum_entries = OrderedDict(
             {
                 semester["label"]: {
@@ -492,7 +606,7 @@ class CourseBrowser(Authenticator):
                         or not passed_modules
                     }
                 }
-                for semester in response.json()["curriculumEntries"]
+                for semester in data["curriculumEntries"]
             }
         )
         dump4mock(
@@ -515,6 +629,7 @@ class CourseBrowser(Authenticator):
         return curriculum_entries
 
     @ExceptionHandler("failed to draw dependency graph", RequestFailed)
+    @revalidate
     def get_dependency_graph(
         self, *, cached: bool = False, include_root: bool = False
     ) -> nx.Graph:
@@ -525,6 +640,10 @@ class CourseBrowser(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
             include_root: bool default is False,
                 if True, independent curriculum entries will be drawn around a root node.
 
@@ -537,27 +656,30 @@ class CourseBrowser(Authenticator):
         if cached and self.get(f"{self.username}.dependency_graph"):
             return self[f"{self.username}.dependency_graph"]
 
-        # make sure to have valid booking id
-        if not self.get(f"{self.username}.booking_id"):
-            self.get_booking_id()
-
-        response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCurriculumEntry",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
-        )
-        assert response.status_code == 200, "server responded with %d (%s)" % (
-            response.status_code,
-            response.text,
-        )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCurriculumEntry",
-                safe="",
+        # the graph is only redrawn if the curriculum entries have changed
+        return self.derive(
+            "dependency_graph",
+            lambda: self.draw_dependency_graph(
+                self.source("curriculum_entries", True), include_root
             ),
-            True,
+            cached,
+            include_root=include_root,
         )
-        data = response.json()
+
+    def draw_dependency_graph(self, data: dict, include_root: bool) -> nx.DiGraph:
+        """
+        Draws the dependencies between curriculum entries.
+
+        Positional arguments:
+            data: dict,
+                curriculum entries as retrieved from the server.
+
+            include_root: bool,
+                if True, independent curriculum entries will be drawn around a root node.
+
+        Returns:
+            networkx.DiGraph
+        """
 
         self.debug("creating networkx.Graph instance")
         # create graph
@@ -604,11 +726,12 @@ class CourseBrowser(Authenticator):
             G.add_edge(*edge["edge"], weight=edge["weight"])
 
         self.debug("created: " + str(G))
-        self[f"{self.username}.dependency_graph"] = G
         return G
 
     @ExceptionHandler("failed to create booking context", RequestFailed)
-    def create_booking_context(self, curriculum_entries: OrderedDict) -> OrderedDict:
+    def create_booking_context(
+        self, curriculum_entries: OrderedDict, *, cached: bool = False
+    ) -> OrderedDict:
         """
         Creates sets of keyword parameters required for the methods:
             "enroll",
@@ -619,6 +742,10 @@ class CourseBrowser(Authenticator):
             curriculum_entries: dict,
                 originates with the result of the "get_curricullum_entries" method.
 
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached source will be used if available.
+
         Returns:
             dict:
             {
@@ -656,28 +783,11 @@ class CourseBrowser(Authenticator):
             }
         """
 
-        # make sure to have valid booking id
-        if not self.get(f"{self.username}.booking_id"):
-            self.get_booking_id()
-
         self.debug("Retrieving lecture series")
-        response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCourses",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
-        )
-        assert response.status_code == 200, "server responded with %d (%s)" % (
-            response.status_code,
-            response.text,
-        )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCourses",
-                safe="",
-            ),
-            True,
-        )
-        for course in response.json().values():
+        courses = self.source("courses", cached)
+        # the booking id is dropped on re-authentication, cached sources outlive it
+        booking_id = self.get(f"{self.username}.booking_id") or self.get_booking_id()
+        for course in courses.values():
             for body in curriculum_entries.values():
                 for curriculumEntryId, subject in body["subjects"].items():
                     if course.get("moduleId"):
@@ -699,7 +809,7 @@ class CourseBrowser(Authenticator):
                                     )
                                 ),
                                 "curriculumEntryId": str(curriculumEntryId),
-                                "bookingId": str(self[f"{self.username}.booking_id"]),
+                                "bookingId": str(booking_id),
                             }
                     elif course.get("subjectId"):
                         for child in subject["children"].values():
@@ -713,9 +823,7 @@ class CourseBrowser(Authenticator):
                                     ),
                                     "assignedSubjectIds": "",
                                     "curriculumEntryId": str(curriculumEntryId),
-                                    "bookingId": str(
-                                        self[f"{self.username}.booking_id"]
-                                    ),
+                                    "bookingId": str(booking_id),
                                 }
         dump4mock(
             "curriculum_entries@%s"
@@ -733,7 +841,7 @@ class CourseBrowser(Authenticator):
 
     @ExceptionHandler("failed to update enrolled curriculum entries", RequestFailed)
     def update_enrolled_course_modules(
-        self, curriculum_entries: OrderedDict
+        self, curriculum_entries: OrderedDict, *, cached: bool = False
     ) -> OrderedDict:
         """
         Updates "isEnrolled" and "isStarted" attributes of the result set
@@ -743,6 +851,10 @@ class CourseBrowser(Authenticator):
             curriculum_entries: dict,
                 originates with the result of the "get_curricullum_entries" method.
 
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached source will be used if available.
+
         Returns:
             dict:
             {
@@ -768,30 +880,11 @@ class CourseBrowser(Authenticator):
             }
         """
 
-        # make sure to have valid booking id
-        if not self.get(f"{self.username}.booking_id"):
-            self.get_booking_id()
-
         self.debug("Retrieving enrolled curriculum entries")
         # get enrolled courses
-        response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCourseTickets",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
-        )
-        assert response.status_code == 200, "server responded with %d (%s)" % (
-            response.status_code,
-            response.text,
-        )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCourseTickets",
-                safe="",
-            ),
-            True,
-        )
+        tickets = self.source("tickets", cached)
         # mark curriculum entries with enrollment
-        for enrollment in response.json():
+        for enrollment in tickets:
             for body in curriculum_entries.values():
                 if enrollment.get("subjectId"):
                     for subject in body["subjects"].values():
@@ -820,10 +913,14 @@ class CourseBrowser(Authenticator):
         return curriculum_entries
 
     @ExceptionHandler("failed to retrieve available credits", RequestFailed)
-    def get_available_credits(self) -> dict[str, int]:
+    def get_available_credits(self, *, cached: bool = False) -> dict[str, int]:
         """
         Retrieves available credits.
 
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached source will be used if available.
+
         Returns:
             dict[str,int]:
             {
@@ -834,31 +931,13 @@ class CourseBrowser(Authenticator):
             }
         """
 
-        # make sure to have valid booking id
-        if not self.get(f"{self.username}.booking_id"):
-            self.get_booking_id()
-
         self.debug("Retrieving available credits")
-        response = self._session.get(
-            "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCreditCounts",
-            params={"bookindId": self.get(f"{self.username}.booking_id")},
-        )
-        assert response.status_code == 200, "server responded with %d (%s)" % (
-            response.status_code,
-            response.text,
-        )
-        dump4mock(
-            "response.json()@session.get(%s)"
-            % quote(
-                "https://care-fs.iubh.de/ajax/4713/CourseInscriptionCurricular/DefaultController/fetchCreditCounts",
-                safe="",
-            ),
-            True,
-        )
+        credits = self.source("credits", cached)
         self.debug("Successfully retrieved available credits")
-        return response.json()
+        return credits
 
     @ExceptionHandler("failed to obtain available courses", RequestFailed)
+    @revalidate
     def get_courses_to_register(self, cached: bool = False) -> dict:
         """
         Generates JSON object describing curriculum entires available for registration
@@ -877,6 +956,10 @@ class CourseBrowser(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
         Returns:
             dict:
             {
@@ -927,12 +1010,29 @@ class CourseBrowser(Authenticator):
         if cached and self.get(f"{self.username}.curriculum"):
             return self[f"{self.username}.curriculum"]
 
+        # sources still cached after an enrollment are not requested again,
+        # the result is only recomputed if any of the sources has changed
+        return self.derive("curriculum", self.compose_curriculum, cached)
+
+    def compose_curriculum(self) -> dict:
+        """
+        Composes the result of the method "get_courses_to_register"
+        from the cached sources.
+
+        Returns:
+            dict
+        """
+
         curriculum_entries = self.update_enrolled_course_modules(
             self.create_booking_context(
-                self.get_curricullum_entries(*self.get_graded_records())
-            )
+                self.get_curricullum_entries(
+                    *self.get_graded_records(cached=True), cached=True
+                ),
+                cached=True,
+            ),
+            cached=True,
         )
-        credits = self.get_available_credits()
+        credits = self.get_available_credits(cached=True)
 
         split = re.compile(r"(.*?)\s*\((.*)\)", re.DOTALL)
         result = {
@@ -989,6 +1089,4 @@ class CourseBrowser(Authenticator):
             ],
         }
         dump4mock("result", True)
-        self[f"{self.username}.curriculum"] = result
-        dump4mock("result")
         return result
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+def fingerprint(payload: Any) -> str:
+    """
+    Computes a digest of a JSON-like payload independent of the order of dict keys.
+
+    Positional arguments:
+        payload: Any,
+            payload to be fingerprinted.
+
+    Returns:
+        str
+    """
+
+    return hashlib.blake2b(
+        json.dumps(payload, sort_keys=True, default=repr).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+class Deriver:
+    """
+    Extension tracking the dependencies of derived results on source payloads.
+    Sources are cached along with their fingerprints, derived results along with
+    the fingerprints of the sources they have been computed from. Unchanged sources
+    do not cause a recomputation and changed sources only invalidate the results
+    depending on them. Requires the Cache class in the MRO and a method
+    fetch_source(name: str) -> Any requesting the payload of a source.
+    """
+
+    # names of derived results mapped to the names of their sources
+    DEPENDENCIES: dict[str, tuple[str]] = {}
+
+    def source(self, name: str, cached: bool = False) -> Any:
+        """
+        Retrieves the payload of a source.
+
+        Positional arguments:
+            name: str,
+                name of the source.
+
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, the cached payload is used if available.
+
+        Returns:
+            Any
+        """
+
+        key = f"{self.username}.source({name})"
+        record = self.get(key) if cached else None
+        if record is None:
+            payload = self.fetch_source(name)
+            # (fingerprint, payload)
+            record = (fingerprint(payload), payload)
+            self[key] = record
+        return record[1]
+
+    def fingerprints(self, name: str, **params: dict[str, Any]) -> Optional[dict]:
+        """
+        Collects the fingerprints of the cached sources of a derived result.
+
+        Positional arguments:
+            name: str,
+                name of the derived result.
+
+            **params: dict[str,Any],
+                parameters the result has been computed with.
+
+        Returns:
+            dict: fingerprints of the sources and the parameters,
+            None if any of the sources is not cached.
+        """
+
+        digests = {}
+        for source in self.DEPENDENCIES[name]:
+            record = self.get(f"{self.username}.source({source})")
+            if record is None:
+                return None
+            digests[source] = record[0]
+        return {"sources": digests, "params": params}
+
+    def derive(
+        self,
+        name: str,
+        compute: Callable[[], Any],
+        cached: bool = False,
+        **params: dict[str, Any],
+    ) -> Any:
+        """
+        Retrieves a derived result. Its sources are fetched first, the result is
+        recomputed only if the fingerprints of the sources or the parameters
+        differ from the ones it has been computed with.
+
+        Positional arguments:
+            name: str,
+                name of the derived result.
+
+            compute: Callable[[],Any],
+                computes the result from the cached sources.
+
+        Keyword arguments:
+            cached: bool, default is False,
+                if True, cached sources are not fetched again.
+
+            **params: dict[str,Any],
+                parameters the result is computed with.
+
+        Returns:
+            Any
+        """
+
+        for source in self.DEPENDENCIES[name]:
+            self.source(source, cached)
+        key = f"{self.username}.{name}"
+        inputs = self.fingerprints(name, **params)
+        result = self.get(key)
+        if (
+            result is not None
+            and inputs is not None
+            and self.get(f"{self.username}.inputs({name})") == inputs
+        ):
+            self.debug("Sources of %s unchanged, skipped recomputation", name)
+            return result
+        result = compute()
+        self[key] = result
+        if inputs is not None:
+            self[f"{self.username}.inputs({name})"] = inputs
+        return result
+
+    def invalidate_sources(self, *names: tuple[str]) -> int:
+        """
+        Removes cached sources and the derived results depending on them.
+
+        Positional arguments:
+            names: tuple[str],
+                names of the sources.
+
+        Returns:
+            int: number of removed records.
+        """
+
+        keys = [f"{self.username}.source({name})" for name in names]
+        for derived, sources in self.DEPENDENCIES.items():
+            if set(sources) & set(names):
+                keys += [
+                    f"{self.username}.{derived}",
+                    f"{self.username}.inputs({derived})",
+                ]
+        removed = 0
+        for key in keys:
+            try:
+                del self[key]
+            except KeyError:
+                continue
+            removed += 1
+        self.debug("Invalidated sources %s (%d records)", ", ".join(names), removed)
+        return removed
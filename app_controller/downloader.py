@@ -2,10 +2,12 @@
 
 import base64
 import re
+import tempfile
 from pathlib import Path
-from typing import Generator, Optional, Union
+from typing import Any, Generator, Optional, Union
 
 from .auth import Authenticator
+from .blob_store import BlobStore
 from .dumper import dump4mock
 from .exceptions import ExceptionHandler, RequestFailed
 
@@ -19,13 +21,53 @@ from .exceptions import ExceptionHandler, RequestFailed
 class Downloader(Authenticator):
     """
     Implements methods to download course materials.
+    File bodies are kept in a content-addressed blob store,
+    the cache holds only their metadata.
     """
 
+    def __init__(
+        self,
+        *args: tuple[Any],
+        blob_dir: Optional[str] = None,
+        **kwargs: dict[str, Any],
+    ):
+        """
+        Initializes the blob store holding downloaded files.
+
+        Keyword arguments:
+            blob_dir: str, optional, default is ".blobs" next to the cache database,
+                directory of the blob store (temporary directory for in-memory caches).
+
+            *args, **kwargs:
+                arguments of the Authenticator class.
+        """
+
+        super().__init__(*args, **kwargs)
+        # removed along with the instance (or at exit at the latest)
+        self.blob_tmp = None
+        if blob_dir is None:
+            if self.destination == ":memory:":
+                self.blob_tmp = tempfile.TemporaryDirectory(prefix="blobs-")
+                blob_dir = self.blob_tmp.name
+            else:
+                blob_dir = Path(self.destination).parent / ".blobs"
+        self.blobs = BlobStore(blob_dir)
+        # blobs outlive their cache records by at most one TTL
+        policy = self.policy("downloads")
+        self.blobs.prune(self.max_age if policy.max_age is None else policy.max_age)
+
+    def __exit__(self, exception, content, traceback) -> bool:
+        try:
+            return super().__exit__(exception, content, traceback)
+        finally:
+            if self.blob_tmp is not None:
+                self.blob_tmp.cleanup()
+
     @ExceptionHandler("could not save specified content", RequestFailed)
     def save(
         self,
         filename: str,
-        content: Union[bytes, str],
+        content: Union[bytes, memoryview, str],
         destination: Optional[Path] = None,
     ) -> Path:
         """
@@ -35,7 +77,7 @@ class Downloader(Authenticator):
             filename: str,
                 name of the file.
 
-            content: Union[bytes,str],
+            content: Union[bytes,memoryview,str],
                 content of the file.
 
             destination: Paht, default is the "Downloads" folder in the home directory,
@@ -64,17 +106,17 @@ class Downloader(Authenticator):
                 counter += 1
         # save file contents
         self.debug(f"Saving to {str(target)}")
-        if isinstance(content, bytes):
-            target.write_bytes(content)
-        else:
+        if isinstance(content, str):
             target.write_text(content, encoding="utf-8")
+        else:
+            target.write_bytes(content)
         # return path object
         return target
 
     @ExceptionHandler("could not download specified content", RequestFailed)
     def download(
         self, link: str, cached: Optional[bool] = False, chunk: Optional[int] = None
-    ) -> tuple[str, Union[bytes, Generator[bytes, None, None]], int]:
+    ) -> tuple[str, Union[bytes, memoryview, Generator[bytes, None, None]], int]:
         """
         Sends HTTP request to fetch target file.
 
@@ -89,21 +131,29 @@ class Downloader(Authenticator):
                 if set to valid integer, denotes the chunk size in bytes.
 
         Returns:
-            tuple[str,Union[bytes,Generator[bytes,None,None]],int]:
+            tuple[str,Union[bytes,memoryview,Generator[bytes,None,None]],int]:
                 From left to right:
                     content-disposition,
-                    content,
+                    content (memory mapped if retrieved from cache),
                     content-lenght.
         """
 
         cache_key = f"{self.username}.link({base64.b64encode(link.encode('utf-8')).decode('utf-8')})"
-        if all(
-            (
-                cached and self.get(cache_key) is not None,
-                chunk is None,
-            )
+        # cached as (content-disposition, digest of the blob, content-length)
+        metadata = self.get(cache_key) if cached else None
+        if (
+            metadata is not None
+            and isinstance(metadata[1], str)
+            and metadata[1] in self.blobs
         ):
-            return self[cache_key]
+            content_disposition, digest, content_length = metadata
+            return (
+                content_disposition,
+                self.blobs.read(digest)
+                if chunk is None
+                else self.blobs.iter_chunks(digest, chunk),
+                content_length,
+            )
 
         self.debug(f"Requesting document from {link}")
 
@@ -129,11 +179,20 @@ class Downloader(Authenticator):
 
         self.debug("Successfully downloaded content")
         if chunk is None:
-            result = (content_disposition, response.content, content_length)
-            self[cache_key] = result
-            return result
+            self[cache_key] = (
+                content_disposition,
+                self.blobs.put(response.content),
+                content_length,
+            )
+            return (content_disposition, response.content, content_length)
+        # the content is cached once the stream has been consumed
         return (
             content_disposition,
-            response.iter_content(chunk_size=chunk),
+            self.blobs.tee(
+                response.iter_content(chunk_size=chunk),
+                lambda digest: self.__setitem__(
+                    cache_key, (content_disposition, digest, content_length)
+                ),
+            ),
             content_length,
         )
@@ -4,9 +4,54 @@ import hashlib
 import os
 import pickle
 import re
-from inspect import getmembers, getmro, isfunction, ismethod, stack
+import sys
+from functools import lru_cache
+from inspect import getmembers, getmro, isfunction, ismethod
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Optional, Union
+
+
+@lru_cache(maxsize=None)
+def path_limits() -> tuple[int, int]:
+    """
+    Retrieves the file name and path length limits of the root file system.
+    Queried once, since the limits do not change during runtime.
+
+    Returns:
+        tuple[int,int]: PC_NAME_MAX, PC_PATH_MAX
+    """
+
+    return os.pathconf(os.sep, "PC_NAME_MAX"), os.pathconf(os.sep, "PC_PATH_MAX")
+
+
+@lru_cache(maxsize=None)
+def resolve_owner(cls: type, method: str) -> Optional[str]:
+    """
+    Applies the method resolution order on class level
+    to find the class name the dumped method is attributed to.
+    Memoized, since walking the MRO is expensive and its result is static.
+
+    Positional arguments:
+        cls: type,
+            class object to start the resolution with.
+
+        method: str,
+            name of the method.
+
+    Returns:
+        Optional[str]: name of the class or None if the method was not found.
+    """
+
+    owner = None
+    for cls_object in getmro(cls):
+        # retrieve methods (for class level identified as function objects)
+        for name, _ in getmembers(
+            cls_object, predicate=lambda o: isfunction(o) or ismethod(o)
+        ):
+            # method found somewhere else in the MRO
+            if name == method:
+                owner = cls_object.__name__
+    return owner
 
 
 class __dump4mockMeta__(type):
@@ -25,6 +70,11 @@ class __dump4mockMeta__(type):
 
     @DUMP_CLASS.setter
     def DUMP_CLASS(self, value):
+        # disable recording
+        if value is None:
+            self._dump_class.clear()
+            return
+
         def set(value):
             if isinstance(value, type):
                 self._dump_class.append(value.__name__)
@@ -37,6 +87,11 @@ class __dump4mockMeta__(type):
         else:
             set(value)
 
+    # recording is enabled if at least one class has been selected
+    @property
+    def RECORDING(self) -> bool:
+        return bool(self._dump_class)
+
     # location for dumped files
     @property
     def MOCK_DIR(self):
@@ -67,6 +122,12 @@ class dump4mock(metaclass=__dump4mockMeta__):
     or:
         dump4mock.DUMP_CLASS = [class1, class2, ...]
 
+    To disable the dump behavior again:
+        dump4mock.DUMP_CLASS = None
+
+    While no class is selected, dump requests (overwrite=True) are discarded
+    right away without inspecting the caller's frame.
+
     To clean dumped contents from local storage:
         dump4mock([class1, ...])
 
@@ -102,12 +163,14 @@ class dump4mock(metaclass=__dump4mockMeta__):
 
         if isinstance(fname, (list, tuple)):
             return dump4mock.__clear__(fname)
+        # production path: recording is disabled, nothing to dump
+        elif overwrite and not cls._dump_class:
+            return
         elif (
             isinstance(fname, Path)
             and fname.exists()
-            or len(fname) < os.pathconf(os.sep, "PC_NAME_MAX")
-            and len(os.path.join(*map(str, [cls.MOCK_DIR, fname])))
-            < os.pathconf(os.sep, "PC_PATH_MAX")
+            or len(fname) < path_limits()[0]
+            and len(os.path.join(*map(str, [cls.MOCK_DIR, fname]))) < path_limits()[1]
             and (
                 dump4mock.MOCK_DIR
                 / (str(fname).endswith(".dump") and fname or f"{fname}.dump")
@@ -138,9 +201,14 @@ class dump4mock(metaclass=__dump4mockMeta__):
                 frame context level (namespace order number in the callers' stack).
         """
 
-        frames = stack()
+        # recording is disabled
+        if not cls._dump_class:
+            return
+
+        # caller's frame, retrieved without collecting the source context of the whole stack
+        frame = sys._getframe(context)
         # method's frame (local namespace)
-        frame_locals = frames[context][0].f_locals
+        frame_locals = frame.f_locals
 
         # regular expressions
         subscription = re.compile(r"(\(.*?\)|\[.+?\])(?=@)", re.DOTALL | re.MULTILINE)
@@ -153,7 +221,7 @@ class dump4mock(metaclass=__dump4mockMeta__):
             or frame_locals.get("cls")
             and frame_locals["cls"].__name__
             or "root",
-            "method": frames[context].function,
+            "method": frame.f_code.co_name,
             "cnt": 1,
             # simplify key in order to prevent violation of allowed filename charset
             "key": subscription.sub("", str(key), 1),
@@ -162,14 +230,9 @@ class dump4mock(metaclass=__dump4mockMeta__):
         # apply method resolution order
         def apply_mro(cls):
             # apply MRO on class level and not instance level
-            for cls_object in getmro(cls):
-                # retrieve methods (for class level identified as function objects)
-                for name, _ in getmembers(
-                    cls_object, predicate=lambda o: isfunction(o) or ismethod(o)
-                ):
-                    # method found somewhere else in the MRO
-                    if name == kwargs["method"]:
-                        kwargs["class"] = cls_object.__name__
+            owner = resolve_owner(cls, kwargs["method"])
+            if owner:
+                kwargs["class"] = owner
 
         if frame_locals.get("self"):
             apply_mro(frame_locals.get("self").__class__)
@@ -182,6 +245,10 @@ class dump4mock(metaclass=__dump4mockMeta__):
                 elif isinstance(value, object):
                     apply_mro(value.__class__)
 
+        # class is not supported, skip evaluation of the key
+        if kwargs["class"] not in cls.DUMP_CLASS:
+            return
+
         target = cls.MOCK_DIR / tmpl.format(**kwargs)
         # strip annotations
         base = comment.sub("", subscription.sub("", str(key)))
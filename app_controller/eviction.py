@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+from typing import Hashable, Iterable, Union
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+class EvictionPolicy:
+    """
+    Base class of eviction policies used by the Cache.
+    A policy ranks records by their insertion timestamp, last access timestamp
+    and access count. Records with the lowest rank are evicted first.
+    The same ranking is expressed as SQL ordering for the database tier,
+    so that both tiers evict records in the same order.
+    """
+
+    # name used to select the policy
+    name = "base"
+    # SQL ordering of records from the most to the least worth keeping
+    order_by = "InsertedAt DESC"
+    # columns of the index supporting the ordering
+    index = ("InsertedAt",)
+
+    def rank(self, inserted_at: float, accessed_at: float, hits: int) -> tuple:
+        """
+        Ranks a record.
+
+        Positional arguments:
+            inserted_at: float,
+                insertion timestamp.
+
+            accessed_at: float,
+                timestamp of the last access.
+
+            hits: int,
+                number of accesses.
+
+        Returns:
+            tuple: sort key, the lowest rank is evicted first.
+        """
+
+        return (inserted_at,)
+
+    def victim(self, records: Iterable[tuple[Hashable, float, float, int]]) -> Hashable:
+        """
+        Selects the record to be evicted.
+
+        Positional arguments:
+            records: Iterable[tuple[Hashable,float,float,int]],
+                records as tuples of key, insertion timestamp,
+                last access timestamp and access count.
+
+        Returns:
+            Hashable: key of the record to be evicted.
+        """
+
+        return min(records, key=lambda record: self.rank(*record[1:]))[0]
+
+
+class LRU(EvictionPolicy):
+    """
+    Evicts the least recently used record first.
+    """
+
+    name = "lru"
+    order_by = "AccessedAt DESC"
+    index = ("AccessedAt",)
+
+    def rank(self, inserted_at: float, accessed_at: float, hits: int) -> tuple:
+        return (accessed_at,)
+
+
+class LFU(EvictionPolicy):
+    """
+    Evicts the least frequently used record first,
+    ties are broken by the last access.
+    """
+
+    name = "lfu"
+    order_by = "Hits DESC, AccessedAt DESC"
+    index = ("Hits", "AccessedAt")
+
+    def rank(self, inserted_at: float, accessed_at: float, hits: int) -> tuple:
+        return (hits, accessed_at)
+
+
+class TTLFirst(EvictionPolicy):
+    """
+    Evicts the record closest to its expiration first.
+    Records with a prolongated life time are kept the longest.
+    """
+
+    name = "ttl"
+
+
+# available policies by name
+EVICTION_POLICIES = {policy.name: policy for policy in (LRU, LFU, TTLFirst)}
+
+
+def get_eviction_policy(policy: Union[str, EvictionPolicy]) -> EvictionPolicy:
+    """
+    Resolves an eviction policy.
+
+    Positional arguments:
+        policy: Union[str,EvictionPolicy],
+            name of the policy ("lru", "lfu", "ttl") or policy instance.
+
+    Returns:
+        EvictionPolicy
+    """
+
+    if isinstance(policy, EvictionPolicy):
+        return policy
+    try:
+        return EVICTION_POLICIES[str(policy).lower()]()
+    except KeyError:
+        raise ValueError(f"unknown eviction policy: {policy}") from None
@@ -9,6 +9,7 @@ from bs4 import BeautifulSoup
 from .auth import Authenticator
 from .dumper import dump4mock
 from .exceptions import ExceptionHandler, RequestFailed
+from .refresher import revalidate
 
 ###############
 #             #
@@ -23,6 +24,7 @@ class GradesReporter(Authenticator):
     """
 
     @ExceptionHandler("could not retrieve data", RequestFailed)
+    @revalidate
     def get_grades(self, cached: bool = False) -> OrderedDict:
         """
         Returns grades with legend.
@@ -31,6 +33,10 @@ class GradesReporter(Authenticator):
             cached: bool, default is False,
                 if True, response will be retrieved from cache.
 
+            callback: Callable[[Any],None], optional,
+                if passed along with cached=True, the cached response is refreshed
+                in the background and the callback is called with fresher data.
+
         Returns:
             dict:
             {
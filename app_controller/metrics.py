@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import json
+from collections import Counter, defaultdict
+from typing import Any, Iterable
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+# upper bounds of latency buckets in seconds
+LATENCY_BUCKETS = (
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    float("inf"),
+)
+
+
+class Histogram:
+    """
+    Histogram of observed values with fixed bucket bounds.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        """
+        Create a histogram.
+
+        Keyword arguments:
+            buckets: Iterable[float], optional, default is LATENCY_BUCKETS,
+                ascending upper bounds of the buckets, the last one should be infinite.
+        """
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Records an observation.
+
+        Positional arguments:
+            value: float,
+                observed value.
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict: cumulative counts per upper bound, sum and count of observations.
+        """
+
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[repr(bound) if bound != float("inf") else "+Inf"] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class CacheMetrics:
+    """
+    Counters per tier and namespace and latency histograms of cache operations.
+    """
+
+    # counted events
+    EVENTS = ("hits", "misses", "evictions", "expirations")
+    # timed operations
+    OPERATIONS = ("get", "set", "flush")
+
+    def __init__(self):
+        # (tier, namespace) -> event -> count
+        self.counters = defaultdict(Counter)
+        self.latency = {operation: Histogram() for operation in self.OPERATIONS}
+
+    def count(self, tier: str, namespace: str, event: str, number: int = 1):
+        """
+        Increments an event counter.
+
+        Positional arguments:
+            tier: str,
+                "memory" or "database".
+
+            namespace: str,
+                name of the namespace.
+
+            event: str,
+                one of EVENTS.
+
+        Keyword arguments:
+            number: int, optional, default is 1,
+                number of events.
+        """
+
+        self.counters[(tier, namespace)][event] += number
+
+    def observe(self, operation: str, seconds: float):
+        """
+        Records the latency of an operation.
+
+        Positional arguments:
+            operation: str,
+                one of OPERATIONS.
+
+            seconds: float,
+                duration of the operation.
+        """
+
+        self.latency[operation].observe(seconds)
+
+    def snapshot(self, gauges: dict[tuple[str, str], dict[str, int]]) -> dict:
+        """
+        Collects counters, gauges and histograms.
+
+        Positional arguments:
+            gauges: dict[tuple[str,str],dict[str,int]],
+                current number of records and bytes per tier and namespace.
+
+        Returns:
+            dict:
+            {
+                "tiers": {
+                    tier: {
+                        namespace: {
+                            "hits": int,
+                            "misses": int,
+                            "evictions": int,
+                            "expirations": int,
+                            "records": int,
+                            "bytes": int
+                        }, ...
+                    }, ...
+                },
+                "latency": {
+                    operation: {
+                        "buckets": {upper bound: int, ...},
+                        "sum": float,
+                        "count": int
+                    }, ...
+                }
+            }
+        """
+
+        tiers = {"memory": {}, "database": {}}
+        for tier, namespace in sorted({*self.counters, *gauges}):
+            tiers[tier][namespace or "default"] = {
+                **{
+                    event: self.counters[(tier, namespace)][event]
+                    for event in self.EVENTS
+                },
+                "records": 0,
+                "bytes": 0,
+                **gauges.get((tier, namespace), {}),
+            }
+        return {
+            "tiers": tiers,
+            "latency": {
+                operation: histogram.snapshot()
+                for operation, histogram in self.latency.items()
+            },
+        }
+
+
+def to_json(snapshot: dict, **kwargs: dict[str, Any]) -> str:
+    """
+    Dumps a metrics snapshot as JSON.
+
+    Positional arguments:
+        snapshot: dict,
+            result of CacheMetrics.snapshot.
+
+        **kwargs: dict[str,Any],
+            keyword arguments of json.dumps.
+
+    Returns:
+        str
+    """
+
+    return json.dumps(snapshot, **kwargs)
+
+
+def to_prometheus(snapshot: dict, prefix: str = "mycampus_cache") -> str:
+    """
+    Dumps a metrics snapshot in the Prometheus text exposition format.
+
+    Positional arguments:
+        snapshot: dict,
+            result of CacheMetrics.snapshot.
+
+    Keyword arguments:
+        prefix: str, optional, default is "mycampus_cache",
+            prefix of the metric names.
+
+    Returns:
+        str
+    """
+
+    lines = []
+    for event in (*CacheMetrics.EVENTS, "records", "bytes"):
+        name = f"{prefix}_{event}" + ("_total" if event in CacheMetrics.EVENTS else "")
+        lines.append(
+            "# TYPE %s %s"
+            % (name, "counter" if event in CacheMetrics.EVENTS else "gauge")
+        )
+        for tier, namespaces in snapshot["tiers"].items():
+            for namespace, values in namespaces.items():
+                lines.append(
+                    f'{name}{{tier="{tier}",namespace="{namespace}"}} {values[event]}'
+                )
+    name = f"{prefix}_latency_seconds"
+    lines.append(f"# TYPE {name} histogram")
+    for operation, histogram in snapshot["latency"].items():
+        for bound, count in histogram["buckets"].items():
+            lines.append(
+                f'{name}_bucket{{operation="{operation}",le="{bound}"}} {count}'
+            )
+        lines.append(f'{name}_sum{{operation="{operation}"}} {histogram["sum"]}')
+        lines.append(f'{name}_count{{operation="{operation}"}} {histogram["count"]}')
+    return "\n".join(lines) + "\n"
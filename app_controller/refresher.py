@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from threading import Event, Lock, Thread, local
+from typing import Any, Callable, Optional
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+class Refresher:
+    """
+    Extension refreshing cached results in background threads
+    (stale-while-revalidate, refresh-ahead). Has to precede the Cache class in the MRO.
+    """
+
+    # maximum number of concurrent background refreshes
+    max_refresh_workers = 2
+    # maximum number of refreshes scheduled ahead of expiry per check
+    max_refresh_ahead = 4
+
+    def __init__(
+        self,
+        refresh_ahead: Optional[float] = None,
+        refresh_interval: Optional[float] = 60.0,
+    ):
+        """
+        Initializes the refresher.
+
+        Keyword arguments:
+            refresh_ahead: float, optional, default is None,
+                seconds before expiry at which records read since they have been
+                stored are refreshed through the method which stored them,
+                None disables refresh-ahead.
+
+            refresh_interval: float, optional, default is 60.0,
+                seconds between checks for records to be refreshed ahead.
+        """
+
+        # marks results fetched (and stored) by the current thread
+        # and the method call being executed
+        self.fetched = local()
+        # keys of refreshes in progress
+        self.refreshing = set()
+        self.refresh_lock = Lock()
+        self.refresh_executor = None
+        # method calls which have stored a key
+        self.owners = {}
+        # keys read since they have been stored mapped to the time of the last read
+        # (tracked while refresh-ahead is enabled)
+        self.reads = {}
+        self.refresh_ahead = refresh_ahead
+        self.refresh_interval = refresh_interval
+        self.refresh_stop = Event()
+        if refresh_ahead is not None:
+            Thread(target=self.refresh_loop, daemon=True).start()
+
+    def __getitem__(self, __k: str, with_age: bool = False) -> Any:
+        __v = super().__getitem__(__k, with_age)
+        if self.refresh_ahead is not None and not getattr(
+            self.fetched, "refreshing", False
+        ):
+            self.reads[__k] = time.time()
+        return __v
+
+    def __setitem__(self, __k: str, __v: Any, set_time: float = None):
+        self.fetched.stored = True
+        self.reads.pop(__k, None)
+        call = getattr(self.fetched, "call", None)
+        if call is not None:
+            self.owners.setdefault(__k, OrderedDict())[call] = None
+        super().__setitem__(__k, __v, set_time)
+
+    def __delitem__(self, __k: str):
+        self.reads.pop(__k, None)
+        super().__delitem__(__k)
+
+    def release(self, key: str) -> bool:
+        # only records held in memory are refreshed ahead
+        self.reads.pop(key, None)
+        return super().release(key)
+
+    def invalidate(self, prefix: str) -> int:
+        removed = super().invalidate(prefix)
+        # refresh-ahead does not bring back invalidated records
+        for memo in (self.owners, self.reads):
+            for key in [key for key in memo if self.get_prefix(key) == prefix]:
+                memo.pop(key, None)
+        return removed
+
+    def refresh_loop(self):
+        """
+        Checks periodically for records to be refreshed ahead of expiry.
+        """
+
+        while not self.refresh_stop.wait(self.refresh_interval):
+            try:
+                self.refresh_expiring()
+            except BaseException:
+                self.error("Failed to schedule refresh-ahead")
+
+    def refresh_expiring(self) -> int:
+        """
+        Schedules refreshes of records which have been read since they have been
+        stored and which expire within refresh_ahead seconds.
+        At most max_refresh_ahead refreshes are scheduled.
+
+        Returns:
+            int: number of scheduled refreshes.
+        """
+
+        now, scheduled = time.time(), 0
+        for key in list(self.reads):
+            if scheduled >= self.max_refresh_ahead:
+                break
+            # (value, set time) of a record held in memory
+            record = OrderedDict.get(self, key)
+            if record is None or key not in self.owners:
+                self.reads.pop(key, None)
+                continue
+            if record[1] + self.max_age > now + self.refresh_ahead:
+                continue
+            for name, args, kwargs in list(self.owners[key]):
+                if scheduled >= self.max_refresh_ahead:
+                    break
+                self.refresh(name, args, dict(kwargs))
+                scheduled += 1
+            else:
+                # refreshed once per read, remaining owners are scheduled
+                # on the next check unless a refresh has stored the key already
+                self.reads.pop(key, None)
+        if scheduled:
+            self.debug("Scheduled %d refreshes ahead of expiry", scheduled)
+        return scheduled
+
+    def refresh(
+        self,
+        name: str,
+        args: tuple[Any],
+        kwargs: dict[str, Any],
+        stale: Any = None,
+        callback: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Schedules a refresh of a cached result.
+        Concurrent refreshes of the same result are coalesced.
+
+        Positional arguments:
+            name: str,
+                name of the method to be called with cached=False.
+
+            args: tuple[Any],
+                positional arguments of the method.
+
+            kwargs: dict[str,Any],
+                keyword arguments of the method.
+
+            stale: Any, optional,
+                cached result.
+
+            callback: Callable[[Any],None], optional,
+                called with the fresh result if it differs from the cached one.
+        """
+
+        key = (name, args, tuple(sorted(kwargs.items())))
+        with self.refresh_lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+            if self.refresh_executor is None:
+                self.refresh_executor = ThreadPoolExecutor(
+                    max_workers=self.max_refresh_workers,
+                    thread_name_prefix="refresher",
+                )
+
+        def task():
+            # reads of background refreshes are not tracked
+            self.fetched.refreshing = True
+            try:
+                fresh = getattr(self, name)(*args, cached=False, **kwargs)
+            except BaseException:
+                self.warning("Failed to refresh %s", name)
+                return
+            finally:
+                with self.refresh_lock:
+                    self.refreshing.discard(key)
+            if callback is not None and fresh != stale:
+                self.debug("Refreshed %s", name)
+                try:
+                    callback(fresh)
+                except BaseException:
+                    self.error("Refresh callback of %s failed", name)
+
+        self.refresh_executor.submit(task)
+
+
+def revalidate(method: Callable) -> Callable:
+    """
+    Decorator adding the stale-while-revalidate mode to cached reads of a Refresher.
+    If a callback is passed along with cached=True, the cached result is returned
+    immediately and refreshed in the background. The callback is called
+    (from a background thread) once fresher data has arrived.
+    Results which have not been cached yet are fetched as usual.
+    """
+
+    @wraps(method)
+    def inner(
+        instance: Refresher,
+        *args: tuple[Any],
+        cached: bool = False,
+        callback: Optional[Callable[[Any], None]] = None,
+        **kwargs: dict[str, Any],
+    ) -> Any:
+        # keys stored during the call are owned by the call
+        outer = getattr(instance.fetched, "call", None)
+        instance.fetched.call = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            if not cached or callback is None:
+                return method(instance, *args, cached=cached, **kwargs)
+            instance.fetched.stored = False
+            result = method(instance, *args, cached=True, **kwargs)
+            if not instance.fetched.stored:
+                instance.refresh(method.__name__, args, kwargs, result, callback)
+            return result
+        finally:
+            instance.fetched.call = outer
+
+    return inner
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import io
+import marshal
+import pickle
+import struct
+from typing import Any, Callable, Optional
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+# minimal size of bytes objects stored out-of-band by the pickle5 serializer
+OUT_OF_BAND_THRESHOLD = 64 * 1_024
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler collecting large bytes objects out-of-band.
+    """
+
+    def __init__(self, file: io.BytesIO):
+        super().__init__(file, protocol=5)
+        self.buffers = []
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        if type(obj) is bytes and len(obj) >= OUT_OF_BAND_THRESHOLD:
+            self.buffers.append(obj)
+            return len(self.buffers) - 1
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Unpickler resolving bytes objects stored out-of-band.
+    """
+
+    def __init__(self, file: io.BytesIO, buffers: list[memoryview]):
+        super().__init__(file)
+        self.buffers = buffers
+
+    def persistent_load(self, pid: int) -> bytes:
+        return self.buffers[pid].tobytes()
+
+
+def pickle5_dumps(value: Any) -> bytes:
+    """
+    Pickles a value (protocol 5) without copying large bytes objects
+    into the pickle stream. The result is framed as: number of buffers,
+    lengths of the buffers, buffers and the pickle stream.
+
+    Positional arguments:
+        value: Any,
+            value to be serialized.
+
+    Returns:
+        bytes
+    """
+
+    file = io.BytesIO()
+    pickler = _Pickler(file)
+    pickler.dump(value)
+    return b"".join(
+        (
+            struct.pack(
+                "<I%dQ" % len(pickler.buffers),
+                len(pickler.buffers),
+                *map(len, pickler.buffers),
+            ),
+            *pickler.buffers,
+            file.getbuffer(),
+        )
+    )
+
+
+def pickle5_loads(data: bytes) -> Any:
+    """
+    Loads a value serialized by pickle5_dumps.
+
+    Positional arguments:
+        data: bytes,
+            serialized value.
+
+    Returns:
+        Any
+    """
+
+    view = memoryview(data)
+    (count,) = struct.unpack_from("<I", view)
+    offset = struct.calcsize("<I%dQ" % count)
+    buffers = []
+    for length in struct.unpack_from("<%dQ" % count, view, 4):
+        buffers.append(view[offset : offset + length])
+        offset += length
+    return _Unpickler(io.BytesIO(view[offset:]), buffers).load()
+
+
+# available serializers by name: (dumps, loads)
+# marshal is limited to builtin types (exact types only, e.g. no OrderedDict)
+# and raises ValueError otherwise, its format is stable since Python 3.4
+SERIALIZERS: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "pickle": (
+        lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+    ),
+    "pickle5": (pickle5_dumps, pickle5_loads),
+    "marshal": (lambda value: marshal.dumps(value, 4), marshal.loads),
+}
+
+
+def get_serializer(serializer: Optional[str]) -> str:
+    """
+    Resolves the name of a serializer.
+
+    Positional arguments:
+        serializer: str, optional,
+            name of the serializer ("auto", "pickle", "pickle5", "marshal"),
+            None denotes "auto".
+
+    Returns:
+        str
+    """
+
+    serializer = str(serializer or "auto").lower()
+    if serializer != "auto" and serializer not in SERIALIZERS:
+        raise ValueError(f"unknown serializer: {serializer}")
+    return serializer
+
+
+def serialize(value: Any, serializer: str) -> tuple[bytes, str]:
+    """
+    Serializes a value.
+    "auto" and "marshal" use marshal for values consisting of builtin types
+    (e.g. lists of dicts of str and int) and fall back to pickle otherwise.
+
+    Positional arguments:
+        value: Any,
+            value to be serialized.
+
+        serializer: str,
+            name of the serializer.
+
+    Returns:
+        tuple[bytes,str]: serialized value and name of the serializer used.
+    """
+
+    if serializer in ("auto", "marshal"):
+        try:
+            return SERIALIZERS["marshal"][0](value), "marshal"
+        except ValueError:
+            serializer = "pickle"
+    return SERIALIZERS[serializer][0](value), serializer
+
+
+def deserialize(data: bytes, serializer: str) -> Any:
+    """
+    Deserializes a value.
+
+    Positional arguments:
+        data: bytes,
+            serialized value.
+
+        serializer: str,
+            name of the serializer used to serialize the value.
+
+    Returns:
+        Any
+    """
+
+    return SERIALIZERS[serializer][1](data)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+from threading import Barrier
+
+from ..async_client import AsyncClient
+from ..exceptions import RequestFailed
+
+
+class BlockingClient:
+    """
+    Stand-in for the Client class with blocking requests.
+    """
+
+    def __init__(self):
+        # fails unless 4 requests are executed at the same time
+        self.barrier = Barrier(4, timeout=5)
+
+    def list_course_resources(self, course_id: int, cached: bool = False) -> list:
+        self.barrier.wait()
+        return [{"id": course_id, "cached": cached}]
+
+    def export_calendar(self, **kwargs) -> tuple:
+        kwargs["callback"]("fresh")
+        return "calendar.ics", kwargs
+
+    def download(self, link: str, cached: bool = False, chunk: int = None) -> tuple:
+        content = b"0123456789"
+        if chunk is None:
+            return "file.pdf", content, len(content)
+        return (
+            "file.pdf",
+            (content[i : i + chunk] for i in range(0, len(content), chunk)),
+            len(content),
+        )
+
+    def enroll(self, **kwargs):
+        raise RequestFailed("failed to enroll")
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = AsyncClient(BlockingClient(), max_workers=4)
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_gather(self):
+        async def gather():
+            return await asyncio.gather(
+                *(
+                    self.client.list_course_resources(course_id, cached=True)
+                    for course_id in range(4)
+                )
+            )
+
+        # requests are executed concurrently
+        results = asyncio.run(gather())
+        self.assertEqual(
+            results, [[{"id": course_id, "cached": True}] for course_id in range(4)]
+        )
+
+    def test_download(self):
+        async def download(chunk):
+            disposition, content, length = await self.client.download(
+                "link", chunk=chunk
+            )
+            if chunk is None:
+                return content
+            return b"".join([data async for data in content])
+
+        self.assertEqual(asyncio.run(download(None)), b"0123456789")
+        self.assertEqual(asyncio.run(download(3)), b"0123456789")
+
+    def test_callback(self):
+        fresh = []
+        fname, kwargs = asyncio.run(
+            self.client.export_calendar(cached=True, callback=fresh.append)
+        )
+        self.assertEqual(fresh, ["fresh"])
+        self.assertTrue(kwargs["cached"])
+
+    def test_exception(self):
+        with self.assertRaises(RequestFailed):
+            asyncio.run(self.client.enroll(curriculumEntryId="1"))
+
+    def test_run_in_executor(self):
+        executors = []
+
+        async def run_in_executor(executor, func):
+            # stand-in for asynckivy.run_in_executor, no asyncio loop is running
+            executors.append(executor)
+            return executor.submit(func).result()
+
+        client = AsyncClient(BlockingClient(), run_in_executor=run_in_executor)
+        try:
+            coroutine = client.download("link")
+            with self.assertRaises(StopIteration) as stop:
+                coroutine.send(None)
+        finally:
+            client.shutdown()
+        self.assertEqual(stop.exception.value[1], b"0123456789")
+        self.assertEqual(executors, [client.executor])
@@ -2,6 +2,7 @@
 
 import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from ..auth import Authenticator
@@ -101,3 +102,55 @@ class AuthenticatorTestCase(unittest.TestCase):
             ),
         )
         self.assertEqual(self.auth.close(), None)
+
+    def test_resume_session(self):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+
+        def create(password: str) -> Authenticator:
+            return Authenticator(
+                "username",
+                password,
+                max_len=100,
+                max_age=30,
+                filepath=tempfile.gettempdir(),
+                verbose=False,
+                emit=False,
+                destination=destination,
+            )
+
+        auth = create("password")
+        auth._session.cookies.set(
+            "MoodleSession", "secret", domain="mycampus.iubh.de", path="/"
+        )
+        auth.save_session()
+        auth.flush()
+
+        # restarted with other credentials
+        other = create("other")
+        with patch.object(other._session, "get") as get:
+            self.assertFalse(other.resume_session())
+            get.assert_not_called()
+        other.flush()
+
+        # restarted while the session is still signed in
+        restarted = create("password")
+        with patch.object(restarted._session, "get") as get, patch.object(
+            restarted, "get_saml_request"
+        ) as get_saml_request:
+            get.return_value = MagicMock(
+                status_code=200,
+                text='<a href="https://mycampus.iubh.de/login/logout.php?sesskey=1">',
+            )
+            restarted.sign_in()
+            get_saml_request.assert_not_called()
+        self.assertEqual(restarted._session.cookies.get("MoodleSession"), "secret")
+        restarted.flush()
+
+        # restarted after the session has expired on the server side
+        expired = create("password")
+        with patch.object(expired._session, "get") as get:
+            get.return_value = MagicMock(status_code=303, text="")
+            self.assertFalse(expired.resume_session())
+        self.assertEqual(len(expired._session.cookies), 0)
+        self.assertIsNone(expired.get("username.session"))
+        expired.flush()
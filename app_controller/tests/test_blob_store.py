@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+from ..blob_store import BlobStore
+
+
+class BlobStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = BlobStore(tempfile.mkdtemp())
+        self.content = b"%PDF-1.7" + os.urandom(10_000)
+
+    def test_put(self):
+        digest = self.store.put(self.content)
+        self.assertEqual(digest, hashlib.sha256(self.content).hexdigest())
+        self.assertIn(digest, self.store)
+        # identical content is stored once
+        self.assertEqual(self.store.put(self.content), digest)
+        self.assertEqual(len(list(self.store.root.glob("*/*"))), 1)
+        content = self.store.read(digest)
+        self.assertIsInstance(content, memoryview)
+        self.assertEqual(content, self.content)
+        self.assertEqual(b"".join(self.store.iter_chunks(digest, 1_024)), self.content)
+        self.assertEqual(self.store.read(self.store.put(b"")), b"")
+
+    def test_tee(self):
+        digests = []
+        chunks = [
+            self.content[i : i + 1_024] for i in range(0, len(self.content), 1_024)
+        ]
+        # interrupted streams are not stored
+        stream = self.store.tee(iter(chunks), digests.append)
+        next(stream)
+        stream.close()
+        self.assertEqual(digests, [])
+        self.assertEqual(list(self.store.root.iterdir()), [])
+        self.assertEqual(
+            b"".join(self.store.tee(iter(chunks), digests.append)), self.content
+        )
+        self.assertEqual(digests, [hashlib.sha256(self.content).hexdigest()])
+        self.assertEqual(self.store.read(digests[0]), self.content)
+
+    def test_prune(self):
+        old, new = self.store.put(b"old"), self.store.put(b"new")
+        past = time.time() - 120
+        os.utime(self.store.path(old), (past, past))
+        self.assertEqual(self.store.prune(60), 1)
+        self.assertNotIn(old, self.store)
+        self.assertIn(new, self.store)
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import sqlite3
 import tempfile
 import time
 import unittest
+from collections import OrderedDict
+from pathlib import Path
+from threading import Barrier, Thread
 
 from ..cache import Cache
 
@@ -84,3 +88,381 @@ class CacheTestCase(unittest.TestCase):
         test_extending_life_time(self)
         test_prolongation(self)
         test_removal(self)
+
+    def test_tiers(self):
+        self.cache["username.courses"] = [{"id": 1}]
+        self.assertEqual(self.cache["username.courses"], [{"id": 1}])
+        self.assertEqual(self.cache.stats["memory"], {"hits": 1, "misses": 0})
+        self.assertEqual(self.cache.stats["database"], {"hits": 0, "misses": 0})
+
+        # evict from the in-memory tier only
+        OrderedDict.__delitem__(self.cache, "username.courses")
+        # persisted records are found before they are loaded
+        self.assertIn("username.courses", self.cache)
+        self.assertNotIn("username.grades", self.cache)
+        self.assertEqual(self.cache["username.courses"], [{"id": 1}])
+        self.assertEqual(self.cache.stats["memory"], {"hits": 1, "misses": 1})
+        self.assertEqual(self.cache.stats["database"], {"hits": 1, "misses": 0})
+
+        # promoted value is served from memory
+        self.assertEqual(self.cache["username.courses"], [{"id": 1}])
+        self.assertEqual(self.cache.stats["memory"], {"hits": 2, "misses": 1})
+
+        # removal covers both tiers
+        OrderedDict.__delitem__(self.cache, "username.courses")
+        self.assertEqual(self.cache.pop("username.courses"), [{"id": 1}])
+        self.assertEqual(self.cache.get("username.courses"), None)
+        self.assertEqual(self.cache.stats["database"], {"hits": 2, "misses": 1})
+
+    def test_storage(self):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        # legacy table layout storing hex encoded values
+        conn = sqlite3.connect(destination)
+        conn.execute(
+            "CREATE TABLE Cached(Key TEXT PRIMARY KEY, Value BLOB NOT NULL, "
+            "InsertedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL);"
+        )
+        conn.execute("INSERT INTO Cached(Key, Value) VALUES('legacy', '80');")
+        conn.commit()
+        conn.close()
+
+        kwargs = dict(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=30 * 60**2,
+            destination=destination,
+        )
+        cache = Cache(**kwargs)
+        self.assertEqual(
+            cache.conn.execute("PRAGMA user_version;").fetchone()[0],
+            Cache.schema_version,
+        )
+        self.assertEqual(cache.get("legacy"), None, "legacy record not dropped")
+        cache["quoted"] = "it's"
+        cache["binary"] = ("file.pdf", b"\x00" * 1024, 1024)
+        self.assertEqual(
+            cache.conn.execute(
+                "SELECT typeof(Value) FROM Cached WHERE Key = ?;", ("binary",)
+            ).fetchone()[0],
+            "blob",
+        )
+        del cache
+
+        cache = Cache(**kwargs)
+        self.assertEqual(cache.get("quoted"), "it's")
+        self.assertEqual(cache.get("binary"), ("file.pdf", b"\x00" * 1024, 1024))
+
+    def test_write_behind(self):
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=30 * 60**2,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            write_behind=True,
+            flush_interval=60,
+            flush_size=3,
+        )
+
+        def persisted():
+            return [
+                key
+                for key, in cache.conn.execute("SELECT Key FROM Cached ORDER BY Key;")
+            ]
+
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(persisted(), [], "writes not deferred")
+        # queued records are visible after eviction from memory
+        OrderedDict.__delitem__(cache, "a")
+        self.assertEqual(cache["a"], 1)
+        del cache["b"]
+        self.assertEqual(cache.get("b"), None)
+        cache.flush()
+        self.assertEqual(persisted(), ["a"])
+
+        # size threshold
+        for key in ("c", "d", "e"):
+            cache[key] = key
+        self.assertEqual(persisted(), ["a", "c", "d", "e"])
+
+        # flush interval
+        cache.flush_interval = 0.05
+        cache["f"] = "f"
+        time.sleep(0.5)
+        self.assertEqual(persisted(), ["a", "c", "d", "e", "f"])
+
+    def test_sweep(self):
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=3,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            sweep_every=5,
+            sweep_interval=60,
+        )
+        self.assertEqual(cache.conn.execute("PRAGMA auto_vacuum;").fetchone()[0], 2)
+        now = time.time()
+        cache.__setitem__("expired", 0, now - 120)
+        for i in range(4):
+            cache.__setitem__(str(i), i, now + i)
+
+        def persisted():
+            return [
+                key
+                for key, in cache.conn.execute("SELECT Key FROM Cached ORDER BY Key;")
+            ]
+
+        # sweep is due after the fifth write
+        self.assertEqual(persisted(), ["1", "2", "3"])
+        self.assertEqual(cache.writes, 0)
+        # sweeps are amortized
+        cache["4"] = 4
+        self.assertEqual(persisted(), ["1", "2", "3", "4"])
+
+    def test_warm_up(self):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=destination,
+        )
+        for i in range(5):
+            cache[str(i)] = i
+        for key in ("3", "4", "4"):
+            cache[key]
+        cache.flush()
+        cache.sweep()
+        del cache
+
+        # records are loaded lazily
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=destination,
+            items={"5": 5},
+        )
+        self.assertEqual(list(OrderedDict.keys(cache)), ["5"])
+        self.assertEqual(cache["2"], 2)
+        self.assertEqual(cache.stats["database"]["hits"], 1)
+        cache.flush()
+        del cache
+
+        # the most recently used records are warmed up in the background
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=destination,
+            warm_up=2,
+        )
+        cache.warming.join()
+        self.assertEqual(sorted(OrderedDict.keys(cache)), ["2", "5"])
+        self.assertEqual(cache["2"], 2)
+        self.assertEqual(cache.stats["memory"]["hits"], 1)
+
+    def test_byte_budget(self):
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            max_bytes=3_000,
+            max_item_bytes=2_000,
+            max_db_bytes=5_000,
+        )
+        for key in ("a", "b", "c"):
+            cache[key] = b"\x00" * 1_000
+        # the least recently used record is demoted to keep the memory budget
+        self.assertEqual(sorted(OrderedDict.keys(cache)), ["b", "c"])
+        self.assertEqual(cache["a"], b"\x00" * 1_000)
+        self.assertEqual(sorted(OrderedDict.keys(cache)), ["a", "c"])
+
+        # oversized values are served from the database only
+        cache["large"] = b"\x00" * 3_000
+        self.assertNotIn("large", list(OrderedDict.keys(cache)))
+        self.assertEqual(cache["large"], b"\x00" * 3_000)
+        self.assertNotIn("large", list(OrderedDict.keys(cache)))
+
+        # values exceeding the database budget are rejected
+        cache["huge"] = b"\x00" * 6_000
+        self.assertIsNone(cache.get("huge"))
+        cache["large"] = b"\x00" * 6_000
+        self.assertIsNone(cache.get("large"))
+
+        # records beyond the database budget are swept
+        for key in ("d", "e", "f"):
+            cache[key] = b"\x00" * 1_000
+        cache.sweep()
+        self.assertLessEqual(
+            cache.conn.execute("SELECT SUM(LENGTH(Value)) FROM Cached;").fetchone()[0],
+            5_000,
+        )
+        self.assertEqual(
+            cache.get_metrics()["tiers"]["memory"]["default"]["bytes"],
+            sum(cache.sizes[key] for key in OrderedDict.keys(cache)),
+        )
+
+    def test_invalidate(self):
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            write_behind=True,
+        )
+        cache["username"] = "john.doe"
+        for user in ("john.doe", "john.doe2", "jane"):
+            cache[f"{user}.grades"] = {}
+            cache[f"{user}.courses"] = []
+        OrderedDict.__delitem__(cache, "john.doe.courses")
+        self.assertEqual(
+            cache.keys("john.doe"), ["john.doe.courses", "john.doe.grades"]
+        )
+        self.assertEqual(cache.keys("jan"), [])
+        # prefixes are matched up to the record name
+        self.assertEqual(cache.keys("john"), [])
+        self.assertEqual(cache.invalidate("john"), 0)
+        size = cache.size("john.doe")
+        self.assertEqual(size["memory"]["records"], 1)
+        self.assertEqual(size["database"]["records"], 2)
+        self.assertGreater(size["database"]["bytes"], 0)
+
+        self.assertEqual(cache.invalidate("john.doe"), 2)
+        self.assertEqual(cache.keys("john.doe"), [])
+        self.assertIsNone(cache.get("john.doe.grades"))
+        self.assertEqual(
+            cache.keys("john.doe2"), ["john.doe2.courses", "john.doe2.grades"]
+        )
+        self.assertEqual(cache.keys("jane"), ["jane.courses", "jane.grades"])
+        self.assertEqual(cache["username"], "john.doe")
+        self.assertIn("username", cache.keys())
+
+    def test_shared(self):
+        kwargs = dict(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            shared=True,
+            sync_interval=0,
+        )
+        writer, reader = Cache(**kwargs), Cache(**kwargs)
+        self.assertEqual(
+            reader.conn.execute("PRAGMA journal_mode;").fetchone()[0], "wal"
+        )
+        writer["username.grades"] = {"1": 1}
+        writer["username.courses"] = []
+        self.assertEqual(reader["username.grades"], {"1": 1})
+        self.assertEqual(reader["username.courses"], [])
+
+        # records changed or removed by another connection are invalidated
+        writer["username.grades"] = {"1": 2}
+        del writer["username.courses"]
+        self.assertEqual(reader["username.grades"], {"1": 2})
+        self.assertIsNone(reader.get("username.courses"))
+        self.assertEqual(reader.sync(), 0)
+
+    def test_pool(self):
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            write_behind=True,
+            pool=True,
+        )
+        for i in range(10):
+            cache[f"username.record({i})"] = i
+        cache.flush()
+        # queued writes take precedence over the database
+        cache["username.record(0)"] = -1
+        OrderedDict.clear(cache)
+
+        results, connections, barrier = {}, set(), Barrier(10)
+
+        def read(i: int):
+            results[i] = cache[f"username.record({i})"]
+            connections.add(id(cache.reader()))
+            # keep the connections of all threads open
+            barrier.wait()
+
+        threads = [Thread(target=read, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {0: -1, **{i: i for i in range(1, 10)}})
+        self.assertEqual(len(connections), 10)
+        self.assertNotIn(id(cache.conn), connections)
+        self.assertEqual(
+            cache.reader().execute("PRAGMA journal_mode;").fetchone()[0], "wal"
+        )
+        with self.assertRaises(sqlite3.OperationalError):
+            cache.reader().execute("DELETE FROM Cached;")
+
+    def test_snapshot(self):
+        kwargs = dict(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=100,
+            max_age=60,
+            compression="zlib",
+        )
+        image = Path(tempfile.mkdtemp()) / "cache.snapshot"
+        cache = Cache(
+            **kwargs, destination=str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        )
+        for i in range(10):
+            cache[f"username.record({i})"] = [i] * 1_000
+        cache.__setitem__("username.expired", 0, time.time() - 120)
+        cache["username.record(0)"]
+        self.assertEqual(cache.snapshot(image), 10)
+
+        # a fresh cache starts warm
+        restored = Cache(
+            **kwargs,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            image=image,
+        )
+        self.assertEqual(len(OrderedDict.keys(restored)), 0)
+        self.assertEqual(restored["username.record(9)"], [9] * 1_000)
+        # access statistics are kept
+        self.assertEqual(
+            restored.conn.execute(
+                "SELECT Hits FROM Cached WHERE Key = 'username.record(0)';"
+            ).fetchone()[0],
+            1,
+        )
+        self.assertIsNone(restored.get("username.expired"))
+
+        # newer records are kept
+        restored["username.record(1)"] = "newer"
+        self.assertEqual(restored.restore(image), 0)
+        self.assertEqual(restored["username.record(1)"], "newer")
+
+        image.write_bytes(b"garbage")
+        with self.assertRaises(ValueError):
+            restored.restore(image)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+from ..cache import Cache
+from ..cache_policy import DEFAULT_POLICIES, CachePolicy, resolve_policy
+
+
+class CachePolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=3,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            policies=(
+                CachePolicy("settings", "theme_style", max_age=float("inf")),
+                CachePolicy("session", "*.booking_id", persistent=False),
+                CachePolicy("grades", "*.grades", max_age=0),
+                CachePolicy("downloads", "*.link(*)", max_len=2),
+            ),
+        )
+
+    def persisted(self) -> dict:
+        return dict(
+            self.cache.conn.execute("SELECT Key, Namespace FROM Cached ORDER BY Key;")
+        )
+
+    def test_resolve(self):
+        default = CachePolicy("")
+        for key, namespace in (
+            ("username", "settings"),
+            ("theme_style", "settings"),
+            ("username.booking_id", "session"),
+            ("username.grades", "grades"),
+            ("username.ical_events(all)_period(recentupcoming).ics", "calendar"),
+            ("username.link(aHR0cHM6Ly93d3cuZXhhbXBsZS5jb20=)", "downloads"),
+            ("username.unknown", ""),
+        ):
+            with self.subTest(key=key):
+                self.assertEqual(
+                    resolve_policy(DEFAULT_POLICIES, key, default).name, namespace
+                )
+
+    def test_prefix(self):
+        default = CachePolicy("")
+        for key, prefix in (
+            ("theme_style", ""),
+            ("john.doe.grades", "john.doe"),
+            ("john.doe.ical_events(all)_period(recentupcoming).ics", "john.doe"),
+            ("john.source(credits)", "john"),
+            ("john.unknown", "john"),
+        ):
+            with self.subTest(key=key):
+                self.assertEqual(
+                    resolve_policy(DEFAULT_POLICIES, key, default).prefix(key), prefix
+                )
+
+    def test_lookup(self):
+        self.assertEqual(self.cache.policy("downloads").max_len, 2)
+        self.assertIs(self.cache.policy(""), self.cache.default_policy)
+        with self.assertRaises(KeyError):
+            self.cache.policy("unknown")
+
+    def test_ttl(self):
+        self.cache["theme_style"] = "Dark"
+        self.cache["username.grades"] = {}
+        self.cache["username.courses"] = []
+        # expired immediately
+        self.assertNotIn("username.grades", self.cache)
+        self.assertEqual(self.cache.get("username.grades"), None)
+        self.assertEqual(
+            self.cache.conn.execute(
+                "SELECT InsertedAt FROM Cached WHERE Key = 'theme_style';"
+            ).fetchone()[0],
+            float("inf"),
+        )
+        self.cache.sweep()
+        self.assertEqual(
+            self.persisted(), {"theme_style": "settings", "username.courses": ""}
+        )
+        OrderedDict.clear(self.cache)
+        self.assertEqual(self.cache["theme_style"], "Dark")
+
+    def test_persistent(self):
+        self.cache["username.booking_id"] = 1
+        self.assertEqual(self.cache["username.booking_id"], 1)
+        self.assertEqual(self.persisted(), {})
+
+    def test_budget(self):
+        for key in ("username.courses", "username.resources", "username.curriculum"):
+            self.cache[key] = key
+        for i in range(5):
+            self.cache[f"username.link({i})"] = ("lecture.pdf", str(i), 0)
+        # downloads do not evict metadata
+        self.assertEqual(
+            sorted(OrderedDict.keys(self.cache)),
+            [
+                "username.courses",
+                "username.curriculum",
+                "username.link(3)",
+                "username.link(4)",
+                "username.resources",
+            ],
+        )
+        self.cache.sweep()
+        self.assertEqual(
+            sorted(self.persisted()),
+            sorted(OrderedDict.keys(self.cache)),
+        )
+
+    def test_default_budget(self):
+        # namespaces without an own budget are bounded by max_len
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=5,
+            max_age=60,
+            policies=(CachePolicy("grades", "*.grades", max_age=3600),),
+        )
+        for i in range(50):
+            cache[f"user{i:02d}.grades"] = {}
+            cache[f"user{i:02d}.courses"] = []
+        self.assertEqual(len(OrderedDict.keys(cache)), 10)
+        cache.sweep()
+        self.assertEqual(
+            dict(
+                cache.conn.execute(
+                    "SELECT Namespace, COUNT(*) FROM Cached GROUP BY Namespace;"
+                )
+            ),
+            {"": 5, "grades": 5},
+        )
+
+    def test_accounting(self):
+        self.cache["username.courses"] = "x"
+        self.cache["username.link(0)"] = "x"
+        self.cache["username.link(1)"] = "x"
+        del self.cache["username.link(0)"]
+        self.cache.demote("username.courses")
+        self.assertEqual(
+            {name: list(keys) for name, keys in self.cache.members.items()},
+            {"": [], "downloads": ["username.link(1)"]},
+        )
+        self.assertEqual(self.cache.used, self.cache.sizes["username.link(1)"])
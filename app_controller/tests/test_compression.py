@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+from unittest.mock import patch
+
+from ..cache import Cache
+from ..compression import CODECS, compress, decompress, get_codec
+
+
+class CompressionTestCase(unittest.TestCase):
+    def test_codecs(self):
+        data = b"BEGIN:VEVENT\nSUMMARY:Online Tutorial\nEND:VEVENT\n" * 100
+        for codec in CODECS:
+            with self.subTest(codec=codec):
+                compressed, used = compress(data, codec)
+                self.assertEqual(used, codec)
+                self.assertEqual(decompress(compressed, used), data)
+        # small and incompressible data is kept as it is
+        self.assertEqual(compress(data, "zlib", len(data) + 1), (data, "none"))
+        noise = os.urandom(1_024)
+        self.assertEqual(compress(noise, "lzma"), (noise, "none"))
+        self.assertEqual(get_codec(None), "none")
+        with self.assertRaises(ValueError):
+            get_codec("zip")
+
+    def test_missing_codec(self):
+        # e.g. python-for-android built without liblzma
+        with patch.dict(sys.modules, {"lzma": None}):
+            with self.assertRaisesRegex(ValueError, "not available: lzma"):
+                get_codec("lzma")
+            with self.assertRaisesRegex(ValueError, "not available: lzma"):
+                decompress(b"data", "lzma")
+            self.assertEqual(get_codec("zlib"), "zlib")
+
+    def test_cache(self):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        options = dict(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=destination,
+            compress_threshold=1_024,
+        )
+        ical = "BEGIN:VEVENT\nSUMMARY:Online Tutorial\nEND:VEVENT\n" * 100
+        cache = Cache(compression="zlib", **options)
+        cache["calendar"] = ical
+        cache["theme"] = "Dark"
+        cache = Cache(compression="bz2", **options)
+        cache["grades"] = ical
+        self.assertEqual(
+            cache.conn.execute(
+                "SELECT Key, Codec FROM Cached ORDER BY Key;"
+            ).fetchall(),
+            [("calendar", "zlib"), ("grades", "bz2"), ("theme", "none")],
+        )
+        # rows compressed by different codecs are read back
+        cache = Cache(**options)
+        for key, value in (("calendar", ical), ("grades", ical), ("theme", "Dark")):
+            self.assertNotIn(key, OrderedDict.keys(cache))
+            self.assertEqual(cache[key], value)
@@ -2,12 +2,28 @@
 
 import tempfile
 import unittest
+from pathlib import Path
+from threading import Barrier
 from unittest.mock import MagicMock, patch
+from urllib.parse import quote
 
 from ..course_browser import CourseBrowser
 from ..dumper import dump4mock
 
 
+def source_response(url: str, *args, **kwargs) -> MagicMock:
+    # responses of the course registration are picked by the requested endpoint
+    return MagicMock(
+        status_code=200,
+        json=MagicMock(
+            return_value=dump4mock[
+                "CourseBrowser.fetch_source.response.json@session.get(%s)#1"
+                % quote(url, safe="")
+            ]
+        ),
+    )
+
+
 class CourseBrowserTestCase(unittest.TestCase):
     client = CourseBrowser(
         "username",
@@ -85,16 +101,7 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_graded_records.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2FCourseInscriptionCurricular"
-                    "%2FDefaultController%2FfetchCurriculumGrades)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         passed_modules, passed_subjects = self.client.get_graded_records()
         self.assertSetEqual(
             passed_modules,
@@ -110,16 +117,7 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_curricullum_entries.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.assertEqual(
             self.client.get_curricullum_entries(set(), set()),
             dump4mock[
@@ -152,16 +150,7 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_dependency_graph.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.client.get_dependency_graph()
 
     @patch.object(client, "_session")
@@ -169,16 +158,7 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.create_booking_context.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCourses)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.maxDiff = None
         self.assertDictEqual(
             self.client.create_booking_context(
@@ -212,16 +192,7 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.update_enrolled_course_modules.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCourseTickets)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.maxDiff = None
         self.assertDictEqual(
             self.client.update_enrolled_course_modules(
@@ -253,21 +224,12 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.return_value = MagicMock(
-            status_code=200,
-            json=MagicMock(
-                return_value=dump4mock[
-                    "CourseBrowser.get_available_credits.response.json"
-                    "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                    "CourseInscriptionCurricular%2FDefaultController%2FfetchCreditCounts)#1"
-                ]
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.maxDiff = None
         self.assertDictEqual(
             self.client.get_available_credits(),
             dump4mock[
-                "CourseBrowser.get_available_credits.response.json"
+                "CourseBrowser.fetch_source.response.json"
                 "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
                 "CourseInscriptionCurricular%2FDefaultController%2FfetchCreditCounts)#1"
             ],
@@ -278,60 +240,52 @@ class CourseBrowserTestCase(unittest.TestCase):
         self.client[f"{self.client.username}.booking_id"] = dump4mock[
             "CourseBrowser.get_booking_id.booking_id#1"
         ]
-        session_mock.get.side_effect = (
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_graded_records.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2FCourseInscriptionCurricular"
-                        "%2FDefaultController%2FfetchCurriculumGrades)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_curricullum_entries.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCurriculumEntry)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.create_booking_context.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCourses)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.update_enrolled_course_modules.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCourseTickets)#1"
-                    ]
-                ),
-            ),
-            MagicMock(
-                status_code=200,
-                json=MagicMock(
-                    return_value=dump4mock[
-                        "CourseBrowser.get_available_credits.response.json"
-                        "@session.get(https%3A%2F%2Fcare-fs.iubh.de%2Fajax%2F4713%2F"
-                        "CourseInscriptionCurricular%2FDefaultController%2FfetchCreditCounts)#1"
-                    ]
-                ),
-            ),
-        )
+        session_mock.get.side_effect = source_response
         self.maxDiff = None
         self.assertDictEqual(
             self.client.get_courses_to_register(),
             dump4mock["CourseBrowser.get_courses_to_register.result#1"],
         )
+
+    def test_list_all_course_resources(self):
+        client = CourseBrowser(
+            "username",
+            "password",
+            max_len=100,
+            max_age=30,
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+        )
+
+        # fails unless 4 requests are sent at the same time
+        barrier = Barrier(4, timeout=5)
+
+        def get(url, params):
+            barrier.wait()
+            return MagicMock(
+                status_code=200,
+                text='<a href="https://mycampus.iubh.de/mod/resource/view.php'
+                f'?id={params["id"]}">Script {params["id"]}</a>',
+            )
+
+        progress = []
+        with patch.object(client, "_session") as session_mock:
+            session_mock.get.side_effect = get
+            # requests are sent in parallel
+            resources = client.list_all_course_resources(
+                list(range(8)),
+                max_workers=4,
+                progress=lambda *args: progress.append(args),
+            )
+        self.assertEqual(list(resources), list(range(8)))
+        self.assertEqual(resources[3][0]["title"], "Script 3")
+        self.assertEqual(sorted(done for _, done, _ in progress), list(range(1, 9)))
+        # concurrent updates of the cached resources are not lost
+        self.assertEqual(sorted(client["username.resources"]), list(range(8)))
+        self.assertEqual(
+            client.list_all_course_resources([5], cached=True),
+            {5: resources[5]},
+        )
+        client.flush()
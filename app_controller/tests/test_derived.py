@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from ..auth import Authenticator
+from ..course_browser import CourseBrowser
+from ..derived import fingerprint
+
+
+class DerivedTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = CourseBrowser(
+            "username",
+            "password",
+            max_len=100,
+            max_age=30,
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+        )
+        self.client["username.booking_id"] = "1"
+        self.payloads = {
+            "fetchCurriculumGrades": [],
+            "fetchCurriculumEntry": {
+                "curriculumEntries": [
+                    {
+                        "label": "1. Semester",
+                        "children": [
+                            {
+                                "id": 1,
+                                "label": "Mathematics (DLBMA)",
+                                "credits": 5,
+                                "children": [
+                                    {
+                                        "id": 11,
+                                        "label": "Mathematics (DLBMA01)",
+                                        "credits": 5,
+                                        "subjectId": 111,
+                                    }
+                                ],
+                                "presupposedModuleIds": [],
+                                "moduleId": 2,
+                            },
+                            {
+                                "id": 3,
+                                "label": "Statistics (DLBST)",
+                                "credits": 5,
+                                "children": [],
+                                "presupposedModuleIds": [2],
+                                "moduleId": 4,
+                            },
+                        ],
+                    }
+                ]
+            },
+            "fetchCourses": {},
+            "fetchCourseTickets": [],
+            "fetchCreditCounts": {"booked": 0, "total": 180, "remaining": 180},
+        }
+        self.requests = Counter()
+
+        def get(url, **kwargs):
+            endpoint = url.rsplit("/", 1)[-1]
+            self.requests[endpoint] += 1
+            return MagicMock(
+                status_code=200, json=MagicMock(return_value=self.payloads[endpoint])
+            )
+
+        self.client._session = MagicMock()
+        self.client._session.get.side_effect = get
+        self.client._session.post.return_value = MagicMock(status_code=200)
+
+    def tearDown(self):
+        self.client.flush()
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint({"a": 1, "b": [2]}), fingerprint({"b": [2], "a": 1})
+        )
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 2}))
+
+    def test_unchanged_sources(self):
+        result = self.client.get_courses_to_register()
+        self.assertEqual(sum(self.requests.values()), 5)
+        # sources are requested again, but the result is not recomputed
+        self.assertIs(self.client.get_courses_to_register(), result)
+        self.assertEqual(sum(self.requests.values()), 10)
+        # the graph is drawn from the cached curriculum entries
+        graph = self.client.get_dependency_graph(cached=True)
+        self.assertEqual(sum(self.requests.values()), 10)
+        self.assertEqual(graph.number_of_edges(), 1)
+        self.assertIs(self.client.get_dependency_graph(), graph)
+
+    def test_changed_sources(self):
+        result = self.client.get_courses_to_register()
+        self.payloads["fetchCreditCounts"] = {"booked": 5, "total": 180}
+        fresh = self.client.get_courses_to_register()
+        self.assertIsNot(fresh, result)
+        self.assertEqual(fresh["counts"]["booked"], 5)
+
+    def test_enroll(self):
+        result = self.client.get_courses_to_register(cached=True)
+        graph = self.client.get_dependency_graph(cached=True)
+        self.assertFalse(result["semesters"][0]["subjects"][0]["isEnrolled"])
+        self.client.enroll(
+            enrolmentPeriodId="1",
+            lectureSeriesId="1",
+            assignedSubjectIds="111",
+            curriculumEntryId="1",
+            bookingId="1",
+        )
+        self.payloads["fetchCourseTickets"] = [{"curriculumEntryId": 1}]
+        self.requests.clear()
+        result = self.client.get_courses_to_register(cached=True)
+        # only the sources changed by the enrollment are requested again
+        self.assertEqual(
+            self.requests, Counter(fetchCourseTickets=1, fetchCreditCounts=1)
+        )
+        self.assertTrue(result["semesters"][0]["subjects"][0]["isEnrolled"])
+        self.assertIs(self.client.get_dependency_graph(cached=True), graph)
+
+    def test_invalidate_sources(self):
+        self.client.get_courses_to_register()
+        self.client.get_dependency_graph()
+        # source, curriculum, fingerprints of curriculum
+        self.assertEqual(self.client.invalidate_sources("grades"), 3)
+        self.assertIsNone(self.client.get("username.curriculum"))
+        self.assertIsNotNone(self.client.get("username.dependency_graph"))
+        self.assertEqual(self.client.invalidate_sources("grades"), 0)
+
+    def test_reauthenticate(self):
+        self.client.get_courses_to_register()
+        with patch.object(Authenticator, "reauthenticate"), patch.object(
+            CourseBrowser, "get_booking_id", return_value="2"
+        ) as get_booking_id:
+            # the stale booking id is dropped but not requested during the sign-in
+            self.client.reauthenticate()
+            get_booking_id.assert_not_called()
+            self.assertIsNone(self.client.get("username.booking_id"))
+            # the next request of the course registration retrieves it
+            self.client.get_courses_to_register()
+            get_booking_id.assert_called()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import base64
 import tempfile
 import unittest
 from pathlib import Path
@@ -42,6 +43,38 @@ class DownloaderTestCase(unittest.TestCase):
             ),
         )
 
+    @patch.object(client, "_session")
+    def test_cached_download(self, session_mock):
+        content = b"%PDF-1.7" + bytes(range(256)) * 64
+        session_mock.get.return_value = MagicMock(
+            status_code=200,
+            headers={
+                "Content-Disposition": 'attachment; filename="lecture.pdf"',
+                "Content-Length": str(len(content)),
+            },
+            content=content,
+            iter_content=lambda chunk_size: (
+                content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+            ),
+        )
+        links = ("https://www.example.com/1", "https://www.example.com/2")
+        for link in links:
+            _, chunks, _ = self.client.download(link, chunk=1_024)
+            self.assertEqual(b"".join(chunks), content)
+        self.assertEqual(
+            self.client.download(links[0], cached=True, chunk=1_024)[2], len(content)
+        )
+        self.assertEqual(session_mock.get.call_count, 2)
+        # the cache holds only metadata, the content is stored once
+        disposition, digest, length = self.client[
+            f"username.link({base64.b64encode(links[1].encode('utf-8')).decode('utf-8')})"
+        ]
+        self.assertEqual((disposition, length), ("lecture.pdf", len(content)))
+        self.assertEqual(len(list(self.client.blobs.root.glob("*/*"))), 1)
+        disposition, cached, length = self.client.download(links[1], cached=True)
+        self.assertIsInstance(cached, memoryview)
+        self.assertEqual(cached, content)
+
     def test_save(self):
         dir = Path(tempfile.mkdtemp())
         location = self.client.save(
@@ -61,3 +94,21 @@ class DownloaderTestCase(unittest.TestCase):
             location.name,
             "%s (1)" % dump4mock["Downloader.download.content_disposition#1"],
         )
+
+    def test_temporary_blob_dir(self):
+        client = Downloader(
+            "username",
+            "password",
+            max_len=100,
+            max_age=30,
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+        )
+        root = client.blobs.root
+        self.assertTrue(root.is_dir())
+        with patch.object(client, "close"):
+            with client:
+                pass
+        # blobs of in-memory caches do not outlive the client
+        self.assertFalse(root.exists())
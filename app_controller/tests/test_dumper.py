@@ -3,6 +3,7 @@
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from ..dumper import dump4mock
 
@@ -65,6 +66,19 @@ class DumperTestCase(unittest.TestCase):
     def tearDown(self) -> None:
         dump4mock(["Test", "TestChild"])
         dump4mock.MOCK_DIR = self.restore
+        dump4mock.DUMP_CLASS = None
+
+    def test_disabled_recording(self):
+        dump4mock.DUMP_CLASS = None
+        self.assertEqual(dump4mock.RECORDING, False)
+        with patch.object(dump4mock, "__dump__") as dump_mock:
+            val = list(range(10))  # noqa: F841
+            self.assertEqual(dump4mock("val[2]@idx=2", True), None)
+            dump_mock.assert_not_called()
+        Test.keys.clear()
+        Test.test_class_method(2)
+        self.assertEqual(Test.keys, [None])
+        self.assertEqual(list(dump4mock.MOCK_DIR.glob("*.dump")), [])
 
     def test_parent_class(self):
         Test.keys.clear()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+from ..cache import Cache
+from ..eviction import LFU, LRU, TTLFirst, get_eviction_policy
+
+
+class EvictionTestCase(unittest.TestCase):
+    def create_cache(self, eviction: str) -> Cache:
+        return Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=3,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            sweep_every=1_000,
+            sweep_interval=3_600,
+            eviction=eviction,
+        )
+
+    def test_policies(self):
+        records = [("a", 1.0, 5.0, 1), ("b", 2.0, 3.0, 4), ("c", 3.0, 4.0, 1)]
+        self.assertEqual(LRU().victim(records), "b")
+        self.assertEqual(LFU().victim(records), "c")
+        self.assertEqual(TTLFirst().victim(records), "a")
+        self.assertIsInstance(get_eviction_policy("LFU"), LFU)
+        policy = LRU()
+        self.assertIs(get_eviction_policy(policy), policy)
+        with self.assertRaises(ValueError):
+            get_eviction_policy("random")
+
+    def test_memory_tier(self):
+        for eviction, hits, victim in (
+            ("lru", ("a", "c"), "b"),
+            ("lfu", ("a", "a", "b"), "c"),
+            ("ttl", ("a", "b", "c"), "a"),
+        ):
+            with self.subTest(eviction=eviction):
+                cache = self.create_cache(eviction)
+                for key in "abc":
+                    cache[key] = key
+                for key in hits:
+                    cache[key]
+                cache["d"] = "d"
+                self.assertEqual(
+                    sorted(OrderedDict.keys(cache)),
+                    sorted(set("abcd") - {victim}),
+                )
+                # the victim is only demoted, not removed
+                self.assertEqual(cache[victim], victim)
+                self.assertEqual(len(cache), 3)
+
+    def test_database_tier(self):
+        for eviction, hits, victim in (
+            ("lru", ("a", "c", "d"), "b"),
+            ("lfu", ("a", "a", "b", "d"), "c"),
+            ("ttl", ("a", "b", "c", "d"), "a"),
+        ):
+            with self.subTest(eviction=eviction):
+                cache = self.create_cache(eviction)
+                for key in "abcd":
+                    cache[key] = key
+                for key in hits:
+                    cache[key]
+                cache.sweep()
+                self.assertEqual(
+                    [
+                        key
+                        for key, in cache.conn.execute(
+                            "SELECT Key FROM Cached ORDER BY Key;"
+                        )
+                    ],
+                    sorted(set("abcd") - {victim}),
+                )
+                # access statistics are persisted by the sweep
+                self.assertEqual(
+                    cache.conn.execute(
+                        "SELECT Hits FROM Cached WHERE Key = 'd';"
+                    ).fetchone()[0],
+                    1,
+                )
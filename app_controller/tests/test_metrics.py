@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import json
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+from ..cache import Cache
+from ..cache_policy import CachePolicy
+from ..metrics import CacheMetrics, Histogram, to_prometheus
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = Cache(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+            policies=(
+                CachePolicy("grades", "*.grades", max_age=0),
+                CachePolicy("downloads", "*.link(*)", max_len=1),
+            ),
+        )
+
+    def test_histogram(self):
+        histogram = Histogram((0.1, 1.0, float("inf")))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.snapshot(),
+            {
+                "buckets": {"0.1": 2, "1.0": 3, "+Inf": 4},
+                "sum": 2.65,
+                "count": 4,
+            },
+        )
+
+    def test_counters(self):
+        self.cache["username.courses"] = [{"id": 1}]
+        self.cache["username.courses"]
+        OrderedDict.__delitem__(self.cache, "username.courses")
+        self.cache["username.courses"]
+        self.cache.get("username.unknown")
+        # expired immediately
+        self.cache["username.grades"] = {}
+        # evicted from memory by the budget of the namespace
+        self.cache["username.link(1)"] = ("lecture.pdf", "digest", 0)
+        self.cache["username.link(2)"] = ("lecture.pdf", "digest", 0)
+        self.cache.sweep()
+        self.cache.get("username.grades")
+
+        tiers = self.cache.get_metrics()["tiers"]
+        self.assertEqual(
+            {
+                key: tiers["memory"]["default"][key]
+                for key in ("hits", "misses", "records")
+            },
+            {"hits": 1, "misses": 2, "records": 1},
+        )
+        self.assertEqual(
+            {
+                key: tiers["database"]["default"][key]
+                for key in ("hits", "misses", "records")
+            },
+            {"hits": 1, "misses": 1, "records": 1},
+        )
+        self.assertEqual(tiers["memory"]["grades"]["expirations"], 1)
+        self.assertEqual(tiers["database"]["grades"]["expirations"], 1)
+        self.assertEqual(tiers["memory"]["downloads"]["evictions"], 1)
+        self.assertEqual(tiers["database"]["downloads"]["evictions"], 1)
+        self.assertGreater(tiers["database"]["default"]["bytes"], 0)
+        self.assertEqual(self.cache.stats["database"], {"hits": 1, "misses": 2})
+
+    def test_latency(self):
+        self.cache.write_behind = True
+        self.cache["username.courses"] = []
+        self.cache["username.courses"]
+        self.cache.flush()
+        latency = self.cache.get_metrics()["latency"]
+        for operation in CacheMetrics.OPERATIONS:
+            with self.subTest(operation=operation):
+                self.assertEqual(latency[operation]["count"], 1)
+                self.assertEqual(latency[operation]["buckets"]["+Inf"], 1)
+
+    def test_dump(self):
+        self.cache["username.courses"] = []
+        self.cache["username.courses"]
+        self.assertEqual(
+            json.loads(self.cache.dump_metrics())["tiers"]["memory"]["default"]["hits"],
+            1,
+        )
+        text = self.cache.dump_metrics("prometheus")
+        self.assertIn("# TYPE mycampus_cache_hits_total counter", text)
+        self.assertIn(
+            'mycampus_cache_hits_total{tier="memory",namespace="default"} 1', text
+        )
+        self.assertIn('mycampus_cache_latency_seconds_count{operation="get"} 1', text)
+        self.assertTrue(to_prometheus(CacheMetrics().snapshot({})).endswith("\n"))
+        with self.assertRaises(ValueError):
+            self.cache.dump_metrics("xml")
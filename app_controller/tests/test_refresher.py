@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from threading import Event
+
+from ..auth import Authenticator
+from ..refresher import revalidate
+
+
+class Reader(Authenticator):
+    @revalidate
+    def read(self, key: str, *, cached: bool = False) -> int:
+        if cached and self.get(key) is not None:
+            return self[key]
+        self.gate.wait()
+        self.calls += 1
+        self[key] = self.calls
+        return self.calls
+
+    @revalidate
+    def read_course(self, course_id: int, *, cached: bool = False) -> dict:
+        # results of several calls are merged into a single key
+        self["resources"] = {**self.get("resources", {}), course_id: course_id}
+        return self["resources"]
+
+
+class RefresherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = Reader(
+            "username",
+            "password",
+            max_len=100,
+            max_age=30,
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+        )
+        self.client.calls = 0
+        self.client.gate = Event()
+        self.client.gate.set()
+
+    def test_revalidate(self):
+        fresh, done = [], Event()
+
+        def callback(result: int):
+            fresh.append(result)
+            done.set()
+
+        # results which have not been cached yet are fetched as usual
+        self.assertEqual(self.client.read("key", cached=True, callback=callback), 1)
+        self.assertEqual(self.client.calls, 1)
+        # cached results are returned immediately and refreshed in the background
+        self.assertEqual(self.client.read("key", cached=True, callback=callback), 1)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(fresh, [2])
+        self.assertEqual(self.client["key"], 2)
+        self.assertEqual(self.client.read("key", cached=True), 2)
+        self.assertEqual(self.client.read("key"), 3)
+
+    def test_coalescing(self):
+        self.client.read("key")
+        done = Event()
+        self.client.gate.clear()
+        for _ in range(3):
+            self.client.read("key", cached=True, callback=lambda result: done.set())
+        self.client.gate.set()
+        self.assertTrue(done.wait(5))
+        self.client.refresh_executor.shutdown(wait=True)
+        # concurrent refreshes of the same result have been coalesced
+        self.assertEqual(self.client.calls, 2)
+
+    def test_refresh_ahead(self):
+        self.client.refresh_ahead = 60
+        self.client.max_refresh_ahead = 1
+        for key in ("first", "second"):
+            self.client.read(key)
+        # records which have not been read are not refreshed
+        self.assertEqual(self.client.refresh_expiring(), 0)
+        for key in ("first", "second"):
+            self.client.read(key, cached=True)
+        self.assertEqual(self.client.owners["first"], {("read", ("first",), ()): None})
+        # refreshes are capped per check
+        self.assertEqual(self.client.refresh_expiring(), 1)
+        self.assertEqual(self.client.refresh_expiring(), 1)
+        self.client.refresh_executor.shutdown(wait=True)
+        self.assertEqual(self.client.calls, 4)
+        self.assertEqual((self.client["first"], self.client["second"]), (3, 4))
+        # refreshed once per read
+        self.client.reads.clear()
+        self.assertEqual(self.client.refresh_expiring(), 0)
+
+    def test_refresh_ahead_owners(self):
+        self.client.refresh_ahead = 60
+        self.client.max_refresh_ahead = 4
+        self.client.refresh = lambda *args, **kwargs: None
+        for course_id in range(30):
+            self.client.read_course(course_id)
+        self.assertEqual(len(self.client.owners["resources"]), 30)
+        self.client["resources"]
+        # the cap applies to the owners of a key as well
+        self.assertEqual(self.client.refresh_expiring(), 4)
+        self.assertEqual(self.client.refresh_expiring(), 4)
+
+    def test_reads(self):
+        # reads are not tracked while refresh-ahead is disabled
+        for i in range(10):
+            self.client[f"key{i}"] = i
+            self.client[f"key{i}"]
+        self.assertEqual(self.client.reads, {})
+        self.client.refresh_ahead = 60
+        # misses are not tracked
+        self.assertIsNone(self.client.get("unknown"))
+        for i in range(10):
+            self.client[f"key{i}"]
+        self.assertEqual(len(self.client.reads), 10)
+        # keys leaving the cache are dropped
+        del self.client["key0"]
+        self.client.demote("key1")
+        self.client.pop("key2")
+        self.assertNotIn("key0", self.client.reads)
+        self.assertNotIn("key1", self.client.reads)
+        self.assertNotIn("key2", self.client.reads)
+        self.assertEqual(len(self.client.reads), 7)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+from ..cache import Cache
+from ..serialization import (
+    OUT_OF_BAND_THRESHOLD,
+    SERIALIZERS,
+    deserialize,
+    get_serializer,
+    serialize,
+)
+
+
+class SerializationTestCase(unittest.TestCase):
+    def test_serializers(self):
+        courses = [{"id": 1, "fullname": "Course", "img": None, "active": True}]
+        download = ("lecture.pdf", b"\x00" * OUT_OF_BAND_THRESHOLD, 1)
+        for serializer in SERIALIZERS:
+            for value in (courses, download):
+                with self.subTest(serializer=serializer, value=type(value)):
+                    data, used = serialize(value, serializer)
+                    self.assertEqual(used, serializer)
+                    restored = deserialize(data, used)
+                    self.assertEqual(restored, value)
+                    self.assertIs(type(restored), type(value))
+        # values of other than builtin types are pickled
+        grades = OrderedDict(semester=[{"Grade": 1.7}])
+        for serializer in ("auto", "marshal"):
+            data, used = serialize(grades, serializer)
+            self.assertEqual(used, "pickle")
+            self.assertIs(type(deserialize(data, used)), OrderedDict)
+        self.assertEqual(serialize(courses, "auto")[1], "marshal")
+        self.assertEqual(get_serializer(None), "auto")
+        with self.assertRaises(ValueError):
+            get_serializer("yaml")
+
+    def test_cache(self):
+        options = dict(
+            filepath=tempfile.gettempdir(),
+            verbose=False,
+            emit=False,
+            max_len=10,
+            max_age=60,
+            destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+        )
+        cache = Cache(**options)
+        cache["username.courses"] = [{"id": 1}]
+        cache["username.grades"] = OrderedDict(semester=[])
+        cache = Cache(serializer="pickle5", **options)
+        cache["username.resources"] = {"1": [("lecture.pdf", "link")]}
+        self.assertEqual(
+            cache.conn.execute(
+                "SELECT Key, Serializer FROM Cached ORDER BY Key;"
+            ).fetchall(),
+            [
+                ("username.courses", "marshal"),
+                ("username.grades", "pickle"),
+                ("username.resources", "pickle5"),
+            ],
+        )
+        # rows serialized by different serializers are read back
+        cache = Cache(serializer="pickle", **options)
+        self.assertEqual(cache["username.courses"], [{"id": 1}])
+        self.assertEqual(cache["username.grades"], OrderedDict(semester=[]))
+        self.assertEqual(cache["username.resources"], {"1": [("lecture.pdf", "link")]})
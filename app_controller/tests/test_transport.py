@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Barrier, Lock, Thread
+
+import requests
+from requests.adapters import BaseAdapter
+
+from ..transport import GuardedSession, is_sign_in_page
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    Serves MyCampus pages, redirects to the sign-in page while the session is expired.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.expired = False
+        self.requests = 0
+        self.lock = Lock()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        with self.lock:
+            self.requests += 1
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if self.expired and "/login/" not in request.url:
+            response.status_code = 303
+            response.headers["Location"] = "https://mycampus.iubh.de/login/index.php"
+            response._content = b""
+        else:
+            response.status_code = 200
+            response._content = b"page"
+        return response
+
+    def close(self):
+        pass
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Keeps connections alive, fails the first request with 503 if asked to.
+    """
+
+    protocol_version = "HTTP/1.1"
+    failures = 0
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.3)
+        if self.path == "/flaky" and Handler.failures:
+            Handler.failures -= 1
+            self.send_response(503)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "4")
+        self.end_headers()
+        self.wfile.write(b"page")
+
+    do_HEAD = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+class TransportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = GuardedSession(pool_sizes={})
+        self.adapter = FakeAdapter()
+        self.session.mount("https://", self.adapter)
+        self.reauthentications = 0
+
+        def reauthenticate():
+            # requests issued by the re-authentication are not guarded
+            self.assertEqual(
+                self.session.get("https://mycampus.iubh.de/my/").status_code, 200
+            )
+            time.sleep(0.05)
+            self.reauthentications += 1
+            self.adapter.expired = False
+
+        self.reauthenticate = reauthenticate
+
+    def test_is_sign_in_page(self):
+        self.adapter.expired = True
+        response = self.session.get("https://mycampus.iubh.de/my/")
+        self.assertTrue(is_sign_in_page(response))
+        self.assertTrue(
+            is_sign_in_page(
+                self.session.get("https://mycampus.iubh.de/my/", allow_redirects=False)
+            )
+        )
+        # requesting a sign-in page is not a redirect to it
+        self.assertFalse(
+            is_sign_in_page(
+                self.session.get("https://mycampus.iubh.de/login/index.php?x=1")
+            )
+        )
+        self.adapter.expired = False
+        self.assertFalse(
+            is_sign_in_page(self.session.get("https://mycampus.iubh.de/my/"))
+        )
+
+    def test_unguarded(self):
+        self.adapter.expired = True
+        response = self.session.get("https://mycampus.iubh.de/my/")
+        self.assertTrue(is_sign_in_page(response))
+        self.assertEqual(self.reauthentications, 0)
+
+    def test_replay(self):
+        self.session.reauthenticate = self.reauthenticate
+        self.adapter.expired = True
+        response = self.session.get("https://mycampus.iubh.de/my/")
+        self.assertEqual(response.content, b"page")
+        self.assertEqual(self.reauthentications, 1)
+        self.assertEqual(self.session.generation, 1)
+
+    def test_single_flight(self):
+        self.session.reauthenticate = self.reauthenticate
+        self.adapter.expired = True
+        barrier, responses = Barrier(4), []
+
+        def worker():
+            barrier.wait()
+            responses.append(self.session.get("https://mycampus.iubh.de/my/"))
+
+        threads = [Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.reauthentications, 1)
+        self.assertEqual([r.content for r in responses], [b"page"] * 4)
+
+    def test_keepalive(self):
+        self.session.start_keepalive("https://mycampus.iubh.de/my/", 0.01)
+        time.sleep(0.1)
+        self.session.stop_keepalive()
+        count = self.adapter.requests
+        self.assertGreater(count, 0)
+        time.sleep(0.05)
+        self.assertLessEqual(self.adapter.requests, count + 1)
+
+    def test_pooling(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        prefix = "http://127.0.0.1:%d/" % server.server_port
+        session = GuardedSession(pool_sizes={prefix: 2}, timeout=(1.0, 0.1))
+        try:
+            for _ in range(5):
+                self.assertEqual(session.get(prefix).content, b"page")
+            self.assertEqual(
+                session.connection_stats()[prefix],
+                {"requests": 5, "connections": 1, "reused": 4},
+            )
+            # idempotent requests are retried
+            Handler.failures = 1
+            self.assertEqual(session.get(prefix + "flaky").status_code, 200)
+            # default read timeout
+            with self.assertRaises(requests.exceptions.RequestException):
+                session.get(prefix + "slow")
+        finally:
+            session.close()
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+from threading import Event, Lock, Thread, local
+from typing import Any, Callable, Optional
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+###############
+#             #
+# definitions #
+#             #
+###############
+
+
+# maximum number of pooled connections per host (URL prefix)
+POOL_SIZES = {
+    "https://mycampus.iubh.de/": 8,
+    "https://login.iubh.de/": 2,
+    "https://care-fs.iubh.de/": 4,
+}
+# (connect, read) timeouts of requests in seconds
+TIMEOUT = (5.0, 30.0)
+
+
+def is_sign_in_page(response: requests.Response) -> bool:
+    """
+    Checks whether a response has been redirected to (or redirects to) a sign-in page,
+    which is the case once the session has expired.
+
+    Positional arguments:
+        response: requests.Response,
+            response to be checked.
+
+    Returns:
+        bool
+    """
+
+    # targets of redirects (the requested URL itself might be a sign-in page)
+    urls = [r.url for r in (*response.history, response)][1:]
+    if response.is_redirect:
+        urls.append(urljoin(response.url, response.headers["Location"]))
+    for url in urls:
+        parts = urlsplit(url)
+        if (
+            # identity provider of the SAML authentication
+            parts.netloc == "login.iubh.de"
+            # MyCampus (Moodle)
+            or parts.path.endswith("/login/index.php")
+            # care-fs
+            or "loginReferrer=" in parts.query
+        ):
+            return True
+    return False
+
+
+class GuardedSession(requests.Session):
+    """
+    Session detecting its expiry. Once a request has been redirected to a sign-in page,
+    the session is re-authenticated and the request is replayed.
+    Concurrent requests share a single re-authentication.
+    Connections are pooled per host, idempotent requests are retried
+    on connection errors and server errors.
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Optional[dict[str, int]] = None,
+        timeout: Optional[tuple[float, float]] = TIMEOUT,
+        retries: int = 2,
+    ):
+        """
+        Create a session.
+
+        Keyword arguments:
+            pool_sizes: dict[str,int], optional, default is POOL_SIZES,
+                maximum number of pooled connections per host (URL prefix).
+
+            timeout: tuple[float,float], optional, default is TIMEOUT,
+                default (connect, read) timeouts of requests in seconds,
+                None waits indefinitely.
+
+            retries: int, optional, default is 2,
+                number of retries of idempotent requests.
+        """
+
+        super().__init__()
+        self.timeout = timeout
+        self.pool_sizes = dict(POOL_SIZES if pool_sizes is None else pool_sizes)
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(("GET", "HEAD", "OPTIONS")),
+            # the response is returned once the retries are exhausted
+            raise_on_status=False,
+        )
+        for prefix, size in self.pool_sizes.items():
+            self.mount(
+                prefix,
+                HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry),
+            )
+        # callback re-authenticating the session, None disables the guard
+        self.reauthenticate: Optional[Callable[[], None]] = None
+        self.reauth_lock = Lock()
+        # number of re-authentications performed
+        self.generation = 0
+        # marks requests issued by the re-authentication of the current thread
+        self.bypass = local()
+        self.keepalive_stop = Event()
+        self.keepalive_stop.set()
+
+    def request(
+        self, method: str, url: str, *args: tuple[Any], **kwargs: dict[str, Any]
+    ) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        if self.reauthenticate is None or getattr(self.bypass, "active", False):
+            return super().request(method, url, *args, **kwargs)
+        generation = self.generation
+        response = super().request(method, url, *args, **kwargs)
+        if not is_sign_in_page(response):
+            return response
+        with self.reauth_lock:
+            # concurrent callers wait for the re-authentication in progress
+            if self.generation == generation:
+                self.bypass.active = True
+                try:
+                    self.reauthenticate()
+                finally:
+                    self.bypass.active = False
+                self.generation += 1
+        return super().request(method, url, *args, **kwargs)
+
+    def start_keepalive(self, url: str, interval: float):
+        """
+        Requests a page periodically to prevent the session from expiring.
+
+        Positional arguments:
+            url: str,
+                URL of the page.
+
+            interval: float,
+                seconds between requests.
+        """
+
+        if not self.keepalive_stop.is_set():
+            return
+        # each keepalive thread has its own stop event
+        self.keepalive_stop = stop = Event()
+
+        def ping():
+            while not stop.wait(interval):
+                try:
+                    self.get(url, allow_redirects=False)
+                except BaseException:
+                    continue
+
+        Thread(target=ping, daemon=True).start()
+
+    def stop_keepalive(self):
+        """
+        Stops periodic requests.
+        """
+
+        self.keepalive_stop.set()
+
+    def warm_up(self):
+        """
+        Opens a connection to each pooled host in the background,
+        so that the first requests do not wait for TLS handshakes.
+        """
+
+        def connect(prefix: str):
+            try:
+                self.head(prefix, allow_redirects=False)
+            except BaseException:
+                pass
+
+        for prefix in self.pool_sizes:
+            Thread(target=connect, args=(prefix,), daemon=True).start()
+
+    def connection_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns:
+            dict:
+            {
+                host (URL prefix): {
+                    "requests": int,
+                    "connections": int (opened connections),
+                    "reused": int (requests served by pooled connections)
+                }, ...
+            }
+        """
+
+        stats = {}
+        for prefix in self.pool_sizes:
+            pools = self.adapters[prefix].poolmanager.pools
+            counts = {"requests": 0, "connections": 0}
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    counts["requests"] += pool.num_requests
+                    counts["connections"] += pool.num_connections
+            counts["reused"] = max(counts["requests"] - counts["connections"], 0)
+            stats[prefix] = counts
+        return stats
@@ -34,6 +34,10 @@ class Client:
     pass
 
 
+class AsyncClient:
+    pass
+
+
 class WindowManager(MDScreenManager):
     """
     Custom screen manager.
@@ -54,9 +58,12 @@ class MobileApp(MDApp):
     screens = DictProperty({})
     # observable client object
     client = ObjectProperty(None)
+    # awaitable interface of the client object
+    async_client = ObjectProperty(None)
 
-    def __init__(self, client: Client, *args, **kwargs):
+    def __init__(self, client: Client, async_client: AsyncClient, *args, **kwargs):
         self.client = client
+        self.async_client = async_client
         super().__init__(*args, **kwargs)
 
     def switch_login(self):
@@ -151,7 +158,10 @@ class MobileApp(MDApp):
         If True is returned (default case), the application will sleep until the OS resumes our App.
         """
 
-        # here, some data could be saved if necessary
+        # persist pending cache writes, the app might not be resumed
+        self.client.flush()
+        # the session is only kept alive in the foreground
+        self.client.stop_keepalive()
         return True
 
     def on_resume(self):
@@ -164,8 +174,8 @@ class MobileApp(MDApp):
         When the app is resumed, App.on_resume() is called.
         """
 
-        # here, some data could be replaced if necessary
-        pass
+        # keep the session alive again (an expired session is signed in on demand)
+        self.client.start_keepalive()
 
     def switch_theme(self):
         """
@@ -198,11 +208,13 @@ class MobileApp(MDApp):
 
     def on_stop(self):
         self.client.debug("Shutting down application")
-        try:
-            if self.sm.current != "login":
-                self.client.close()
-        except BaseException:
-            pass
+        # the session is not signed out, so that it can be resumed after a restart
+        # (signing out is left to the explicit logout action)
+        self.client.stop_keepalive()
+        # pending requests are not awaited anymore
+        self.async_client.shutdown(wait=False)
+        # persist pending cache writes
+        self.client.flush()
         self.profile.disable()
         data = StringIO()
         ps = pstats.Stats(self.profile, stream=data).sort_stats("tottime")
@@ -199,6 +199,10 @@ class Client:
     pass
 
 
+class AsyncClient:
+    pass
+
+
 class CourseStartRecord(ThreeLineIconListItem):
     """
     Widget stored in a bottom sheet list used to display a startable course.
@@ -363,6 +367,17 @@ class CourseRegisrationRecord(ThreeLineAvatarIconListItem):
 
         return self.screen.client
 
+    @property
+    def async_client(self) -> AsyncClient:
+        """
+        Access point to the awaitable client interface.
+
+        Returns:
+            backend.AsyncClient
+        """
+
+        return self.screen.async_client
+
     def on_release(self):
         """
         Ought to be triggered on release of the class instance.
@@ -419,6 +434,17 @@ class CourseEnroll(IRightBodyTouch, MDCheckbox):
 
         return self.parent_widget.client
 
+    @property
+    def async_client(self) -> AsyncClient:
+        """
+        Access point to the awaitable client interface.
+
+        Returns:
+            backend.AsyncClient
+        """
+
+        return self.parent_widget.async_client
+
     @property
     def is_enrolled(self) -> bool:
         """
@@ -471,7 +497,7 @@ class CourseEnroll(IRightBodyTouch, MDCheckbox):
             if check and not self.is_enrolled:
                 try:
                     # enroll
-                    self.client.enroll(**self.parent_widget.booking_ctx)
+                    await self.async_client.enroll(**self.parent_widget.booking_ctx)
                     self.is_enrolled = True
                 except BaseException as ex:
                     # send warning as the banner of the main screen
@@ -484,7 +510,7 @@ class CourseEnroll(IRightBodyTouch, MDCheckbox):
             elif not check and self.is_enrolled:
                 try:
                     # cancel enrollment
-                    self.client.cancel(**self.parent_widget.booking_ctx)
+                    await self.async_client.cancel(**self.parent_widget.booking_ctx)
                     self.is_enrolled = False
                 except BaseException as ex:
                     # send warning as the banner of the main screen
@@ -840,6 +866,10 @@ class CourseBrowser(MDScreen):
     def client(self) -> Client:
         return self.main_screen.client
 
+    @property
+    def async_client(self) -> AsyncClient:
+        return self.main_screen.async_client
+
     @property
     def top_bar(self) -> MDTopAppBar:
         return self.main_screen.ids.top_bar
@@ -1117,20 +1147,20 @@ class CourseBrowser(MDScreen):
                     )
                 )
 
-                # collect course resources
-                for idx, course in enumerate(courses):
-                    resources.append(
-                        [
-                            course,
-                            self.client.list_course_resources(
-                                course.get("id"), cached=self.use_cache
-                            ),
-                        ]
-                    )
+                # collect course resources (fetched in parallel)
+                names = {course.get("id"): course.get("fullname") for course in courses}
+
+                def progress(course_id: int, done: int, total: int):
                     popup.status_msg = (
-                        f"Loading resources for the course {course.get('fullname')}..."
+                        f"Loading resources for the course {names[course_id]}..."
                     )
-                    popup.prog_val = int(100 * (idx + 1) / len(courses))
+                    popup.prog_val = int(100 * done / total)
+
+                course_resources = self.client.list_all_course_resources(
+                    list(names), cached=self.use_cache, progress=progress
+                )
+                for course in courses:
+                    resources.append([course, course_resources[course.get("id")]])
 
                 # reset progress bar
                 popup.status_msg = "Obtaining booking information..."
@@ -4,7 +4,7 @@ import csv
 import re
 from io import StringIO
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 import asynckivy
 from kivy.clock import Clock
@@ -215,7 +215,10 @@ class GradeChecker(MDScreen):
     def __init__(self, *, main_screen: MDScreen, **kwargs: dict[str, Any]):
         self.main_screen = main_screen
         super().__init__(**kwargs)
-        self.prepare_data_table()
+        # paint cached grades instantly, reload once fresher grades have arrived
+        self.prepare_data_table(
+            callback=lambda grades: Clock.schedule_once(self.reload, 0)
+        )
         self.ids.box_layout.add_widget(self.data_table)
         self.set_items()
 
@@ -235,11 +238,11 @@ class GradeChecker(MDScreen):
     def use_cache(self, value: bool):
         self.main_screen.use_cache = value
 
-    def prepare_data_table(self):
+    def prepare_data_table(self, callback: Optional[Callable] = None):
         self.grades = [
             (semester, record)
             for semester, records in self.client.get_grades(
-                cached=self.use_cache
+                cached=self.use_cache, callback=callback
             ).items()
             for record in sorted(
                 records,
@@ -270,17 +273,24 @@ class GradeChecker(MDScreen):
             ],
         )
 
+    def reload(self, *args):
+        """
+        Rebuilds the data table from the cache.
+        """
+
+        if self.asyncloader is not None and not self.asyncloader.done:
+            self.asyncloader.cancel()
+
+        self.data_table.clear_widgets()
+        self.ids.box_layout.clear_widgets()
+        self.prepare_data_table()
+        self.ids.box_layout.add_widget(self.data_table)
+        self.set_items()
+
     def refresh(self, *args):
         def refresh_callback(interval):
-            if self.asyncloader is not None and not self.asyncloader.done:
-                self.asyncloader.cancel()
-
-            self.data_table.clear_widgets()
             self.use_cache = False
-            self.ids.box_layout.clear_widgets()
-            self.prepare_data_table()
-            self.ids.box_layout.add_widget(self.data_table)
-            self.set_items()
+            self.reload()
             self.use_cache = True
             self.ids.refresh_layout.refresh_done()
 
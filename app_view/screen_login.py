@@ -277,6 +277,8 @@ class LoginWindow(MDScreen):
                 arguments forwarded to kivymd.uix.screen.MDScreen.on_enter method.
         """
 
+        # connect while the credentials are being typed in
+        self.app.client.preconnect()
         # get username from cache
         self.ids.username.text = self.app.client.get("username", "")
         # set up initila focus
@@ -343,15 +345,17 @@ class LoginWindow(MDScreen):
             try:
                 # perform sign-in actions
                 popup.status_msg = "Establishing connection..."
-                SAMLrequest = self.client.get_saml_request()
-                popup.prog_val = random.randint(1, 50)
+                # skip the handshake if the persisted session is still signed in
+                if not self.client.resume_session():
+                    SAMLrequest = self.client.get_saml_request()
+                    popup.prog_val = random.randint(1, 50)
 
-                popup.status_msg = "Exchanging handshake.."
-                SAMLresponse = self.client.get_saml_response(SAMLrequest)
-                popup.prog_val = random.randint(1, 50)
+                    popup.status_msg = "Exchanging handshake.."
+                    SAMLresponse = self.client.get_saml_response(SAMLrequest)
+                    popup.prog_val = random.randint(1, 50)
 
-                popup.status_msg = "Signing in..."
-                self.client.submit_saml_response(SAMLresponse)
+                    popup.status_msg = "Signing in..."
+                    self.client.submit_saml_response(SAMLresponse)
 
                 # finished
                 popup.prog_val = 100
@@ -149,6 +149,10 @@ class Client:
     pass
 
 
+class AsyncClient:
+    pass
+
+
 class MailMe(MDLabel):
     """
     Colorized label with the e-mail address of the author.
@@ -254,6 +258,16 @@ class MainScreenWithTopPanel(MDScreen):
         """
         return self.app.client
 
+    @property
+    def async_client(self) -> AsyncClient:
+        """
+        Access point to the awaitable client interface.
+
+        Returns:
+            backend.AsyncClient
+        """
+        return self.app.async_client
+
     def on_enter(self, *args: tuple[Any]):
         """
         Called when entering the screen.
@@ -314,6 +328,8 @@ class MainScreenWithTopPanel(MDScreen):
                 popup.schedule_auto_update(30, 0.1)
                 # set status message
                 popup.status_msg = "Signing out..."
+                # drop cached data of the user
+                self.client.invalidate(self.client.username)
                 # perform sign-out
                 self.client.close()
                 # finished
@@ -0,0 +1,700 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import time
+import timeit
+from collections import OrderedDict
+from pathlib import Path
+from threading import Event, Thread
+from urllib.parse import quote
+
+from expiringdict import ExpiringDict
+
+from app_controller.blob_store import BlobStore
+from app_controller.cache import Cache
+from app_controller.compression import CODECS
+from app_controller.dumper import dump4mock
+from app_controller.serialization import SERIALIZERS, serialize
+
+# recorded controller results used as representative cache values
+MOCK_PAYLOADS = {
+    "courses": "CourseBrowser.list_courses.result#1",
+    "grades": "GradesReporter.get_grades.result#1",
+    "calendar": "CalendarExporter.export_calendar.result#1",
+    "download": "Downloader.download.response.content@session.get(link)#1",
+}
+
+
+def report(name: str, seconds: float, number: int):
+    """
+    Prints the average duration of a single call.
+
+    Positional arguments:
+        name: str,
+            name of the measured operation.
+
+        seconds: float,
+            total duration of all calls.
+
+        number: int,
+            number of calls.
+    """
+
+    print(f"{name:<48} {seconds / number * 1e9:>12.1f} ns/call")
+
+
+def load_payloads() -> dict:
+    """
+    Loads recorded controller results from the mock environment.
+    Synthetic values of similar shape are used for dumps which are
+    not available (e.g. the mock environment has not been decrypted).
+
+    Returns:
+        dict: payload name mapped to the cache value.
+    """
+
+    synthetic = {
+        "courses": [
+            {
+                "fullname": f"Course {i}",
+                "shortname": f"DLBCSC{i:02d}",
+                "id": 1000 + i,
+                "state": "active" if i % 3 else "inactive",
+                "img": f"https://mycampus.iubh.de/pluginfile.php/{i}/course.jpg",
+            }
+            for i in range(32)
+        ],
+        "grades": OrderedDict(
+            (
+                f"Semester {s}",
+                [
+                    {
+                        "ID": f"DLBCSC{s}{i:02d}",
+                        "Module / Course": f"Course {s}.{i}",
+                        "Status": "Passed",
+                        "Grade": 1.7,
+                        "Rating": 0.88,
+                        "Credits": 5,
+                        "Try": 1,
+                        "Date": "01.01.2022",
+                        "Type of course": "Exam",
+                        "Comment": "",
+                        "Recognition": "",
+                    }
+                    for i in range(1, 7)
+                ],
+            )
+            for s in range(1, 7)
+        ),
+        "calendar": {
+            "ical": "BEGIN:VEVENT\nSUMMARY:Online Tutorial\nEND:VEVENT\n" * 2_000,
+            "parsed": [
+                {
+                    "summary": b"Online Tutorial",
+                    "description": b"Live session" * 20,
+                    "dtstart": None,
+                    "dtend": None,
+                    "location": b"",
+                }
+                for _ in range(2_000)
+            ],
+        },
+        "download": os.urandom(4 * 1_024**2),
+    }
+    payloads = {}
+    for name, fname in MOCK_PAYLOADS.items():
+        try:
+            payloads[name] = dump4mock[fname]
+        except BaseException:
+            payloads[name] = synthetic[name]
+    # downloads are cached as (content-disposition, content, content-length)
+    payloads["download"] = (
+        "lecture.pdf",
+        payloads["download"],
+        len(payloads["download"]),
+    )
+    return payloads
+
+
+def legacy_write(conn: sqlite3.Connection, key: str, value):
+    """
+    Writes a record in the legacy format (hex encoded value, formatted SQL).
+    """
+
+    conn.execute(
+        """
+        INSERT INTO Cached(Key, Value, InsertedAt)
+        VALUES('{key}', '{value}', CURRENT_TIMESTAMP)
+        ON CONFLICT DO
+        UPDATE SET Value='{value}';
+        """.format(
+            key=key,
+            value=pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL).hex(),
+        )
+    )
+
+
+def legacy_read(conn: sqlite3.Connection, key: str):
+    """
+    Reads a record stored in the legacy format.
+    """
+
+    return pickle.loads(
+        bytes.fromhex(
+            conn.execute(
+                f"""
+                SELECT Value FROM Cached
+                WHERE Key='{key}' AND
+                InsertedAt >= datetime(CURRENT_TIMESTAMP, '-3600 seconds');
+            """
+            ).fetchone()[0]
+        )
+    )
+
+
+def legacy_cache(destination: str, max_len: int = 1_000) -> sqlite3.Connection:
+    """
+    Creates a database using the legacy table layout and Cleaner trigger.
+    """
+
+    conn = sqlite3.connect(destination, isolation_level=None)
+    conn.execute(
+        """
+        CREATE TABLE Cached(
+            Key TEXT PRIMARY KEY,
+            Value BLOB NOT NULL,
+            InsertedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+        );
+    """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER Cleaner
+        BEFORE INSERT ON Cached
+        BEGIN
+            DELETE FROM Cached
+            WHERE Key in (
+                SELECT Key FROM Cached
+                WHERE InsertedAt < datetime(CURRENT_TIMESTAMP, '-3600 seconds')
+            );
+            DELETE FROM Cached
+            WHERE Key in (
+                SELECT Key FROM Cached
+                LIMIT -1 OFFSET {max_len}
+            );
+        END;
+    """
+    )
+    return conn
+
+
+def bench_cache_storage():
+    print("Cache storage format (legacy: hex TEXT, current: BLOB)")
+    for name, value in load_payloads().items():
+        count = 5 if name == "download" else 200
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) * count
+        keys = [f"username.{name}.{i}" for i in range(count)]
+        for fmt in ("legacy", "current"):
+            destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+            if fmt == "legacy":
+                conn = legacy_cache(destination)
+                write = lambda k: legacy_write(conn, k, value)  # noqa: E731
+                read = lambda k: legacy_read(conn, k)  # noqa: E731
+                evict = lambda: None  # noqa: E731
+            else:
+                cache = Cache(
+                    filepath=tempfile.gettempdir(),
+                    emit=False,
+                    max_len=1_000,
+                    max_age=3_600,
+                    destination=destination,
+                )
+                write = lambda k: cache.__setitem__(k, value)  # noqa: E731
+                read = lambda k: cache[k]  # noqa: E731
+                # force reads to hit the database tier
+                evict = lambda: OrderedDict.clear(cache)  # noqa: E731
+            start = time.perf_counter()
+            for key in keys:
+                write(key)
+            written = time.perf_counter() - start
+            evict()
+            start = time.perf_counter()
+            for key in keys:
+                read(key)
+            read_ = time.perf_counter() - start
+            print(
+                f"{name:<10} {fmt:<8} "
+                f"write {size / written / 1_024**2:>8.1f} MB/s "
+                f"({count / written:>8.0f} ops/s)  "
+                f"read {size / read_ / 1_024**2:>8.1f} MB/s "
+                f"({count / read_:>8.0f} ops/s)  "
+                f"on disk {os.path.getsize(destination) / 1_024**2:>8.2f} MB"
+            )
+
+
+def bench_cache_compression():
+    print("Cache value compression (size of the persisted value, decode latency)")
+    for name, value in load_payloads().items():
+        for codec in CODECS:
+            cache = Cache(
+                filepath=tempfile.gettempdir(),
+                emit=False,
+                max_len=1,
+                max_age=3_600,
+                compression=codec,
+            )
+            start = time.perf_counter()
+            data, used, _, serializer = cache.encode(value)
+            encoded = time.perf_counter() - start
+            number = 5 if name == "download" else 50
+            decoded = timeit.timeit(
+                lambda: cache.decode(data, used, serializer), number=number
+            )
+            print(
+                f"{name:<10} {codec:<5} stored as {used:<5} "
+                f"{len(data) / 1_024:>10.1f} KB  "
+                f"encode {encoded * 1e3:>8.2f} ms  "
+                f"decode {decoded / number * 1e3:>8.2f} ms"
+            )
+
+
+def bench_cache_serialization():
+    print("Serialization of cached values (legacy: hex encoded pickle)")
+    payloads = load_payloads()
+    for name, value in payloads.items():
+        number = 5 if name == "download" else 50
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL).hex()
+        dumped = timeit.timeit(
+            lambda: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL).hex(),
+            number=number,
+        )
+        loaded = timeit.timeit(lambda: pickle.loads(bytes.fromhex(data)), number=number)
+        print(
+            f"{name:<10} {'legacy':<8} {'pickle':<8} {len(data) / 1_024:>10.1f} KB  "
+            f"dump {dumped / number * 1e3:>8.3f} ms  "
+            f"load {loaded / number * 1e3:>8.3f} ms"
+        )
+        for serializer in ("auto", *SERIALIZERS):
+            data, used = serialize(value, serializer)
+            dumped = timeit.timeit(lambda: serialize(value, serializer), number=number)
+            loaded = timeit.timeit(lambda: SERIALIZERS[used][1](data), number=number)
+            print(
+                f"{name:<10} {serializer:<8} {used:<8} {len(data) / 1_024:>10.1f} KB  "
+                f"dump {dumped / number * 1e3:>8.3f} ms  "
+                f"load {loaded / number * 1e3:>8.3f} ms"
+            )
+
+
+def bench_blob_store():
+    print("Cached downloads (cache: file body pickled into Cache, blobs: BlobStore)")
+    disposition, content, length = load_payloads()["download"]
+    links, number = [f"username.link({i})" for i in range(10)], 20
+    for fmt in ("cache", "blobs"):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        cache = Cache(
+            filepath=tempfile.gettempdir(),
+            emit=False,
+            max_len=100,
+            max_age=3_600,
+            destination=destination,
+        )
+        store = BlobStore(Path(destination).parent / ".blobs")
+        start = time.perf_counter()
+        for link in links:
+            # the same file linked from several courses
+            if fmt == "cache":
+                cache[link] = (disposition, content, length)
+            else:
+                cache[link] = (disposition, store.put(content), length)
+        written = (time.perf_counter() - start) / len(links)
+        if fmt == "cache":
+            read = lambda: cache[links[0]][1]  # noqa: E731
+        else:
+            read = lambda: store.read(cache[links[0]][1])  # noqa: E731
+        read_ = timeit.timeit(read, number=number) / number
+        OrderedDict.clear(cache)
+        cold = timeit.timeit(read, number=1)
+        stored = os.path.getsize(destination) + sum(
+            path.stat().st_size for path in store.root.glob("*/*")
+        )
+        print(
+            f"{fmt:<6} write {written * 1e3:>8.2f} ms  "
+            f"read {read_ * 1e6:>10.1f} us (from disk {cold * 1e6:>10.1f} us)  "
+            f"on disk {stored / 1_024**2:>6.1f} MB"
+        )
+
+
+def bench_cache_write_latency():
+    print(
+        "Cache write latency by table size (legacy: Cleaner trigger, current: sweeper)"
+    )
+    value = load_payloads()["courses"]
+    checkpoints = (100, 1_000, 2_500, 5_000)
+    for fmt in ("legacy", "current"):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        if fmt == "legacy":
+            conn = legacy_cache(destination, max_len=max(checkpoints))
+            write = lambda k: legacy_write(conn, k, value)  # noqa: E731
+        else:
+            cache = Cache(
+                filepath=tempfile.gettempdir(),
+                emit=False,
+                max_len=max(checkpoints),
+                max_age=3_600,
+                destination=destination,
+            )
+            write = lambda k: cache.__setitem__(k, value)  # noqa: E731
+        latencies, size = [], 0
+        for checkpoint in checkpoints:
+            while size < checkpoint:
+                start = time.perf_counter()
+                write(f"username.courses.{size}")
+                latencies.append(time.perf_counter() - start)
+                size += 1
+            # mean latency of the last 100 writes
+            print(
+                f"{fmt:<8} {checkpoint:>6} rows "
+                f"{sum(latencies[-100:]) / 100 * 1e6:>10.1f} us/write"
+            )
+
+
+def bench_cache_startup():
+    print("Cache cold start by table size (eager: decoding all rows at startup)")
+    value = load_payloads()["courses"]
+    for rows in (100, 1_000, 5_000):
+        destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+        options = dict(
+            filepath=tempfile.gettempdir(),
+            emit=False,
+            max_len=rows,
+            max_age=3_600,
+            destination=destination,
+            write_behind=True,
+            flush_size=rows,
+        )
+        cache = Cache(**options)
+        for i in range(rows):
+            cache[f"username.courses.{i}"] = value
+        cache.flush()
+        del cache
+        start = time.perf_counter()
+        cache = Cache(**options)
+        lazy = time.perf_counter() - start
+        start = time.perf_counter()
+        for value_, codec, serializer in cache.conn.execute(
+            "SELECT Value, Codec, Serializer FROM Cached;"
+        ):
+            cache.decode(value_, codec, serializer)
+        eager = lazy + time.perf_counter() - start
+        print(
+            f"{rows:>6} rows lazy {lazy * 1e3:>8.2f} ms  eager {eager * 1e3:>8.2f} ms"
+        )
+
+
+def bench_cache_snapshot():
+    print("Cache cold start of a fresh install (legacy: INSERTs through Cleaner)")
+    value = load_payloads()["courses"]
+    for rows in (100, 1_000, 2_500):
+        options = dict(
+            filepath=tempfile.gettempdir(),
+            emit=False,
+            max_len=rows,
+            max_age=3_600,
+            compression="zlib",
+        )
+        cache = Cache(**options, destination=str(Path(tempfile.mkdtemp()) / ".db"))
+        for i in range(rows):
+            cache[f"username.courses.{i}"] = value
+        image = Path(tempfile.mkdtemp()) / "cache.snapshot"
+        cache.snapshot(image)
+        conn = legacy_cache(str(Path(tempfile.mkdtemp()) / ".db"), max_len=rows)
+        start = time.perf_counter()
+        for i in range(rows):
+            legacy_write(conn, f"username.courses.{i}", value)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        cache = Cache(**options, destination=str(Path(tempfile.mkdtemp()) / ".db"))
+        for i in range(rows):
+            cache[f"username.courses.{i}"] = value
+        replayed = time.perf_counter() - start
+        start = time.perf_counter()
+        Cache(
+            **options,
+            destination=str(Path(tempfile.mkdtemp()) / ".db"),
+            image=image,
+        )
+        restored = time.perf_counter() - start
+        print(
+            f"{rows:>6} rows legacy {legacy * 1e3:>9.2f} ms  "
+            f"replay {replayed * 1e3:>9.2f} ms  "
+            f"restore {restored * 1e3:>8.2f} ms  "
+            f"image {image.stat().st_size / 1_024:>8.1f} KB"
+        )
+
+
+def session_trace(length: int = 5_000, seed: int = 0) -> list:
+    """
+    Generates a deterministic sequence of cache keys resembling a typical session:
+    frequently read settings and course lists, resources of a few favourite courses,
+    occasional grades and calendar lookups and one-off downloads.
+
+    Keyword arguments:
+        length: int, optional, default is 5_000,
+            number of lookups.
+
+        seed: int, optional, default is 0,
+            seed of the random generator.
+
+    Returns:
+        list: cache keys.
+    """
+
+    rng, downloads, trace = random.Random(seed), 0, []
+    for _ in range(length):
+        choice = rng.random()
+        if choice < 0.2:
+            trace.append("username.theme")
+        elif choice < 0.35:
+            trace.append("username.courses")
+        elif choice < 0.65:
+            # few favourite courses are browsed most of the time
+            trace.append(f"username.resources.{int(rng.paretovariate(1.2)) % 30}")
+        elif choice < 0.7:
+            trace.append("username.grades")
+        elif choice < 0.75:
+            trace.append("username.calendar")
+        else:
+            # each link is downloaded only once
+            trace.append(f"username.download.{downloads}")
+            downloads += 1
+    return trace
+
+
+def bench_cache_hit_ratio():
+    print("Cache hit ratio replaying a session trace (fifo: previous behaviour)")
+    trace = session_trace()
+    for max_len in (8, 16, 32):
+        for eviction in ("fifo", "ttl", "lru", "lfu"):
+            destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+            if eviction == "fifo":
+                # the previous in-memory tier evicted in insertion order
+                cache = ExpiringDict(max_len=max_len, max_age_seconds=3_600)
+            else:
+                cache = Cache(
+                    filepath=tempfile.gettempdir(),
+                    emit=False,
+                    max_len=max_len,
+                    max_age=3_600,
+                    destination=destination,
+                    eviction=eviction,
+                )
+            hits = 0
+            for key in trace:
+                if key in cache:
+                    cache[key]
+                    hits += 1
+                else:
+                    cache[key] = key
+            print(
+                f"max_len {max_len:>3} {eviction:<5} "
+                f"in-memory hit ratio {hits / len(trace):>6.1%}"
+            )
+
+
+def stress_worker(destination: str, shared: bool, index: int, duration: float, results):
+    """
+    Reads and writes random records of a cache file shared with other processes.
+
+    Positional arguments:
+        destination: str,
+            location of the database.
+
+        shared: bool,
+            multi-process mode of the cache.
+
+        index: int,
+            number of the worker.
+
+        duration: float,
+            seconds to run.
+
+        results: multiprocessing.Queue,
+            receives (operations, errors) of the worker.
+    """
+
+    cache = Cache(
+        filepath=tempfile.gettempdir(),
+        emit=False,
+        max_len=64,
+        max_age=3_600,
+        destination=destination,
+        shared=shared,
+    )
+    rng = random.Random(index)
+    operations = errors = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        key = f"username.record({rng.randrange(32)})"
+        try:
+            if rng.random() < 0.25:
+                cache[key] = (index, operations, b"\x00" * 512)
+            else:
+                cache.get(key)
+        except sqlite3.OperationalError:
+            errors += 1
+        operations += 1
+    results.put((operations, errors))
+
+
+def bench_cache_multiprocess():
+    print("Cache shared by several processes (25% writes, 32 records)")
+    for shared in (False, True):
+        for workers in (1, 2, 4):
+            destination = str(Path(tempfile.mkdtemp()) / ".cache.dat")
+            kwargs = dict(
+                filepath=tempfile.gettempdir(),
+                emit=False,
+                max_len=64,
+                max_age=3_600,
+                destination=destination,
+                shared=shared,
+            )
+            # the observer holds every record in memory before the workers start
+            observer = Cache(**kwargs)
+            for i in range(32):
+                observer[f"username.record({i})"] = None
+            results = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(
+                    target=stress_worker,
+                    args=(destination, shared, index, 2.0, results),
+                )
+                for index in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            totals = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            # records served from memory that differ from the database
+            stale = sum(
+                observer.get(key) != observer.decode(value, codec, serializer)
+                for key, value, codec, serializer in observer.conn.execute(
+                    "SELECT Key, Value, Codec, Serializer FROM Cached;"
+                )
+            )
+            print(
+                f"{'shared' if shared else 'default':<8} {workers} processes "
+                f"{sum(ops for ops, _ in totals) / 2.0:>9.0f} ops/s  "
+                f"{sum(errors for _, errors in totals):>5} lock errors  "
+                f"{stale:>3}/32 stale reads"
+            )
+
+
+def bench_cache_read_scaling():
+    print("Cache database reads by concurrent threads next to a writer thread")
+    value = b"\x00" * 4_096
+    for pool in (False, True):
+        for readers in (1, 2, 4, 8):
+            cache = Cache(
+                filepath=tempfile.gettempdir(),
+                emit=False,
+                max_len=1,
+                max_age=3_600,
+                destination=str(Path(tempfile.mkdtemp()) / ".cache.dat"),
+                write_behind=True,
+                pool=pool,
+            )
+            for i in range(256):
+                cache[f"username.record({i})"] = value
+            cache.flush()
+            stop, counts = Event(), [0] * readers
+
+            def read(index: int):
+                rng = random.Random(index)
+                while not stop.is_set():
+                    # the in-memory tier holds a single record
+                    cache.get(f"username.record({rng.randrange(256)})")
+                    counts[index] += 1
+
+            def write():
+                rng = random.Random(-1)
+                while not stop.is_set():
+                    cache[f"username.record({rng.randrange(256)})"] = value
+                    time.sleep(0.001)
+
+            threads = [Thread(target=read, args=(i,)) for i in range(readers)]
+            threads.append(Thread(target=write))
+            for thread in threads:
+                thread.start()
+            time.sleep(2.0)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            print(
+                f"{'pool' if pool else 'shared':<6} connection  {readers} readers "
+                f"{sum(counts) / 2.0:>9.0f} reads/s"
+            )
+
+
+def bench_dump4mock():
+    class Scraper:
+        def baseline(self):
+            response = "text"  # noqa: F841
+
+        def scrap(self):
+            response = "text"  # noqa: F841
+            dump4mock("response.text", True)
+
+        def scrap_with_formatting(self):
+            response = "text"  # noqa: F841
+            dump4mock(
+                "response.text@session.get(%s)"
+                % quote("https://mycampus.iubh.de/my/", safe=""),
+                True,
+            )
+
+        def scrap_without_overwrite(self):
+            response = "text"  # noqa: F841
+            dump4mock("response")
+
+    scraper, number = Scraper(), 100_000
+    print("dump4mock (recording disabled)")
+    dump4mock.DUMP_CLASS = None
+    report("baseline", timeit.timeit(scraper.baseline, number=number), number)
+    report("dump4mock(key, True)", timeit.timeit(scraper.scrap, number=number), number)
+    report(
+        "dump4mock(quote(key), True)",
+        timeit.timeit(scraper.scrap_with_formatting, number=number),
+        number,
+    )
+    report(
+        "dump4mock(key)",
+        timeit.timeit(scraper.scrap_without_overwrite, number=number),
+        number,
+    )
+
+    print("dump4mock (recording enabled for another class)")
+    dump4mock.DUMP_CLASS = "Unknown"
+    number //= 10
+    report("dump4mock(key, True)", timeit.timeit(scraper.scrap, number=number), number)
+    dump4mock.DUMP_CLASS = None
+
+
+if __name__ == "__main__":
+    bench_dump4mock()
+    bench_cache_storage()
+    bench_cache_compression()
+    bench_cache_serialization()
+    bench_blob_store()
+    bench_cache_write_latency()
+    bench_cache_startup()
+    bench_cache_snapshot()
+    bench_cache_hit_ratio()
+    bench_cache_multiprocess()
+    bench_cache_read_scaling()
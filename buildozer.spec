@@ -62,6 +62,7 @@ icalendar==4.1.0
 idna==2.10
 kivymd==1.0.2
 libbz2
+liblzma
 matplotlib==3.5.2
 networkx==2.8.8
 plyer==2.0.0
@@ -26,20 +26,32 @@ def main():
         request_permissions(
             [Permission.READ_EXTERNAL_STORAGE, Permission.WRITE_EXTERNAL_STORAGE]
         )
+    import asynckivy
+    from app_controller.async_client import AsyncClient
     from app_controller.client import Client
     from app_view.app import MobileApp
     from app_view.platform_specs import app_dir_path
 
+    client = Client(
+        "",
+        "",
+        max_len=100,
+        max_age=60**2,
+        filepath=__file__,
+        verbose=True,
+        destination=str(Path(app_dir_path) / ".cache.dat"),
+        write_behind=True,
+        warm_up=16,
+        compression="zlib",
+        refresh_ahead=5 * 60,
+        keepalive=10 * 60,
+        max_bytes=32 * 1_024**2,
+        max_item_bytes=4 * 1_024**2,
+        max_db_bytes=128 * 1_024**2,
+    )
+    # requests are awaited in the asynckivy coroutines of the screens
     app = MobileApp(
-        Client(
-            "",
-            "",
-            max_len=100,
-            max_age=60**2,
-            filepath=__file__,
-            verbose=True,
-            destination=str(Path(app_dir_path) / ".cache.dat"),
-        )
+        client, AsyncClient(client, run_in_executor=asynckivy.run_in_executor)
     )
     app.run()
 
@@ -2,15 +2,25 @@
 
 import unittest
 
+from app_controller.tests.test_async_client import AsyncClientTestCase
 from app_controller.tests.test_auth import AuthenticatorTestCase
+from app_controller.tests.test_blob_store import BlobStoreTestCase
 from app_controller.tests.test_cache import CacheTestCase
+from app_controller.tests.test_cache_policy import CachePolicyTestCase
 from app_controller.tests.test_calendar_exporter import CalendarExporterTestCase
+from app_controller.tests.test_compression import CompressionTestCase
 from app_controller.tests.test_course_browser import CourseBrowserTestCase
+from app_controller.tests.test_derived import DerivedTestCase
 from app_controller.tests.test_downloader import DownloaderTestCase
 from app_controller.tests.test_dumper import DumperTestCase
+from app_controller.tests.test_eviction import EvictionTestCase
 from app_controller.tests.test_exceptions import ExceptionsTestCase
 from app_controller.tests.test_grades_reporter import GradesReporterTestCase
 from app_controller.tests.test_logger import LoggerTestCase
+from app_controller.tests.test_metrics import MetricsTestCase
+from app_controller.tests.test_refresher import RefresherTestCase
+from app_controller.tests.test_serialization import SerializationTestCase
+from app_controller.tests.test_transport import TransportTestCase
 
 
 def mock_app():
@@ -28,20 +38,30 @@ def mock_app():
     Window.minimum_height = 1000
     Window.minimum_width = 600
 
+    import asynckivy
+    from app_controller.async_client import AsyncClient
     from app_controller.client_ import Client_ as Client
     from app_view.app import MobileApp
     from app_view.platform_specs import app_dir_path
 
+    client = Client(
+        "",
+        "",
+        max_len=100,
+        max_age=60**2,
+        filepath=__file__,
+        verbose=True,
+        destination=str(Path(app_dir_path) / ".cache.dat"),
+        write_behind=True,
+        warm_up=16,
+        compression="zlib",
+        refresh_ahead=5 * 60,
+        max_bytes=32 * 1_024**2,
+        max_item_bytes=4 * 1_024**2,
+        max_db_bytes=128 * 1_024**2,
+    )
     app = MobileApp(
-        Client(
-            "",
-            "",
-            max_len=100,
-            max_age=60**2,
-            filepath=__file__,
-            verbose=True,
-            destination=str(Path(app_dir_path) / ".cache.dat"),
-        )
+        client, AsyncClient(client, run_in_executor=asynckivy.run_in_executor)
     )
     app.run()
 
@@ -49,15 +69,25 @@ def mock_app():
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     loader = unittest.TestLoader()
+    suite.addTests(loader.loadTestsFromTestCase(AsyncClientTestCase))
     suite.addTests(loader.loadTestsFromTestCase(AuthenticatorTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(BlobStoreTestCase))
     suite.addTests(loader.loadTestsFromTestCase(CacheTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(CachePolicyTestCase))
     suite.addTests(loader.loadTestsFromTestCase(CalendarExporterTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(CompressionTestCase))
     suite.addTests(loader.loadTestsFromTestCase(CourseBrowserTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(DerivedTestCase))
     suite.addTests(loader.loadTestsFromTestCase(DownloaderTestCase))
     suite.addTests(loader.loadTestsFromTestCase(DumperTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(EvictionTestCase))
     suite.addTests(loader.loadTestsFromTestCase(ExceptionsTestCase))
     suite.addTests(loader.loadTestsFromTestCase(GradesReporterTestCase))
     suite.addTests(loader.loadTestsFromTestCase(LoggerTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(MetricsTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(RefresherTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(SerializationTestCase))
+    suite.addTests(loader.loadTestsFromTestCase(TransportTestCase))
     runner = unittest.TextTestRunner(verbosity=3)
     result = runner.run(suite)
     if len(result.errors) + len(result.unexpectedSuccesses) == 0: